@@ -1,8 +1,14 @@
+import sys
+
 import pytest
 
 # This file lists files which should be ignored by pytest
 collect_ignore = ["setup.py", "sopel.py", "sopel/modules/ipython.py"]
 
+if sys.version_info < (3, 5):
+    # Uses ``async def``
+    collect_ignore.append("test/tools/test_tools_coroutines.py")
+
 
 def pytest_addoption(parser):
     parser.addoption('--offline', action='store_true', default=False)
@@ -0,0 +1,61 @@
+# coding=utf-8
+"""Measure how many lines per second :class:`sopel.trigger.PreTrigger` parses.
+
+Usage: ``python contrib/benchmarks/pretrigger.py [seconds]``
+
+Two numbers are shown: parsing only, which is what happens to most lines
+(they match no callable), and parsing then reading every field, which is
+what happens to lines that trigger something.
+"""
+# Licensed under the Eiffel Forum License 2.
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+import sys
+import timeit
+
+from sopel.tools import Identifier
+from sopel.trigger import PreTrigger
+
+
+LINES = [
+    '@time=2020-01-01T12:00:00.000Z;account=foo :Foo!foo@example.com '
+    'PRIVMSG #sopel :Hello, world',
+    ':Bar!bar@example.org PRIVMSG #sopel :\x01ACTION waves\x01',
+    ':Baz!~baz@user/baz JOIN #sopel baz :Baz the Great',
+    ':irc.example.net 353 Sopel = #sopel :Foo Bar Baz @Qux +Quux',
+    '@msgid=abc\\:def;+draft/reply=42 :Qux!qux@qux.example PRIVMSG Sopel '
+    ':a private message',
+    'PING :irc.example.net',
+]
+
+
+def parse_only(nick):
+    for line in LINES:
+        PreTrigger(nick, line)
+
+
+def parse_and_read(nick):
+    for line in LINES:
+        pretrigger = PreTrigger(nick, line)
+        (pretrigger.tags, pretrigger.time, pretrigger.nick, pretrigger.user,
+         pretrigger.host, pretrigger.sender, pretrigger.args)
+
+
+def main(seconds=2.0):
+    nick = Identifier('Sopel')
+    for name, func in (('parse only', parse_only),
+                       ('parse and read', parse_and_read)):
+        timer = timeit.Timer(lambda: func(nick))
+        number = 1
+        while True:
+            elapsed = timer.timeit(number)
+            if elapsed >= 0.2:
+                break
+            number *= 10
+        runs = max(1, int(seconds / elapsed * number))
+        best = min(timer.repeat(repeat=3, number=runs)) / runs
+        print('%-15s %10.0f lines/s' % (name, len(LINES) / best))
+
+
+if __name__ == '__main__':
+    main(*[float(arg) for arg in sys.argv[1:]])
@@ -4,4 +4,6 @@ from __future__ import unicode_literals, absolute_import, print_function, divisi
 import sys
 # Different from setuptools script, because we want the one in this dir.
 from sopel.cli import run
-sys.exit(run.main())
+
+if __name__ == '__main__':
+    sys.exit(run.main())
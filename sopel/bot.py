@@ -7,19 +7,23 @@
 
 from __future__ import unicode_literals, absolute_import, print_function, division
 
-from ast import literal_eval
 import collections
 import itertools
 import os
 import re
 import sys
-import threading
 import time
 
 from sopel import irc, plugins, tools
 from sopel.db import SopelDB
 from sopel.tools import stderr, Identifier, deprecated
+import sopel.tools.blocks
+import sopel.tools.coroutines
 import sopel.tools.jobs
+import sopel.tools.processes
+import sopel.tools.profiling
+import sopel.tools.ratelimit
+import sopel.tools.workers
 from sopel.trigger import Trigger
 from sopel.module import NOLIMIT
 from sopel.logger import get_logger
@@ -51,20 +55,20 @@ class _CapReq(object):
 
 
 class Sopel(irc.Bot):
-    def __init__(self, config, daemon=False):
-        irc.Bot.__init__(self, config)
+    MAX_STACK_RECIPIENTS = 1000
+    """How many recipients :meth:`say` remembers the last messages to, for
+    loop detection; the least recently messaged are forgotten first."""
+
+    def __init__(self, config, daemon=False, primary=None):
+        irc.Bot.__init__(self, config,
+                         socket_map=None if primary is None else {})
         self._daemon = daemon  # Used for iPython. TODO something saner here
-        # `re.compile('.*') is re.compile('.*')` because of caching, so we need
-        # to associate a list with each regex, since they are unexpectedly
-        # indistinct.
-        self._callables = {
-            'high': collections.defaultdict(list),
-            'medium': collections.defaultdict(list),
-            'low': collections.defaultdict(list)
-        }
+        self._rules = plugins.rules.RuleIndex()
         self._plugins = {}
         self.config = config
         """The :class:`sopel.config.Config` for the current Sopel instance."""
+        self._policy = plugins.policy.ChannelPolicy(config)
+        self._blocks = sopel.tools.blocks.BlockList(config)
 
         self.doc = {}
         """A dictionary of command names to their documentation.
@@ -81,11 +85,9 @@ class Sopel(irc.Bot):
         """A mapping of module names to a list of commands in it."""
 
         self.stats = {}  # deprecated, remove in 7.0
-        self._times = {}
-        """
-        A dictionary mapping lowercased nicks to dictionaries which map
-        function names to the time which they were last used by that nick.
-        """
+        self._times = sopel.tools.ratelimit.RateLimiter()
+        """When rate-limited callables were last used by each nick, in each
+        channel, and globally."""
 
         self.server_capabilities = {}
         """A dict mapping supported IRCv3 capabilities to their options.
@@ -97,6 +99,9 @@ class Sopel(irc.Bot):
         For servers that do not support IRCv3, this will be an empty set.
         """
 
+        self._batched_caps = {}
+        """Capabilities of a multi-line ``CAP LS`` reply, so far."""
+
         self.enabled_capabilities = set()
         """A set containing the IRCv3 capabilities that the bot has enabled."""
 
@@ -132,7 +137,7 @@ class Sopel(irc.Bot):
         are also in.
         """
 
-        self.db = SopelDB(config)
+        self.db = primary.db if primary is not None else SopelDB(config)
         """The bot's database, as a :class:`sopel.db.SopelDB` instance."""
 
         self.memory = tools.SopelMemory()
@@ -144,6 +149,64 @@ class Sopel(irc.Bot):
         self.shutdown_methods = []
         """List of methods to call on shutdown."""
 
+        self.networks = collections.OrderedDict([(self.network, self)])
+        """A map of network names to the bot connected to each network.
+
+        Bots connected to the networks listed in
+        :attr:`~sopel.config.core_section.CoreSection.networks` are added
+        with :meth:`add_network`. They all share this map.
+        """
+
+        self.primary = primary
+        """The bot that loaded the plugins, if this one was added with
+        :meth:`add_network`; ``None`` otherwise."""
+
+        self._has_shut_down = False
+
+        if primary is not None:
+            # Everything that isn't about the connection comes from the
+            # primary bot: plugins are loaded, and jobs run, only once.
+            self.network = config.network
+            for attr in ('_rules', '_plugins', 'doc', '_command_groups',
+                         'stats', '_times', '_cap_reqs', 'memory',
+                         'shutdown_methods', 'scheduler', 'workers',
+                         'listener_worker', 'coroutines', 'call_stats',
+                         'networks'):
+                setattr(self, attr, getattr(primary, attr))
+            self.networks[self.network] = self
+            return
+
+        self.workers = sopel.tools.workers.WorkerPool(
+            max_workers=self.config.core.worker_threads,
+            max_queued=self.config.core.worker_queue_size,
+            plugin_limit=self.config.core.worker_plugin_limit,
+            overflow=self.config.core.worker_overflow)
+        """Runs threaded callables and jobs."""
+
+        self.listener_worker = sopel.tools.workers.WorkerPool(
+            max_workers=1, max_queued=None)
+        """Calls listeners (see :func:`sopel.module.listen`), one at a time,
+        in the order the lines were received.
+
+        Unlike :attr:`workers`, it never drops a call: listeners, such as the
+        ``seen`` and ``tell`` plugins', keep a record of every line."""
+
+        self.coroutines = sopel.tools.coroutines.CoroutineRunner()
+        """Runs ``async def`` callables and jobs."""
+
+        self.call_stats = sopel.tools.profiling.CallStats(
+            self.config.core.slow_call_threshold)
+        """Counts, errors, and latencies of calls to callables and jobs.
+
+        See :class:`sopel.tools.profiling.CallStats`.
+
+        .. versionadded:: 7.0
+        """
+
+        sopel.tools.processes.pool.configure(
+            self.config.core.process_workers,
+            self.config.core.process_memory_limit)
+
         self.scheduler = sopel.tools.jobs.JobScheduler(self)
         self.scheduler.start()
 
@@ -155,6 +218,22 @@ class Sopel(irc.Bot):
             self.config.core.host_blocks = []
         self.setup()
 
+    def add_network(self, name):
+        """Add a bot connected to another network.
+
+        :param str name: the network's name; it is configured in the
+                         ``[network:<name>]`` section
+        :return: the new bot, which shares this bot's plugins, database,
+                 memory, and job scheduler
+        :rtype: :class:`Sopel`
+
+        The new bot isn't connected yet: call its :meth:`~sopel.irc.Bot.run`
+        method, usually from its own thread.
+
+        .. versionadded:: 7.0
+        """
+        return Sopel(self.config.network(name), self._daemon, primary=self)
+
     @property
     def hostmask(self):
         """The current hostmask for the bot :class:`sopel.tools.target.User`.
@@ -169,18 +248,41 @@ class Sopel(irc.Bot):
 
         return self.users.get(self.nick).hostmask
 
+    def get_max_text_length(self, command, recipient):
+        """Get how many bytes of text fit in one message to ``recipient``.
+
+        :param str command: the message's command, e.g. ``PRIVMSG``
+        :param str recipient: the message's recipient
+        :return: the maximum length of the message's text, in bytes
+        :rtype: int
+
+        The server relays the message with the bot's hostmask in front of it,
+        and the whole line must fit in 510 bytes. If the hostmask is not known
+        yet, the longest possible hostname is assumed.
+        """
+        try:
+            hostmask = self.hostmask
+        except KeyError:
+            hostmask = '{}!{}@{}'.format(self.nick, self.user, 'h' * 63)
+        prefix = ':{} {} {} :'.format(hostmask, command, recipient)
+        return 510 - len(prefix.encode('utf-8'))
+
     # Backwards-compatibility aliases to attributes made private in 6.2. Remove
     # these in 7.0
     times = property(lambda self: getattr(self, '_times'))
     command_groups = property(lambda self: getattr(self, '_command_groups'))
 
-    def write(self, args, text=None):  # Shim this in here for autodocs
+    def write(self, args, text=None, future=False):  # Shim this in here for autodocs
         """Send a command to the server.
 
         :param args: an iterable of strings, which will be joined by spaces
         :type args: :term:`iterable`
         :param str text: a string that will be prepended with a ``:`` and added
                          to the end of the command
+        :param bool future: if ``True``, return a handle that completes when
+                            the line is actually sent
+        :return: a :class:`~sopel.irc.writer.SendFuture` if ``future`` is
+                 ``True``, ``None`` otherwise
 
         ``args`` is an iterable of strings, which are joined by spaces.
         ``text`` is treated as though it were the final item in ``args``, but
@@ -195,8 +297,16 @@ class Sopel(irc.Bot):
         Newlines and carriage returns (``'\\n'`` and ``'\\r'``) are removed
         before sending. Additionally, if the message (after joining) is longer
         than than 510 characters, any remaining characters will not be sent.
+
+        The line is queued and sent by a dedicated writer thread, so this
+        never waits for the network; use ``future`` to know when (or if) it
+        was actually sent.
+
+        .. versionchanged:: 7.0
+            Lines are queued rather than sent immediately. Added the
+            ``future`` parameter.
         """
-        irc.Bot.write(self, args, text=text)
+        return irc.Bot.write(self, args, text=text, future=future)
 
     def setup(self):
         """Set up the Sopel instance."""
@@ -331,11 +441,7 @@ class Sopel(irc.Bot):
         """
         if not callable(obj):
             return
-        if hasattr(obj, 'rule'):  # commands and intents have it added
-            for rule in obj.rule:
-                callb_list = self._callables[obj.priority][rule]
-                if obj in callb_list:
-                    callb_list.remove(obj)
+        self._rules.remove(obj)
         if hasattr(obj, 'interval'):
             self.scheduler.remove_callable_job(obj)
         if (
@@ -360,11 +466,7 @@ class Sopel(irc.Bot):
         # call on shutdown
         self.shutdown_methods += shutdowns
         for callbl in callables:
-            if hasattr(callbl, 'rule'):
-                for rule in callbl.rule:
-                    self._callables[callbl.priority][rule].append(callbl)
-            else:
-                self._callables[callbl.priority][re.compile('.*')].append(callbl)
+            self._rules.add(callbl)
             if hasattr(callbl, 'commands'):
                 module_name = callbl.__module__.rsplit('.', 1)[-1]
                 # TODO doc and make decorator for this. Not sure if this is how
@@ -426,56 +528,51 @@ class Sopel(irc.Bot):
         was received.
 
         By default, this will attempt to send the entire ``text`` in one
-        message. If the text is too long for the server, it may be truncated.
+        message. If the text is too long for the server, it is truncated.
         If ``max_messages`` is given, the ``text`` will be split into at most
-        that many messages, each no more than 400 bytes. The split is made at
-        the last space character before the 400th byte, or at the 400th byte if
-        no such space exists. If the ``text`` is too long to fit into the
-        specified number of messages using the above splitting, the final
-        message will contain the entire remainder, which may be truncated by
-        the server.
+        that many messages, each as long as the server allows once it adds
+        the bot's hostmask (see :meth:`get_max_text_length`). The split is made
+        at the last space character before the limit, or at the limit if no
+        such space exists, without breaking a multibyte character or a color
+        code. If the ``text`` is too long to fit into the specified number of
+        messages using the above splitting, the final message is truncated.
+
+        This never waits: the message is queued, and the connection's writer
+        throttles the messages to each recipient (see
+        :attr:`~sopel.config.core_section.CoreSection.flood_burst_lines`).
         """
         excess = ''
         if not isinstance(text, unicode):
             # Make sure we are dealing with unicode string
             text = text.decode('utf-8')
 
+        max_length = self.get_max_text_length('PRIVMSG', recipient)
         if max_messages > 1:
             # Manage multi-line only when needed
-            text, excess = tools.get_sendable_message(text)
-
-        try:
-            self.sending.acquire()
+            text, excess = tools.get_sendable_message(text, max_length)
+        else:
+            text = tools.truncate_message(text, max_length)
 
+        with self.sending:
             recipient_id = Identifier(recipient)
-            recipient_stack = self.stack.setdefault(recipient_id, {
-                'messages': [],
-                'flood_left': self.config.core.flood_burst_lines,
-            })
-
-            if recipient_stack['messages']:
-                elapsed = time.time() - recipient_stack['messages'][-1][0]
+            # Most recently messaged recipient last, so the one messaged the
+            # longest ago is forgotten first
+            recipient_stack = self.stack.pop(recipient_id, None)
+            if recipient_stack is None:
+                recipient_stack = collections.deque(maxlen=10)
+            self.stack[recipient_id] = recipient_stack
+            while len(self.stack) > self.MAX_STACK_RECIPIENTS:
+                self.stack.popitem(last=False)
+
+            if recipient_stack:
+                elapsed = time.time() - recipient_stack[-1][0]
             else:
                 # Default to a high enough value that we won't care.
                 # Five minutes should be enough not to matter anywhere below.
                 elapsed = 300
 
-            # If flood bucket is empty, refill the appropriate number of lines
-            # based on how long it's been since our last message to recipient
-            if not recipient_stack['flood_left']:
-                recipient_stack['flood_left'] = min(
-                    self.config.core.flood_burst_lines,
-                    int(elapsed) * self.config.core.flood_refill_rate)
-
-            # If it's too soon to send another message, wait
-            if not recipient_stack['flood_left']:
-                penalty = float(max(0, len(text) - 50)) / 70
-                wait = min(self.config.core.flood_empty_wait + penalty, 2)  # Maximum wait time is 2 sec
-                if elapsed < wait:
-                    time.sleep(wait - elapsed)
-
             # Loop detection
-            messages = [m[1] for m in recipient_stack['messages'][-8:]]
+            messages = [m[1] for m in list(recipient_stack)[-8:]]
 
             # If what we're about to send repeated at least 5 times in the last
             # two minutes, replace it with '...'
@@ -486,15 +583,11 @@ class Sopel(irc.Bot):
                     return
 
             self.write(('PRIVMSG', recipient), text)
-            recipient_stack['flood_left'] = max(0, recipient_stack['flood_left'] - 1)
-            recipient_stack['messages'].append((time.time(), self.safe(text)))
-            recipient_stack['messages'] = recipient_stack['messages'][-10:]
-        finally:
-            self.sending.release()
+            recipient_stack.append((time.time(), self.safe(text)))
         # Now that we've sent the first part, we need to send the rest. Doing
         # this recursively seems easier to me than iteratively
         if excess:
-            self.say(excess, max_messages - 1, recipient)
+            self.say(excess, recipient, max_messages - 1)
 
     def notice(self, text, dest):
         """Send an IRC NOTICE to a user or channel.
@@ -506,7 +599,8 @@ class Sopel(irc.Bot):
         the channel (or nickname, if a private message), in which the trigger
         happened.
         """
-        self.write(('NOTICE', dest), text)
+        max_length = self.get_max_text_length('NOTICE', dest)
+        self.write(('NOTICE', dest), tools.truncate_message(text, max_length))
 
     def action(self, text, dest):
         """Send a CTCP ACTION PRIVMSG to a user or channel.
@@ -521,6 +615,9 @@ class Sopel(irc.Bot):
         the channel (or nickname, if a private message), in which the trigger
         happened.
         """
+        # Truncate here, so the closing \001 isn't cut off
+        max_length = self.get_max_text_length('PRIVMSG', dest)
+        text = tools.truncate_message(text, max_length - len('\001ACTION \001'))
         self.say('\001ACTION {}\001'.format(text), dest)
 
     def reply(self, text, dest, reply_to, notice=False):
@@ -559,7 +656,7 @@ class Sopel(irc.Bot):
         self.write(['KICK', channel, nick], text)
 
     def call(self, func, sopel, trigger):
-        """Call a function, applying any rate-limiting or restrictions.
+        """Call a function, applying any rate-limiting.
 
         :param func: the function to call
         :type func: :term:`function`
@@ -568,78 +665,78 @@ class Sopel(irc.Bot):
         :param Trigger trigger: the Trigger object for the line from the server
                                 that triggered this call
         """
-        nick = trigger.nick
         current_time = time.time()
-        if nick not in self._times:
-            self._times[nick] = dict()
-        if self.nick not in self._times:
-            self._times[self.nick] = dict()
-        if not trigger.is_privmsg and trigger.sender not in self._times:
-            self._times[trigger.sender] = dict()
 
         if not trigger.admin and not func.unblockable:
-            if func in self._times[nick]:
-                usertimediff = current_time - self._times[nick][func]
-                if func.rate > 0 and usertimediff < func.rate:
-                    LOGGER.info(
-                        "%s prevented from using %s in %s due to user limit: %d < %d",
-                        trigger.nick, func.__name__, trigger.sender, usertimediff,
-                        func.rate
-                    )
-                    return
-            if func in self._times[self.nick]:
-                globaltimediff = current_time - self._times[self.nick][func]
-                if func.global_rate > 0 and globaltimediff < func.global_rate:
-                    LOGGER.info(
-                        "%s prevented from using %s in %s due to global limit: %d < %d",
-                        trigger.nick, func.__name__, trigger.sender, globaltimediff,
-                        func.global_rate
-                    )
-                    return
-
-            if not trigger.is_privmsg and func in self._times[trigger.sender]:
-                chantimediff = current_time - self._times[trigger.sender][func]
-                if func.channel_rate > 0 and chantimediff < func.channel_rate:
+            limits = [
+                ('user', trigger.nick, func.rate),
+                ('global', None, func.global_rate),
+            ]
+            if not trigger.is_privmsg:
+                limits.append(('channel', trigger.sender, func.channel_rate))
+            for scope, target, rate in limits:
+                if rate <= 0:
+                    continue
+                last_time = self._times.get(func, target)
+                if last_time is None:
+                    continue
+                timediff = current_time - last_time
+                if timediff < rate:
                     LOGGER.info(
-                        "%s prevented from using %s in %s due to channel limit: %d < %d",
-                        trigger.nick, func.__name__, trigger.sender, chantimediff,
-                        func.channel_rate
+                        "%s prevented from using %s in %s due to %s limit: %d < %d",
+                        trigger.nick, func.__name__, trigger.sender, scope,
+                        timediff, rate
                     )
                     return
 
-        # if channel has its own config section, check for excluded modules/modules methods
-        if trigger.sender in self.config:
-            channel_config = self.config[trigger.sender]
-
-            # disable listed modules completely on provided channel
-            if 'disable_modules' in channel_config:
-                disabled_modules = channel_config.disable_modules.split(',')
-
-                # if "*" is used, we are disabling all modules on provided channel
-                if '*' in disabled_modules:
-                    return
-                if func.__module__ in disabled_modules:
+        if func._coroutine:
+            # Rate limits and errors are handled once the coroutine is done
+            def done(task):
+                if task.cancelled():
                     return
+                try:
+                    exit_code = task.result()
+                except Exception:  # TODO: Be specific
+                    exit_code = None
+                    self._profile_call(func, trigger, start, error=True)
+                    self.error(trigger)
+                else:
+                    self._profile_call(func, trigger, start)
+                self._record_call(func, trigger, current_time, exit_code)
 
-            # disable chosen methods from modules
-            if 'disable_commands' in channel_config:
-                disabled_commands = literal_eval(channel_config.disable_commands)
-
-                if func.__module__ in disabled_commands:
-                    if func.__name__ in disabled_commands[func.__module__]:
-                        return
+            start = time.time()
+            self.coroutines.submit(func(sopel, trigger), done)
+            return
 
+        start = time.time()
         try:
             exit_code = func(sopel, trigger)
         except Exception:  # TODO: Be specific
             exit_code = None
+            self._profile_call(func, trigger, start, error=True)
             self.error(trigger)
+        else:
+            self._profile_call(func, trigger, start)
+
+        self._record_call(func, trigger, current_time, exit_code)
+
+    def _profile_call(self, func, trigger, start, error=False):
+        # Record how long func took, and log it if that was too long
+        duration = time.time() - start
+        name = '%s.%s' % (func.__module__, func.__name__)
+        if self.call_stats.record(name, duration, error):
+            LOGGER.warning(
+                'Slow call to %s: %.3fs, from %s in %s (%s)',
+                name, duration, trigger.nick, trigger.sender, trigger.raw)
 
+    def _record_call(self, func, trigger, call_time, exit_code):
+        # Start the rate limits of func, unless it asked not to
         if exit_code != NOLIMIT:
-            self._times[nick][func] = current_time
-            self._times[self.nick][func] = current_time
+            self._times.set(func, trigger.nick, call_time, func.rate)
+            self._times.set(func, None, call_time, func.global_rate)
             if not trigger.is_privmsg:
-                self._times[trigger.sender][func] = current_time
+                self._times.set(
+                    func, trigger.sender, call_time, func.channel_rate)
 
     def dispatch(self, pretrigger):
         """Dispatch a parsed message to any registered callables.
@@ -648,68 +745,73 @@ class Sopel(irc.Bot):
         """
         args = pretrigger.args
         text = args[-1] if args else ''
-        event = pretrigger.event
-        intent = pretrigger.tags.get('intent')
-        nick = pretrigger.nick
-        is_echo_message = nick.lower() == self.nick.lower()
-        user_obj = self.users.get(nick)
-        account = user_obj.account if user_obj else None
-
-        if self.config.core.nick_blocks or self.config.core.host_blocks:
-            nick_blocked = self._nick_blocked(pretrigger.nick)
-            host_blocked = self._host_blocked(pretrigger.host)
-        else:
-            nick_blocked = host_blocked = None
-        blocked = bool(nick_blocked or host_blocked)
+        rules = self._rules.get(pretrigger.event, text)
+        listeners = self._rules.listeners(pretrigger.event)
+        if not (rules or listeners):
+            # Nothing can be triggered by this line
+            return
 
         list_of_blocked_functions = []
-        for priority in ('high', 'medium', 'low'):
-            for regexp, funcs in self._callables[priority].items():
-                match = regexp.match(text)
-                if not match:
-                    continue
+        sender_state = restrictions = None
+        if listeners:
+            sender_state = self._get_sender_state(pretrigger)
+            restrictions = self._policy.get(pretrigger.sender)
+            list_of_blocked_functions.extend(self._notify_listeners(
+                listeners, pretrigger, sender_state, restrictions))
+
+        for regexp, funcs in rules:
+            match = regexp.match(text)
+            if not match:
+                continue
 
-                for func in funcs:
-                    trigger = Trigger(self.config, pretrigger, match, account)
+            if sender_state is None:
+                # Only look into the sender once something matched
+                sender_state = self._get_sender_state(pretrigger)
+                restrictions = self._policy.get(pretrigger.sender)
+            account, blocked, is_echo_message = sender_state
 
-                    # check blocked nick/host
-                    if blocked and not func.unblockable and not trigger.admin:
-                        function_name = "%s.%s" % (
-                            func.__module__, func.__name__
-                        )
-                        list_of_blocked_functions.append(function_name)
-                        continue
+            for func in funcs:
+                # check plugins and commands disabled in the channel
+                if restrictions is not None and restrictions.disables(func):
+                    continue
 
-                    # check event
-                    if event not in func.event:
-                        continue
+                trigger = Trigger(self.config, pretrigger, match, account)
 
-                    # check intents
-                    if hasattr(func, 'intents'):
-                        if not intent:
-                            continue
+                # check blocked nick/host
+                if blocked and not func.unblockable and not trigger.admin:
+                    function_name = "%s.%s" % (
+                        func.__module__, func.__name__
+                    )
+                    list_of_blocked_functions.append(function_name)
+                    continue
 
-                        match = any(
-                            func_intent.match(intent)
-                            for func_intent in func.intents
-                        )
-                        if not match:
-                            continue
+                # check intents
+                if hasattr(func, 'intents'):
+                    intent = pretrigger.tags.get('intent')
+                    if not intent:
+                        continue
 
-                    # check echo-message feature
-                    if is_echo_message and not func.echo:
+                    match = any(
+                        func_intent.match(intent)
+                        for func_intent in func.intents
+                    )
+                    if not match:
                         continue
 
-                    # call triggered function
-                    wrapper = SopelWrapper(self, trigger)
-                    if func.thread:
-                        targs = (func, wrapper, trigger)
-                        t = threading.Thread(target=self.call, args=targs)
-                        t.start()
-                    else:
-                        self.call(func, wrapper, trigger)
+                # check echo-message feature
+                if is_echo_message and not func.echo:
+                    continue
+
+                # call triggered function
+                wrapper = SopelWrapper(self, trigger)
+                if func.thread and not func._coroutine:
+                    self.workers.submit(
+                        func.__module__, self.call, func, wrapper, trigger)
+                else:
+                    self.call(func, wrapper, trigger)
 
         if list_of_blocked_functions:
+            nick_blocked, host_blocked = sender_state[1]
             if nick_blocked and host_blocked:
                 block_type = 'both'
             elif nick_blocked:
@@ -719,33 +821,107 @@ class Sopel(irc.Bot):
             LOGGER.info(
                 "[%s]%s prevented from using %s.",
                 block_type,
-                nick,
+                pretrigger.nick,
                 ', '.join(list_of_blocked_functions)
             )
 
-    def _host_blocked(self, host):
-        bad_masks = self.config.core.host_blocks
-        for bad_mask in bad_masks:
-            bad_mask = bad_mask.strip()
-            if not bad_mask:
+    def _notify_listeners(self, listeners, pretrigger, sender_state,
+                          restrictions):
+        # Hand the line to the listeners, and return the names of those that
+        # the sender is blocked from
+        account, blocked, is_echo_message = sender_state
+        blocked_functions = []
+        for func in listeners:
+            if restrictions is not None and restrictions.disables(func):
+                continue
+            if blocked and not func.unblockable:
+                blocked_functions.append(
+                    '%s.%s' % (func.__module__, func.__name__))
                 continue
-            if (re.match(bad_mask + '$', host, re.IGNORECASE) or
-                    bad_mask == host):
-                return True
-        return False
-
-    def _nick_blocked(self, nick):
-        bad_nicks = self.config.core.nick_blocks
-        for bad_nick in bad_nicks:
-            bad_nick = bad_nick.strip()
-            if not bad_nick:
+            if is_echo_message and not func.echo:
                 continue
-            if (re.match(bad_nick + '$', nick, re.IGNORECASE) or
-                    Identifier(bad_nick) == nick):
-                return True
-        return False
+            if func.thread and not func._coroutine:
+                self.listener_worker.submit(
+                    func.__module__, self._listen, func, pretrigger)
+            else:
+                self._listen(func, pretrigger)
+        return blocked_functions
+
+    def _listen(self, func, pretrigger):
+        # Call a listener, timing it like any other callable
+        if func._coroutine:
+            # Only the start of the coroutine is in order
+            def done(task):
+                if task.cancelled():
+                    return
+                try:
+                    task.result()
+                except Exception:  # TODO: Be specific
+                    self._listener_error(func, pretrigger, start)
+                else:
+                    self._profile_listener(func, pretrigger, start)
+
+            start = time.time()
+            self.coroutines.submit(func(self, pretrigger), done)
+            return
+
+        start = time.time()
+        try:
+            func(self, pretrigger)
+        except Exception:  # TODO: Be specific
+            self._listener_error(func, pretrigger, start)
+        else:
+            self._profile_listener(func, pretrigger, start)
+
+    def _listener_error(self, func, pretrigger, start):
+        self._profile_listener(func, pretrigger, start, error=True)
+        LOGGER.error('Error in listener %s.%s (%s)',
+                     func.__module__, func.__name__, pretrigger.line)
+        self.error()
+
+    def _profile_listener(self, func, pretrigger, start, error=False):
+        duration = time.time() - start
+        name = '%s.%s' % (func.__module__, func.__name__)
+        if self.call_stats.record(name, duration, error):
+            LOGGER.warning('Slow call to %s: %.3fs, on %s',
+                           name, duration, pretrigger.line)
+
+    def _get_sender_state(self, pretrigger):
+        # Get the sender's account, whether they are blocked, and whether the
+        # line is an echo of the bot's own message
+        nick = pretrigger.nick
+        user_obj = self.users.get(nick)
+        account = user_obj.account if user_obj else None
+
+        nick_blocked, host_blocked = self._blocks.check(nick, pretrigger.host)
+        blocked = None
+        if nick_blocked or host_blocked:
+            blocked = (nick_blocked, host_blocked)
+
+        is_echo_message = nick.lower() == self.nick.lower()
+        return account, blocked, is_echo_message
+
+    def _reset_connection_state(self):
+        irc.Bot._reset_connection_state(self)
+        self.server_capabilities = {}
+        self._batched_caps = {}
+        self.privileges = dict()
+        self.channels = tools.SopelMemory()
+        self.users = tools.SopelMemory()
 
     def _shutdown(self):
+        # Both ``handle_close`` and the run loop may get here first
+        if self._has_shut_down:
+            return
+        self._has_shut_down = True
+
+        if self.primary is not None:
+            # Plugins and jobs belong to the primary bot
+            if self.raw_log is not None:
+                self.raw_log.close()
+                self.raw_log = None
+            return
+
         # Stop Job Scheduler
         stderr('Stopping the Job Scheduler.')
         self.scheduler.stop()
@@ -759,6 +935,13 @@ class Sopel(irc.Bot):
 
         self.scheduler.clear_jobs()
 
+        # Let running and queued calls finish, for a while
+        stderr('Stopping the worker threads.')
+        self.workers.stop(timeout=5)
+        self.listener_worker.stop(timeout=5)
+        self.coroutines.stop(timeout=5)
+        sopel.tools.processes.pool.stop()
+
         # Shutdown plugins
         stderr(
             'Calling shutdown for %d modules.' % (len(self.shutdown_methods),)
@@ -780,6 +963,32 @@ class Sopel(irc.Bot):
         # Avoid calling shutdown methods if we already have.
         self.shutdown_methods = []
 
+        if self.raw_log is not None:
+            self.raw_log.close()
+            self.raw_log = None
+
+    def _get_cap_requests(self):
+        requests = []
+        for cap, reqs in tools.iteritems(self._cap_reqs):
+            # At this point, we know mandatory and prohibited don't co-exist,
+            # but we need to call back for optionals if they're also prohibited
+            prefix = ''
+            for entry in reqs:
+                if prefix == '-' and entry.prefix != '-':
+                    entry.failure(self, entry.prefix + cap)
+                    continue
+                if entry.prefix:
+                    prefix = entry.prefix
+            # Mandatory capabilities are requested like optional ones: the
+            # server NAKs those it doesn't have, which calls their failure
+            # callbacks
+            requests.append('-' + cap if prefix == '-' else cap)
+
+        if (self.config.core.auth_method == 'sasl' or
+                self.config.core.server_auth_method == 'sasl'):
+            requests.append('sasl')
+        return requests
+
     def cap_req(self, module_name, capability, arg=None, failure_callback=None,
                 success_callback=None):
         """Tell Sopel to request a capability when it starts.
@@ -13,8 +13,10 @@ from __future__ import unicode_literals, absolute_import, print_function, divisi
 import argparse
 import os
 import platform
+import random
 import signal
 import sys
+import threading
 import time
 import traceback
 
@@ -40,8 +42,86 @@ encounters such an error case.
 """
 
 
+def get_reconnect_delay(attempt, initial, ceiling):
+    """Get how long to wait before trying to reconnect.
+
+    :param int attempt: how many attempts failed in a row so far
+    :param int initial: delay before the first attempt, in seconds
+    :param int ceiling: longest possible delay, in seconds
+    :return: the delay in seconds
+    :rtype: float
+
+    The delay doubles with each attempt, up to ``ceiling``. Half of it is
+    random, so that many bots cut off at once don't all come back together.
+    """
+    delay = min(ceiling, initial * 2 ** min(attempt, 16))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def wait_to_reconnect(p, delay):
+    """Sleep ``delay`` seconds, unless the bot ``p`` is asked to quit."""
+    deadline = time.time() + delay
+    while not p.hasquit:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            break
+        time.sleep(min(remaining, 1))
+
+
+def reconnect(p, attempt, connected_at):
+    """Wait before the bot ``p`` reconnects to its network.
+
+    :param int attempt: how many attempts failed in a row so far
+    :param float connected_at: when the last connection started
+    :return: the new number of attempts
+    :rtype: int
+    """
+    core = p.config.core
+    # A connection that lasted a while was a good one: start over with
+    # short delays. Otherwise, back off.
+    if time.time() - connected_at > core.reconnect_max_delay:
+        attempt = 0
+    delay = get_reconnect_delay(attempt,
+                                core.reconnect_delay,
+                                core.reconnect_max_delay)
+    tools.stderr(
+        'Warning: Disconnected from %s. Reconnecting in %.0f seconds...'
+        % (p.network, delay))
+    wait_to_reconnect(p, delay)
+    return attempt + 1
+
+
+def run_network(p):
+    """Keep the bot ``p``, added with ``add_network``, connected."""
+    attempt = 0
+    while not p.hasquit:
+        connected_at = time.time()
+        try:
+            p.run(p.config.core.host, int(p.config.core.port))
+        except Exception:  # TODO: Be specific
+            tools.stderr(traceback.format_exc())
+        if p.hasquit:
+            break
+        attempt = reconnect(p, attempt, connected_at)
+    # The connection may have closed before the bot quit
+    p._shutdown()
+
+
+def quit_networks(p, message):
+    """Leave every network the bot ``p`` is still on, then send what's left.
+
+    :param str message: the ``QUIT`` message for the networks the bot hasn't
+                        quit yet
+    """
+    for network in p.networks.values():
+        if not network.hasquit:
+            network.quit(message)
+    # Give the networks a chance to send their QUIT
+    for network in p.networks.values():
+        network.flush_writer()
+
+
 def run(settings, pid_file, daemon=False):
-    delay = 20
     # Inject ca_certs from config to web for SSL validation of web requests
     if not settings.core.ca_certs:
         tools.stderr(
@@ -50,29 +130,49 @@ def run(settings, pid_file, daemon=False):
     def signal_handler(sig, frame):
         if sig == signal.SIGUSR1 or sig == signal.SIGTERM or sig == signal.SIGINT:
             tools.stderr('Got quit signal, shutting down.')
-            p.quit('Closing')
+            for network in p.networks.values():
+                network.quit('Closing')
         elif sig == signal.SIGUSR2 or sig == signal.SIGILL:
             tools.stderr('Got restart signal.')
+            for network in p.networks.values():
+                if network is not p:
+                    network.quit('Restarting')
             p.restart('Restarting')
 
     # Define empty variable `p` for bot
     p = None
+    attempt = 0
     while True:
         if p and p.hasquit:  # Check if `hasquit` was set for bot during disconnected phase
+            # The bot was not connected, so nothing shut it down yet
+            p._shutdown()
+            if p.wantsrestart:
+                quit_networks(p, 'Restarting')
+                return -1
             break
         try:
-            p = bot.Sopel(settings, daemon=daemon)
-            if hasattr(signal, 'SIGUSR1'):
-                signal.signal(signal.SIGUSR1, signal_handler)
-            if hasattr(signal, 'SIGTERM'):
-                signal.signal(signal.SIGTERM, signal_handler)
-            if hasattr(signal, 'SIGINT'):
-                signal.signal(signal.SIGINT, signal_handler)
-            if hasattr(signal, 'SIGUSR2'):
-                signal.signal(signal.SIGUSR2, signal_handler)
-            if hasattr(signal, 'SIGILL'):
-                signal.signal(signal.SIGILL, signal_handler)
-            logger.setup_logging(p)
+            # The bot is built once: reconnecting keeps its plugins, database,
+            # and memory, and only resets the connection's state
+            if p is None:
+                p = bot.Sopel(settings, daemon=daemon)
+                if hasattr(signal, 'SIGUSR1'):
+                    signal.signal(signal.SIGUSR1, signal_handler)
+                if hasattr(signal, 'SIGTERM'):
+                    signal.signal(signal.SIGTERM, signal_handler)
+                if hasattr(signal, 'SIGINT'):
+                    signal.signal(signal.SIGINT, signal_handler)
+                if hasattr(signal, 'SIGUSR2'):
+                    signal.signal(signal.SIGUSR2, signal_handler)
+                if hasattr(signal, 'SIGILL'):
+                    signal.signal(signal.SIGILL, signal_handler)
+                logger.setup_logging(p)
+                for name in settings.core.networks:
+                    thread = threading.Thread(target=run_network,
+                                              args=(p.add_network(name),),
+                                              name='sopel-%s' % name)
+                    thread.daemon = True
+                    thread.start()
+            connected_at = time.time()
             p.run(settings.core.host, int(settings.core.port))
         except KeyboardInterrupt:
             break
@@ -95,15 +195,18 @@ def run(settings, pid_file, daemon=False):
             os.unlink(pid_file)
             os._exit(1)
 
-        if not isinstance(delay, int):
-            break
         if p.wantsrestart:
+            # The connection may have closed before the bot quit
+            p._shutdown()
+            quit_networks(p, 'Restarting')
             return -1
         if p.hasquit:
             break
-        tools.stderr(
-            'Warning: Disconnected. Reconnecting in %s seconds...' % delay)
-        time.sleep(delay)
+        attempt = reconnect(p, attempt, connected_at)
+
+    if p is not None:
+        p._shutdown()
+        quit_networks(p, 'Closing')
     # TODO: This should be handled by command_start
     # All we should need here is a return value, but making this
     # a return makes Sopel hang on ^C after it says "Closed!"
@@ -39,6 +39,7 @@ __all__ = [
     'ConfigurationError',
     'ConfigurationNotFound',
     'Config',
+    'NetworkConfig',
 ]
 
 DEFAULT_HOMEDIR = os.path.join(os.path.expanduser('~'), '.sopel')
@@ -63,6 +64,36 @@ class ConfigurationNotFound(ConfigurationError):
         return 'Unable to find the configuration file %s' % self.filename
 
 
+class _Parser(ConfigParser.RawConfigParser):
+    """A config parser counting the changes made to it.
+
+    What's computed from the configuration can then be kept until
+    :attr:`Config.version` changes.
+    """
+    changes = 0
+
+    def read(self, *args, **kwargs):
+        self.changes += 1
+        return ConfigParser.RawConfigParser.read(self, *args, **kwargs)
+
+    def add_section(self, section):
+        self.changes += 1
+        return ConfigParser.RawConfigParser.add_section(self, section)
+
+    def remove_section(self, section):
+        self.changes += 1
+        return ConfigParser.RawConfigParser.remove_section(self, section)
+
+    def set(self, section, option, value=None):
+        self.changes += 1
+        return ConfigParser.RawConfigParser.set(self, section, option, value)
+
+    def remove_option(self, section, option):
+        self.changes += 1
+        return ConfigParser.RawConfigParser.remove_option(
+            self, section, option)
+
+
 class Config(object):
     def __init__(self, filename, validate=True):
         """The bot's configuration.
@@ -78,7 +109,7 @@ class Config(object):
         self.filename = filename
         self.basename = os.path.basename(filename).rsplit('.', 1)[0]
         """The config object's associated file, as noted above."""
-        self.parser = ConfigParser.RawConfigParser(allow_no_value=True)
+        self.parser = _Parser(allow_no_value=True)
         self.parser.read(self.filename)
         self.define_section('core', core_section.CoreSection,
                             validate=validate)
@@ -97,6 +128,14 @@ class Config(object):
         else:
             return os.path.dirname(self.filename)
 
+    @property
+    def version(self):
+        """A number that changes whenever the configuration is changed.
+
+        .. versionadded:: 7.0
+        """
+        return getattr(self.parser, 'changes', 0)
+
     def save(self):
         """Save all changes to the config file."""
         cfgfile = open(self.filename, 'w')
@@ -114,6 +153,15 @@ class Config(object):
         except ConfigParser.DuplicateSectionError:
             return False
 
+    def network(self, name):
+        """Get the configuration of an additional network.
+
+        :param str name: the network's name, as listed in
+                         :attr:`~sopel.config.core_section.CoreSection.networks`
+        :rtype: :class:`NetworkConfig`
+        """
+        return NetworkConfig(self, name)
+
     def define_section(self, name, cls_, validate=True):
         """Define the available settings in a section.
 
@@ -209,3 +257,80 @@ class Config(object):
         if not ans:
             ans = d
         return ans.lower() == 'y'
+
+
+class _NetworkParser(object):
+    """A config parser reading a network's section before ``[core]``.
+
+    Settings written to ``[core]`` are written to the network's section, so
+    they only apply to that network.
+    """
+    def __init__(self, parser, section):
+        self._parser = parser
+        self._section = section
+
+    def _section_for(self, section, option):
+        if (section == 'core' and
+                self._parser.has_option(self._section, option)):
+            return self._section
+        return section
+
+    def has_option(self, section, option):
+        return self._parser.has_option(self._section_for(section, option),
+                                       option)
+
+    def get(self, section, option):
+        return self._parser.get(self._section_for(section, option), option)
+
+    def set(self, section, option, value):
+        if section == 'core':
+            section = self._section
+        self._parser.set(section, option, value)
+
+    def remove_option(self, section, option):
+        return self._parser.remove_option(self._section_for(section, option),
+                                          option)
+
+    def __getattr__(self, name):
+        return getattr(self._parser, name)
+
+
+class NetworkConfig(object):
+    """The configuration of an additional network.
+
+    :param config: the bot's configuration
+    :type config: :class:`Config`
+    :param str name: the network's name
+
+    The network is configured in a ``[network:<name>]`` section of the
+    configuration file, where any setting of the ``[core]`` section can be
+    overridden, for example ``host``, ``nick``, or ``channels``. Its ``core``
+    attribute reads that section first, then ``[core]``; every other section
+    is shared with ``config``.
+
+    .. versionadded:: 7.0
+    """
+    def __init__(self, config, name):
+        section = 'network:%s' % name
+        if not config.parser.has_section(section):
+            config.parser.add_section(section)
+        object.__setattr__(self, '_config', config)
+        object.__setattr__(self, 'parser', _NetworkParser(config.parser, section))
+        object.__setattr__(self, 'network', name)
+        """The network's name."""
+        object.__setattr__(self, 'basename',
+                           '%s.%s' % (config.basename, name))
+        object.__setattr__(self, 'core', core_section.CoreSection(
+            self, 'core', validate=False))
+
+    def __getattr__(self, name):
+        return getattr(self._config, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._config, name, value)
+
+    def __getitem__(self, name):
+        return self.__getattr__(name)
+
+    def __contains__(self, name):
+        return name in self._config
@@ -116,6 +116,22 @@ class CoreSection(StaticSection):
     channels = ListAttribute('channels')
     """List of channels for the bot to join when it connects"""
 
+    connect_timeout = ValidatedAttribute('connect_timeout', int, default=30)
+    """Seconds to wait for a server to accept the connection.
+
+    When this runs out, the next server in :attr:`servers` is tried.
+    """
+
+    connection_backend = ChoiceAttribute('connection_backend',
+                                         choices=['asynchat', 'asyncio'],
+                                         default='asynchat')
+    """The library used to manage the connection to the server.
+
+    Can be ``asynchat`` or ``asyncio``. The ``asyncio`` backend requires
+    Python 3.5.2 or newer, and is always used on Python versions that no
+    longer ship :mod:`asynchat` (3.12 and up).
+    """
+
     db_type = ChoiceAttribute('db_type', choices=[
         'sqlite', 'mysql', 'postgres', 'mssql', 'oracle', 'firebird', 'sybase'], default='sqlite')
     """The type of database to use for Sopel's database.
@@ -185,9 +201,44 @@ class CoreSection(StaticSection):
 
     Regular expression syntax is used"""
 
+    incoming_encodings = ListAttribute(
+        'incoming_encodings',
+        strip=True,
+        default=['utf-8', 'cp1252', 'iso8859-1'])
+    """Encodings to try, in order, when decoding lines from the server.
+
+    A line that none of them can decode is discarded. The default ends with
+    ``iso8859-1``, which can decode anything.
+    """
+
     log_raw = ValidatedAttribute('log_raw', bool, default=False)
     """Whether a log of raw lines as sent and received should be kept."""
 
+    log_raw_compress = ValidatedAttribute('log_raw_compress', bool,
+                                          default=False)
+    """Whether rotated raw logs should be compressed with gzip."""
+
+    log_raw_max_bytes = ValidatedAttribute('log_raw_max_bytes', int, default=0)
+    """Rotate the raw log once it reaches this size, in bytes.
+
+    The default, ``0``, disables size-based rotation.
+    """
+
+    log_raw_queue_size = ValidatedAttribute('log_raw_queue_size', int,
+                                            default=10000)
+    """How many raw lines can wait to be written before new ones are dropped.
+
+    Lines are dropped rather than slowing down the connection when the disk
+    can't keep up.
+    """
+
+    log_raw_rotate_interval = ValidatedAttribute('log_raw_rotate_interval', int,
+                                                 default=0)
+    """Rotate the raw log after this many seconds.
+
+    The default, ``0``, disables time-based rotation.
+    """
+
     logdir = FilenameAttribute('logdir', directory=True, default='logs')
     """Directory in which to place logs."""
 
@@ -244,6 +295,32 @@ class CoreSection(StaticSection):
     name = ValidatedAttribute('name', default='Sopel: https://sopel.chat')
     """The "real name" of your bot for WHOIS responses."""
 
+    network = ValidatedAttribute('network')
+    """The name of the network the bot connects to.
+
+    It is available to plugins as ``trigger.network``. If not specified, this
+    defaults to :attr:`host`.
+    """
+
+    networks = ListAttribute('networks')
+    """Names of additional networks to connect to, from the same process.
+
+    Each network is configured in a ``[network:<name>]`` section, where any
+    setting of this section can be overridden; unset settings are read from
+    ``[core]``. For example::
+
+        [core]
+        nick = Sopel
+        host = irc.example.net
+        networks = other
+
+        [network:other]
+        host = irc.example.org
+        channels = #sopel
+
+    All networks share the same plugins, database, and memory.
+    """
+
     nick = ValidatedAttribute('nick', Identifier, default=Identifier('Sopel'))
     """The nickname for the bot"""
 
@@ -285,6 +362,13 @@ class CoreSection(StaticSection):
     set to true, so that the bot will not run until it has been properly
     configured."""
 
+    outbound_queue_size = ValidatedAttribute('outbound_queue_size', int,
+                                             default=1000)
+    """How many outbound lines can wait to be sent before new ones are dropped.
+
+    Keep-alive and registration lines are never dropped.
+    """
+
     owner = ValidatedAttribute('owner', default=NO_DEFAULT)
     """The IRC name of the owner of the bot."""
 
@@ -310,6 +394,31 @@ class CoreSection(StaticSection):
     It is a regular expression (so the default, ``\\.``, means commands start
     with a period), though using capturing groups will create problems."""
 
+    process_memory_limit = ValidatedAttribute('process_memory_limit', int,
+                                              default=512)
+    """How much memory each plugin worker process can use, in MiB.
+
+    Set to 0 for no limit. The limit can only be enforced on Unix.
+    """
+
+    process_workers = ValidatedAttribute('process_workers', int, default=2)
+    """How many worker processes run CPU-bound plugin functions.
+
+    See :func:`sopel.module.process`. Set to 0 to run these functions in the
+    calling thread instead, without any time or memory limit.
+    """
+
+    reconnect_delay = ValidatedAttribute('reconnect_delay', int, default=5)
+    """Seconds to wait before the first attempt to reconnect.
+
+    The delay doubles after each failed attempt, with some random jitter, up
+    to :attr:`reconnect_max_delay`.
+    """
+
+    reconnect_max_delay = ValidatedAttribute('reconnect_max_delay', int,
+                                             default=300)
+    """The longest delay between two attempts to reconnect, in seconds."""
+
     reply_errors = ValidatedAttribute('reply_errors', bool, default=True)
     """Whether to message the sender of a message that triggered an error with the exception."""
 
@@ -331,6 +440,22 @@ class CoreSection(StaticSection):
     server_auth_username = ValidatedAttribute('server_auth_username')
     """The username/account to use to authenticate with the server."""
 
+    servers = ListAttribute('servers')
+    """Other servers to connect to when :attr:`host` can't be reached.
+
+    Each server is written as ``host``, ``host:port``, or ``[ipv6]:port``;
+    when the port is omitted, :attr:`port` is used. Servers that failed are
+    tried last, and among the others, the fastest to connect is tried first.
+    """
+
+    slow_call_threshold = ValidatedAttribute('slow_call_threshold', float,
+                                             default=5)
+    """How long a callable or job can run before it's logged, in seconds.
+
+    The warning names the callable, and the line that triggered it. Set to 0
+    to never log slow calls.
+    """
+
     throttle_join = ValidatedAttribute('throttle_join', int)
     """Slow down the initial join of channels to prevent getting kicked.
 
@@ -349,11 +474,54 @@ class CoreSection(StaticSection):
     verify_ssl = ValidatedAttribute('verify_ssl', bool, default=True)
     """Whether to require a trusted SSL certificate for SSL connections."""
 
+    worker_overflow = ChoiceAttribute('worker_overflow',
+                                      choices=['drop_new', 'drop_oldest'],
+                                      default='drop_oldest')
+    """What to do with threaded calls when the worker queue is full.
+
+    Can be ``drop_new`` to drop the call being queued, or ``drop_oldest`` to
+    drop the call that has waited the longest.
+    """
+
+    worker_plugin_limit = ValidatedAttribute('worker_plugin_limit', int,
+                                             default=4)
+    """How many threaded calls of the same plugin can run at once.
+
+    Set to 0 for no limit.
+    """
+
+    worker_queue_size = ValidatedAttribute('worker_queue_size', int,
+                                           default=1000)
+    """How many threaded calls can wait for a worker thread.
+
+    See :attr:`worker_overflow` for what happens to calls beyond that.
+    """
+
+    worker_threads = ValidatedAttribute('worker_threads', int, default=16)
+    """How many worker threads run threaded callables and jobs."""
+
     flood_burst_lines = ValidatedAttribute('flood_burst_lines', int, default=4)
-    """How many messages can be sent in burst mode."""
+    """How many messages can be sent to the same target in burst mode.
+
+    Set to 0 to not throttle messages by target.
+    """
 
     flood_empty_wait = ValidatedAttribute('flood_empty_wait', float, default=0.7)
     """How long to wait between sending messages when not in burst mode, in seconds."""
 
     flood_refill_rate = ValidatedAttribute('flood_refill_rate', int, default=1)
     """How quickly burst mode recovers, in messages per second."""
+
+    flood_server_burst_lines = ValidatedAttribute(
+        'flood_server_burst_lines', int, default=10)
+    """How many lines can be sent to the server in a burst, to all targets.
+
+    Set to 0 for no limit. Keep-alive and registration lines are not counted.
+    """
+
+    flood_server_refill_rate = ValidatedAttribute(
+        'flood_server_refill_rate', float, default=2)
+    """How quickly the server burst recovers, in lines per second.
+
+    Set to 0 for no limit.
+    """
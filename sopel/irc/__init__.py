@@ -0,0 +1,895 @@
+# coding=utf-8
+# irc.py - An Utility IRC Bot
+# Copyright 2008, Sean B. Palmer, inamidst.com
+# Copyright 2012, Elsie Powell, http://embolalia.com
+# Copyright © 2012, Elad Alfassa <elad@fedoraproject.org>
+#
+# Licensed under the Eiffel Forum License 2.
+#
+# When working on core IRC protocol related features, consult protocol
+# documentation at http://www.irchelp.org/irchelp/rfc/
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+import collections
+import sys
+import socket
+import os
+import codecs
+import traceback
+from sopel.irc.keepalive import KeepAlive, monotonic
+from sopel.irc.rawlog import RawLogWriter
+from sopel.irc.servers import ServerList, create_connection, parse_server
+from sopel.irc.writer import OutboundQueue, SendFuture
+from sopel.logger import get_logger
+from sopel.tools import stderr, truncate_message, Identifier
+from sopel.trigger import PreTrigger
+try:
+    import ssl
+    has_ssl = True
+except ImportError:
+    # no SSL support
+    has_ssl = False
+
+try:
+    import asynchat
+    import asyncore
+except ImportError:
+    # Removed in Python 3.12; only the asyncio backend is available there
+    asynchat = asyncore = None
+
+import errno
+import threading
+from datetime import datetime
+if sys.version_info.major >= 3:
+    unicode = str
+
+
+__all__ = ['Bot']
+
+LOGGER = get_logger(__name__)
+
+if asynchat is not None:
+    _Dispatcher = asynchat.async_chat
+else:
+    _Dispatcher = object
+
+
+class Bot(_Dispatcher):
+    def __init__(self, config, socket_map=None):
+        ca_certs = config.core.ca_certs
+
+        if asynchat is not None:
+            # Bots connected to other networks from the same process each have
+            # their own map, so each can run its own loop
+            asynchat.async_chat.__init__(self, map=socket_map)
+            # Line splitting is done by collect_incoming_data itself
+            self.set_terminator(None)
+        else:
+            self.socket = None
+            self.connected = False
+        self.buffer = ''
+        self._recv_buffer = bytearray()
+        self._encodings = []
+        for encoding in config.core.incoming_encodings:
+            try:
+                self._encodings.append(codecs.lookup(encoding).name)
+            except LookupError:
+                LOGGER.warning('Unknown encoding %r ignored', encoding)
+
+        self.nick = Identifier(config.core.nick)
+        """Sopel's current ``Identifier``. Changing this while Sopel is running is
+        untested."""
+        self.user = config.core.user
+        """Sopel's user/ident."""
+        self.name = config.core.name
+        """Sopel's "real name", as used for whois."""
+        self.network = config.core.network or config.core.host
+        """The name of the network Sopel is connected to."""
+
+        self.stack = collections.OrderedDict()
+        self.ca_certs = ca_certs
+        self.enabled_capabilities = set()
+        self.hasquit = False
+        self.wantsrestart = False
+
+        self.sending = threading.RLock()
+        self.writing_lock = threading.Lock()
+        self.raw = None
+        self._handled_close = False
+
+        self.raw_log = None
+        """The :class:`~sopel.irc.rawlog.RawLogWriter` of the raw log.
+
+        This is ``None`` until the first line is logged, and when
+        :attr:`~sopel.config.core_section.CoreSection.log_raw` is disabled.
+        """
+
+        self._ssl_context = None
+        # TLS state kept across reconnections: the last session, to resume
+        # it, and for each server, the hostname its certificate is checked
+        # against if not its own, and the CNAMEs left to try
+        self._tls_session = None
+        self._tls_names = {}
+        self._tls_cnames = {}
+
+        self.servers = ServerList()
+        """The :class:`~sopel.irc.servers.ServerList` of servers to connect to.
+
+        It holds the server given to :meth:`run`, then the ones from
+        :attr:`~sopel.config.core_section.CoreSection.servers`, and how fast
+        each one was to connect.
+        """
+        for entry in config.core.servers:
+            try:
+                self.servers.add(*parse_server(entry, config.core.port))
+            except ValueError:
+                LOGGER.warning('Invalid server %r ignored', entry)
+
+        self.server = None
+        """The ``(host, port)`` of the server Sopel last connected to."""
+        self._handshaking = False
+        self._handshake_wants_write = False
+
+        self.keepalive = None
+        """The connection's :class:`~sopel.irc.keepalive.KeepAlive` timer.
+
+        Its ``lag`` attribute is the round trip time of the last PING sent to
+        the server. This is ``None`` until the bot connects.
+        """
+
+        self.writer = None
+        """The connection's :class:`~sopel.irc.writer.OutboundQueue`.
+
+        Its counters (``depth``, ``sent``, ``dropped``, ``average_latency``...)
+        describe the outbound traffic of the current connection. This is
+        ``None`` until the bot connects; once disconnected, it is the stopped
+        queue of the last connection.
+        """
+
+        # Right now, only accounting for two op levels.
+        # This might be expanded later.
+        # These lists are filled in startup.py, as of right now.
+        # Are these even touched at all anymore? Remove in 7.0.
+        self.ops = dict()
+        """Deprecated. Use bot.channels instead."""
+        self.halfplus = dict()
+        """Deprecated. Use bot.channels instead."""
+        self.voices = dict()
+        """Deprecated. Use bot.channels instead."""
+
+        # We need this to prevent error loops in handle_error
+        self.error_count = 0
+
+        self.connection_registered = False
+        """ Set to True when a server has accepted the client connection and
+        messages can be sent and received. """
+
+        self.registration_time = None
+        """Seconds between the start of the current connection and the
+        server's welcome (``001``); ``None`` until then."""
+        self._connect_started = monotonic()
+
+        # Work around bot.connecting missing in Python older than 2.7.4
+        if not hasattr(self, "connecting"):
+            self.connecting = False
+
+    def log_raw(self, line, prefix):
+        """Log raw line to the raw log.
+
+        :param str line: the raw line
+        :param str prefix: ``>>`` for outgoing lines, ``<<`` for incoming ones
+
+        The line is only queued: a :class:`~sopel.irc.rawlog.RawLogWriter`
+        thread writes it to disk.
+        """
+        if not self.config.core.log_raw:
+            return
+        if self.raw_log is None:
+            self.raw_log = self._start_raw_log()
+        self.raw_log.put(line, prefix)
+
+    def _start_raw_log(self):
+        core = self.config.core
+        if not os.path.isdir(core.logdir):
+            try:
+                os.mkdir(core.logdir)
+            except Exception as e:
+                stderr('There was a problem creating the logs directory.')
+                stderr('%s %s' % (str(e.__class__), str(e)))
+                stderr('Please fix this and then run Sopel again.')
+                os._exit(1)
+        writer = RawLogWriter(
+            os.path.join(core.logdir, self.config.basename + '.raw.log'),
+            max_bytes=core.log_raw_max_bytes,
+            rotate_interval=core.log_raw_rotate_interval,
+            compress=core.log_raw_compress,
+            maxsize=core.log_raw_queue_size)
+        writer.start()
+        return writer
+
+    def safe(self, string):
+        """Remove newlines from a string."""
+        if sys.version_info.major >= 3 and isinstance(string, bytes):
+            string = string.decode("utf8")
+        elif sys.version_info.major < 3:
+            if not isinstance(string, unicode):
+                string = unicode(string, encoding='utf8')
+        string = string.replace('\n', '')
+        string = string.replace('\r', '')
+        return string
+
+    def write(self, args, text=None, future=False):
+        """Queue a command for sending to the server.
+
+        :param args: an iterable of strings, which will be joined by spaces
+        :type args: :term:`iterable`
+        :param str text: a string that will be prepended with a ``:`` and added
+                         to the end of the command
+        :param bool future: if ``True``, return a handle that completes when
+                            the line is actually sent
+        :return: a :class:`~sopel.irc.writer.SendFuture` if ``future`` is
+                 ``True``, ``None`` otherwise
+
+        This never blocks: the line is sent by the connection's writer thread.
+        """
+        args = [self.safe(arg) for arg in args]
+        if text is not None:
+            text = self.safe(text)
+
+        # From RFC2812 Internet Relay Chat: Client Protocol
+        # Section 2.3
+        #
+        # https://tools.ietf.org/html/rfc2812.html
+        #
+        # IRC messages are always lines of characters terminated with a
+        # CR-LF (Carriage Return - Line Feed) pair, and these messages SHALL
+        # NOT exceed 512 characters in length, counting all characters
+        # including the trailing CR-LF. Thus, there are 510 characters
+        # maximum allowed for the command and its parameters. There is no
+        # provision for continuation of message lines.
+
+        if text is not None:
+            temp = (' '.join(args) + ' :' + text)
+        else:
+            temp = ' '.join(args)
+
+        # The max length of 512 is in bytes, not unicode
+        temp = truncate_message(temp, 510)
+
+        # Ends the message with CR-LF
+        temp = temp + '\r\n'
+
+        handle = SendFuture() if future else None
+        if self.writer is None:
+            # Not connected yet: nothing to queue behind, send it right away
+            with self.writing_lock:
+                self.log_raw(temp, '>>')
+                self.send(temp.encode('utf-8'))
+            if handle is not None:
+                handle.set_result()
+        else:
+            # Keep-alive and registration lines can't wait behind a backlog
+            priority = (args[0].upper() in ('PING', 'PONG') or
+                        not self.connection_registered)
+            # Messages are throttled by target, see sopel.irc.writer
+            target = None
+            if args[0].upper() in ('PRIVMSG', 'NOTICE') and len(args) > 1:
+                target = Identifier(args[1])
+            self.writer.put(temp.encode('utf-8'), temp, priority, handle,
+                            target=target, length=len(text or ''))
+
+        # Simulate echo-message
+        if ('echo-message' not in self.enabled_capabilities and
+                args[0].upper() in ['PRIVMSG', 'NOTICE']):
+            # Use the hostmask we think the IRC server is using for us,
+            # or something reasonable if that's not available
+            host = 'localhost'
+            if self.config.core.bind_host:
+                host = self.config.core.bind_host
+            else:
+                try:
+                    host = self.hostmask
+                except KeyError:
+                    pass  # we tried, and that's good enough
+
+            pretrigger = PreTrigger(
+                self.nick,
+                ":{0}!{1}@{2} {3}".format(self.nick, self.user, host, temp),
+                self.network
+            )
+            self.dispatch(pretrigger)
+
+        return handle
+
+    @property
+    def backend(self):
+        """The name of the connection backend in use.
+
+        This is the value of
+        :attr:`~sopel.config.core_section.CoreSection.connection_backend`,
+        except on Python versions without :mod:`asynchat`, where it is always
+        ``asyncio``.
+        """
+        if asynchat is None:
+            return 'asyncio'
+        return self.config.core.connection_backend
+
+    def run(self, host, port=6667):
+        self._reset_connection_state()
+        self._connect_started = monotonic()
+        # The given server is the preferred one, until it proves otherwise
+        self.servers.add(host, port, first=True)
+        try:
+            if self.backend == 'asyncio':
+                from sopel.irc import backends
+                backends.run_asyncio(self, host, port)
+            else:
+                self.initiate_connect(host, port)
+        except socket.error as e:
+            stderr('Connection error: %s' % e)
+            self.handle_close()
+
+    def _reset_connection_state(self):
+        """Forget everything about the previous connection.
+
+        This is called before connecting, so the same bot can reconnect
+        without being rebuilt: loaded plugins, the database, and the bot's
+        memory are kept, only the connection's state is reset.
+        """
+        if asynchat is not None:
+            self.discard_buffers()
+        self.buffer = ''
+        self._recv_buffer = bytearray()
+        self.stack = collections.OrderedDict()
+        self.enabled_capabilities = set()
+        self.connection_registered = False
+        self.registration_time = None
+        self._handled_close = False
+        self.nick = Identifier(self.config.core.nick)
+
+    def _connect_any(self, connect):
+        """Connect to the best server that accepts the connection.
+
+        :param connect: function called with a server's ``(host, port)``;
+                        it returns the connection, or raises
+                        :exc:`socket.error`
+        :type connect: :term:`function`
+        :return: whatever ``connect`` returned for the first server that
+                 accepted the connection
+        :raise socket.error: if no server accepted the connection
+
+        Each server's result is recorded in :attr:`servers`, and the server
+        connected to becomes :attr:`server`.
+        """
+        error = socket.error('No server to connect to')
+        for server in self.servers.ordered():
+            stderr('Connecting to %s:%s...' % server)
+            started = monotonic()
+            try:
+                connection = connect(server)
+            except socket.error as e:
+                stderr('Could not connect to %s:%s: %s' % (server + (e,)))
+                self.servers.record_failure(server)
+                error = e
+                continue
+            self.servers.record_success(server, monotonic() - started)
+            self.server = server
+            return connection
+        raise error
+
+    def initiate_connect(self, host, port):
+        self.servers.add(host, port, first=True)
+        source_address = ((self.config.core.bind_host, 0)
+                          if self.config.core.bind_host else None)
+        self.set_socket(self._connect_any(
+            lambda server: create_connection(
+                server,
+                timeout=self.config.core.connect_timeout,
+                source_address=source_address)))
+        if self.config.core.use_ssl and has_ssl:
+            self.send = self._ssl_send
+            self.recv = self._ssl_recv
+        elif not has_ssl and self.config.core.use_ssl:
+            stderr('SSL is not avilable on your system, attempting connection '
+                   'without it')
+        # Already connected: this only lets asyncore know, without resolving
+        # the host again
+        self.connect(self.socket.getpeername())
+        try:
+            asyncore.loop(map=self._map)
+        except KeyboardInterrupt:
+            print('KeyboardInterrupt')
+            self.quit('KeyboardInterrupt')
+            self.flush_writer()
+
+    def restart(self, message):
+        """Disconnect from IRC and restart the bot."""
+        self.write(['QUIT'], message)
+        self.wantsrestart = True
+        self.hasquit = True
+
+    def quit(self, message):
+        """Disconnect from IRC and close the bot."""
+        if self.connected:  # Only send QUIT message if socket is open
+            self.write(['QUIT'], message)
+        self.hasquit = True
+        # Wait for acknowledgement from the server. By RFC 2812 it should be
+        # an ERROR msg, but many servers just close the connection. Either way
+        # is fine by us.
+        # Closing the connection now would mean that stuff in the buffers that
+        # has not yet been processed would never be processed. It would also
+        # release the main thread, which is problematic because whomever called
+        # quit might still want to do something before main thread quits.
+
+    def flush_writer(self, timeout=5):
+        """Send every queued line, then stop the writer thread.
+
+        :param float timeout: how long to wait for the queue to drain, in
+                              seconds
+
+        This is used when the bot is about to exit, so that the last lines,
+        such as ``QUIT``, make it to the server.
+        """
+        writer = self.writer
+        if writer is None:
+            return
+        writer.stop()
+        writer.join(timeout)
+
+    def handle_close(self):
+        # The asyncio backend calls this once its connection is lost, unless
+        # the bot already did
+        self._handled_close = True
+        self.connection_registered = False
+        self._handshaking = False
+        if has_ssl and isinstance(self.socket, ssl.SSLSocket):
+            # Resumption tickets may arrive after the handshake: save the
+            # session once the connection is over
+            self._save_tls_session()
+
+        if self.keepalive is not None:
+            self.keepalive.stop()
+            self.keepalive = None
+        if self.writer is not None:
+            # Keep the stopped queue: it drops what is written until the next
+            # connection, and its counters stay available until then.
+            self.writer.stop(discard=True)
+
+        # Plugins and jobs are kept across reconnections; only shut them down
+        # when the bot is leaving for good.
+        if self.hasquit and hasattr(self, '_shutdown'):
+            self._shutdown()
+        stderr('Closed!')
+
+        # This will eventually call asyncore dispatchers close method, which
+        # will release the main thread. This should be called last to avoid
+        # race conditions. The asyncio backend has no socket of its own, but
+        # replaces ``close`` while its transport is connected.
+        if self.socket or (self.backend == 'asyncio' and self.connected):
+            self.close()
+
+    def handle_connect(self):
+        """
+        Connect to IRC server, handle TLS and authenticate
+        user if an account exists.
+        """
+        # handle potential TLS connection
+        if self.config.core.use_ssl and has_ssl:
+            from sopel.irc.backends import get_ssl_context
+            hostname = self._tls_names.get(self.server[0], self.server[0])
+            kwargs = {}
+            if self._tls_session is not None and self._tls_session[0] == hostname:
+                # Resume the previous connection's session, if the server
+                # still knows it; this skips most of the handshake
+                kwargs['session'] = self._tls_session[1]
+            # The handshake is driven by the socket's events (see
+            # _do_handshake), so it never blocks the connection's loop
+            self.socket.setblocking(False)
+            self.ssl = get_ssl_context(self).wrap_socket(
+                self.socket,
+                server_hostname=hostname,
+                do_handshake_on_connect=False,
+                suppress_ragged_eofs=True,
+                **kwargs)
+            self.set_socket(self.ssl)
+            self._handshaking = True
+            self._do_handshake()
+            return
+
+        self._on_connected()
+
+    def _do_handshake(self):
+        """Go on with the TLS handshake, as far as the socket allows."""
+        try:
+            self.socket.do_handshake()
+        except ssl.SSLWantReadError:
+            self._handshake_wants_write = False
+            return
+        except ssl.SSLWantWriteError:
+            self._handshake_wants_write = True
+            return
+        except ssl.CertificateError as error:
+            self._handshaking = False
+            self._handle_certificate_error(error)
+            return
+        except (ssl.SSLError, socket.error) as error:
+            self._handshaking = False
+            stderr('TLS handshake failed: %s' % error)
+            self.handle_close()
+            return
+
+        self._handshaking = False
+        if getattr(self.socket, 'session_reused', False):
+            LOGGER.info('TLS session resumed')
+        self._on_connected()
+
+    def _handle_certificate_error(self, error):
+        if getattr(error, 'verify_code', None) not in (None, 62):
+            # Not a hostname mismatch (62 is X509_V_ERR_HOSTNAME_MISMATCH)
+            stderr('Invalid certificate: %s' % error)
+            self.handle_close()
+            return
+
+        # the host in config and certificate don't match
+        LOGGER.error("hostname mismatch between configuration and certificate")
+        host = self.server[0]
+        if host not in self._tls_cnames:
+            # Only look for CNAMEs now that they're needed, and only once
+            try:
+                self._tls_cnames[host] = self._get_cnames(host)
+            except Exception as e:  # TODO: Be specific
+                LOGGER.warning("could not look up CNAMEs of %s: %s", host, e)
+                self._tls_cnames[host] = []
+        if self._tls_cnames[host]:
+            # check if a CNAME matches as a fallback, on the next connection
+            self._tls_names[host] = self._tls_cnames[host].pop(0)
+            LOGGER.warning("trying {0} instead of {1} for TLS connection"
+                           .format(self._tls_names[host], host))
+            self.handle_close()
+            return
+
+        # everything is broken
+        stderr("Invalid certificate, hostname mismatch!")
+        LOGGER.error("invalid certificate, no hostname matches")
+        if hasattr(self.config.core, 'pid_file_path'):
+            os.unlink(self.config.core.pid_file_path)
+            os._exit(1)
+        self.handle_close()
+
+    def _save_tls_session(self):
+        session = getattr(self.socket, 'session', None)
+        if session is not None:
+            hostname = self._tls_names.get(self.server[0], self.server[0])
+            self._tls_session = (hostname, session)
+
+    def handle_read(self):
+        if self._handshaking:
+            self._do_handshake()
+        else:
+            _Dispatcher.handle_read(self)
+
+    def handle_write(self):
+        if self._handshaking:
+            self._do_handshake()
+        else:
+            _Dispatcher.handle_write(self)
+
+    def writable(self):
+        if self._handshaking:
+            return self._handshake_wants_write
+        return _Dispatcher.writable(self)
+
+    def _on_connected(self):
+        """Register with the server once the transport is ready.
+
+        This is shared by every connection backend: the asynchat backend calls
+        it from :meth:`handle_connect`, after TLS is set up, and the asyncio
+        backend calls it once its transport is connected.
+        """
+        self._recv_buffer = bytearray()
+        core = self.config.core
+        self.writer = OutboundQueue(
+            lambda data: self.send(data),
+            maxsize=core.outbound_queue_size,
+            log=lambda line: self.log_raw(line, '>>'),
+            burst=core.flood_burst_lines,
+            refill_rate=core.flood_refill_rate,
+            empty_wait=core.flood_empty_wait,
+            server_burst=core.flood_server_burst_lines,
+            server_refill_rate=core.flood_server_refill_rate)
+        self.writer.start()
+
+        # Request list of server capabilities. IRCv3 servers will respond with
+        # CAP * LS (which we handle in coretasks). v2 servers will respond with
+        # 421 Unknown command, which we'll ignore
+        self.write(('CAP', 'LS', '302'))
+
+        # Request the capabilities we want right away rather than after the
+        # server's CAP LS reply, so the whole registration takes a single
+        # round trip. Unsupported ones are simply NAKed.
+        cap_requests = self._get_cap_requests()
+        for cap in cap_requests:
+            # REQs fail as a whole, so we send them one capability at a time
+            self.write(('CAP', 'REQ', cap))
+
+        # authenticate account if needed
+        if self.config.core.auth_method == 'server':
+            self.write(('PASS', self.config.core.auth_password))
+        elif self.config.core.server_auth_method == 'server':
+            self.write(('PASS', self.config.core.server_auth_password))
+        self.write(('NICK', self.nick))
+        self.write(('USER', self.user, '+iw', self.nick), self.name)
+
+        # If we want to do SASL, we have to wait before we can send CAP END;
+        # it is sent on 903 (SASL successful) instead.
+        if cap_requests and 'sasl' not in cap_requests:
+            self.write(('CAP', 'END'))
+
+        # maintain connection
+        stderr('Connected.')
+        self.keepalive = KeepAlive(self, int(self.config.core.timeout))
+        self.keepalive.start()
+
+    def _get_cap_requests(self):
+        """Get the capabilities to request when connecting.
+
+        :return: the capabilities to request, each with its ``-`` prefix if
+                 it must be disabled
+        :rtype: list
+
+        If this includes ``sasl``, ``CAP END`` isn't sent until SASL
+        authentication is done. The base implementation requests nothing.
+        """
+        return []
+
+    def _get_cnames(self, domain):
+        """
+        Determine the CNAMEs for a given domain.
+
+        :param domain: domain to check
+        :type domain: str
+        :returns: list (of str)
+        """
+        import dns.resolver
+        cnames = []
+        try:
+            answer = dns.resolver.query(domain, "CNAME")
+        except dns.resolver.NoAnswer:
+            return []
+        for data in answer:
+            if isinstance(data, dns.rdtypes.ANY.CNAME.CNAME):
+                cname = data.to_text()[:-1]
+                cnames.append(cname)
+        return cnames
+
+    def _ssl_send(self, data):
+        """Replacement for self.send() during SSL connections."""
+        try:
+            result = self.socket.send(data)
+            return result
+        except (ssl.SSLWantReadError, ssl.SSLWantWriteError):
+            # Non-blocking socket: try again later
+            return 0
+        except ssl.SSLError as why:
+            if why.errno in (asyncore.EWOULDBLOCK, errno.ESRCH):
+                return 0
+            else:
+                raise
+
+    def _ssl_recv(self, buffer_size):
+        """Replacement for self.recv() during SSL connections.
+
+        From: http://evanfosmark.com/2010/09/ssl-support-in-asynchatasync_chat
+
+        """
+        try:
+            data = self.socket.read(buffer_size)
+            if not data:
+                self.handle_close()
+                return b''
+            return data
+        except (ssl.SSLWantReadError, ssl.SSLWantWriteError):
+            # Non-blocking socket: nothing to read yet
+            return b''
+        except ssl.SSLError as why:
+            if why.errno in (asyncore.ECONNRESET, asyncore.ENOTCONN,
+                             asyncore.ESHUTDOWN):
+                self.handle_close()
+                return b''
+            elif why.errno == errno.ENOENT:
+                # Required in order to keep it non-blocking
+                return b''
+            else:
+                raise
+
+    def collect_incoming_data(self, data):
+        """Split raw data from the server into lines, and handle them.
+
+        :param bytes data: data as received from the socket
+
+        Data is buffered as bytes until a full line is received, so a
+        multibyte character split across two reads is decoded correctly. All
+        the lines completed by ``data`` are then handled together by
+        :meth:`handle_lines`.
+        """
+        buf = self._recv_buffer
+        buf.extend(data)
+        if b'\n' not in data:
+            return
+
+        raw_lines = buf.split(b'\n')
+        self._recv_buffer = raw_lines.pop()
+
+        lines = []
+        for raw_line in raw_lines:
+            if raw_line.endswith(b'\r'):
+                raw_line = raw_line[:-1]
+            if not raw_line:
+                continue
+            line = self.decode_line(raw_line)
+            if line is not None:
+                lines.append(line)
+
+        if lines:
+            self.handle_lines(lines)
+
+    def decode_line(self, raw_line):
+        """Decode a line from the server.
+
+        :param bytes raw_line: the line to decode, without its line ending
+        :return: the decoded line, or ``None`` if no encoding could decode it
+        :rtype: str
+
+        We can't trust clients to pass valid unicode, so each encoding in
+        :attr:`~sopel.config.core_section.CoreSection.incoming_encodings` is
+        tried in turn.
+        """
+        for encoding in self._encodings:
+            try:
+                return raw_line.decode(encoding)
+            except UnicodeDecodeError:
+                continue
+        # Discard line if encoding is unknown
+        return None
+
+    def handle_lines(self, lines):
+        """Handle a batch of lines received from the server.
+
+        :param list lines: decoded lines, without their line ending
+
+        Each line is parsed into a :class:`~sopel.trigger.PreTrigger`, and
+        core protocol messages (``PING``, ``ERROR``...) are handled right away.
+        The whole batch is then given to :meth:`dispatch_batch`.
+        """
+        if self.keepalive is not None:
+            self.keepalive.touch()
+        pretriggers = []
+        for line in lines:
+            self.log_raw(line, '<<')
+            pretriggers.append(self._parse_line(line))
+        self.dispatch_batch(pretriggers)
+
+    def _parse_line(self, line):
+        # Kept for the exception log, should handling this line fail
+        self.raw = line
+        caps = self.enabled_capabilities
+        pretrigger = PreTrigger(
+            self.nick, line, self.network,
+            account_tags='account-tag' in caps or 'extended-join' in caps)
+
+        if pretrigger.event == 'PING':
+            self.write(('PONG', pretrigger.args[-1]))
+        elif pretrigger.event == '001' and self.registration_time is None:
+            self.registration_time = monotonic() - self._connect_started
+            LOGGER.info('Registered with the server in %.3f seconds',
+                        self.registration_time)
+        elif pretrigger.event == 'PONG':
+            if self.keepalive is not None and pretrigger.args:
+                self.keepalive.pong(pretrigger.args[-1])
+        elif pretrigger.event == 'ERROR':
+            LOGGER.error("ERROR received from server: %s", pretrigger.args[-1])
+            if self.hasquit:
+                self.close_when_done()
+        elif pretrigger.event == '433':
+            stderr('Nickname already in use!')
+            self.handle_close()
+
+        return pretrigger
+
+    def found_terminator(self):
+        """Handle the line collected in ``self.buffer``.
+
+        Neither backend calls this anymore, as :meth:`collect_incoming_data`
+        does its own line splitting; it is kept for code that feeds lines to
+        the bot by hand.
+        """
+        line = self.buffer
+        if line.endswith('\r'):
+            line = line[:-1]
+        self.buffer = ''
+        self.handle_lines([line])
+
+    def dispatch_batch(self, pretriggers):
+        """Dispatch several parsed messages, in the order they were received.
+
+        :param list pretriggers: the :class:`~sopel.trigger.PreTrigger`\\s to
+                                 dispatch
+        """
+        for pretrigger in pretriggers:
+            self.dispatch(pretrigger)
+
+    def dispatch(self, pretrigger):
+        pass
+
+    def error(self, trigger=None):
+        """Called internally when a module causes an error."""
+        try:
+            trace = traceback.format_exc()
+            if sys.version_info.major < 3:
+                trace = trace.decode('utf-8', errors='xmlcharrefreplace')
+            stderr(trace)
+            try:
+                lines = list(reversed(trace.splitlines()))
+                report = [lines[0].strip()]
+                for line in lines:
+                    line = line.strip()
+                    if line.startswith('File "'):
+                        report.append(line[0].lower() + line[1:])
+                        break
+                else:
+                    report.append('source unknown')
+
+                signature = '%s (%s)' % (report[0], report[1])
+                # TODO: make not hardcoded
+                log_filename = os.path.join(self.config.core.logdir, self.config.basename + '.exceptions.log')
+                with codecs.open(log_filename, 'a', encoding='utf-8') as logfile:
+                    logfile.write('Signature: %s\n' % signature)
+                    if trigger:
+                        logfile.write('from {} at {}. Message was: {}\n'.format(
+                            trigger.nick, str(datetime.now()), trigger.group(0)))
+                    logfile.write(trace)
+                    logfile.write(
+                        '----------------------------------------\n\n'
+                    )
+            except Exception as e:
+                stderr("Could not save full traceback!")
+                LOGGER.error("Could not save traceback from %s to file: %s", trigger.sender, str(e))
+
+            if trigger and self.config.core.reply_errors and trigger.sender is not None:
+                self.say(signature, trigger.sender)
+            if trigger:
+                LOGGER.error('Exception from {}: {} ({})'.format(trigger.sender, str(signature), trigger.raw))
+        except Exception as e:
+            if trigger and self.config.core.reply_errors and trigger.sender is not None:
+                self.say("Got an error.", trigger.sender)
+            if trigger:
+                LOGGER.error('Exception from {}: {} ({})'.format(trigger.sender, str(e), trigger.raw))
+
+    def handle_error(self):
+        """Handle any uncaptured error in the core.
+
+        Overrides asyncore's handle_error.
+
+        """
+        trace = traceback.format_exc()
+        stderr(trace)
+        LOGGER.error('Fatal error in core, please review exception log')
+        # TODO: make not hardcoded
+        logfile = codecs.open(
+            os.path.join(self.config.core.logdir, self.config.basename + '.exceptions.log'),
+            'a',
+            encoding='utf-8'
+        )
+        logfile.write('Fatal error in core, handle_error() was called\n')
+        logfile.write('last raw line was %s\n' % self.raw)
+        logfile.write(trace)
+        logfile.write('Buffer:\n')
+        logfile.write(repr(bytes(self._recv_buffer)))
+        logfile.write('----------------------------------------\n\n')
+        logfile.close()
+        if self.error_count > 10:
+            if (datetime.now() - self.last_error_timestamp).seconds < 5:
+                stderr("Too many errors, can't continue")
+                os._exit(1)
+        self.last_error_timestamp = datetime.now()
+        self.error_count = self.error_count + 1
@@ -0,0 +1,259 @@
+# coding=utf-8
+"""Connection backends for :class:`sopel.irc.Bot`.
+
+The default backend is built on :mod:`asynchat`, and lives in
+:class:`sopel.irc.Bot` itself. This module provides an alternative backend
+built on :mod:`asyncio`, selected with the
+:attr:`~sopel.config.core_section.CoreSection.connection_backend` setting.
+
+Both backends drive the same :class:`~sopel.irc.Bot` methods
+(:meth:`~sopel.irc.Bot.collect_incoming_data`,
+:meth:`~sopel.irc.Bot.found_terminator`, :meth:`~sopel.irc.Bot.write`, and
+:meth:`~sopel.irc.Bot.dispatch`), so plugins can't tell them apart.
+
+.. note::
+
+    The asyncio backend requires Python 3.5.2 or newer.
+
+"""
+# Licensed under the Eiffel Forum License 2.
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+import collections
+import socket
+import sys
+import threading
+
+try:
+    import asyncio
+    import concurrent.futures
+except ImportError:
+    asyncio = None
+
+try:
+    import ssl
+except ImportError:
+    # no SSL support
+    ssl = None
+
+from sopel.irc import servers
+from sopel.logger import get_logger
+from sopel.tools import stderr
+
+
+__all__ = ['AsyncioConnection', 'run_asyncio']
+
+LOGGER = get_logger(__name__)
+
+_Protocol = asyncio.Protocol if asyncio is not None else object
+
+
+def get_ssl_context(bot):
+    """Get the :class:`ssl.SSLContext` used to connect ``bot``.
+
+    :param bot: the bot about to connect
+    :type bot: :class:`sopel.irc.Bot`
+    :return: an SSL context, or ``None`` if TLS is disabled or unavailable
+
+    The context is built once, and reused by every connection of the bot:
+    the CA certificates are only loaded once, and TLS sessions from one
+    connection can be resumed by the next one.
+    """
+    if not bot.config.core.use_ssl:
+        return None
+    if ssl is None:
+        stderr('SSL is not avilable on your system, attempting connection '
+               'without it')
+        return None
+
+    if bot._ssl_context is None:
+        if not bot.config.core.verify_ssl:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        else:
+            context = ssl.create_default_context(cafile=bot.ca_certs)
+        bot._ssl_context = context
+    return bot._ssl_context
+
+
+class AsyncioConnection(_Protocol):
+    """An :class:`asyncio.Protocol` feeding a :class:`sopel.irc.Bot`.
+
+    :param bot: the bot using this connection
+    :type bot: :class:`sopel.irc.Bot`
+    :param loop: the event loop running this connection
+
+    Once connected, the bot's ``send``, ``close``, and ``close_when_done``
+    methods are replaced with this connection's, the same way the asynchat
+    backend swaps in its TLS-aware ``send``. Incoming data is handed as-is
+    to :meth:`sopel.irc.Bot.collect_incoming_data`, which splits it into lines.
+    """
+
+    def __init__(self, bot, loop):
+        self.bot = bot
+        self.loop = loop
+        self.transport = None
+        self.closed = loop.create_future()
+        """Future resolved when the connection is lost."""
+        self._lost = False
+        self._loop_thread = None
+        self._paused = False
+        # Futures of sends waiting for the transport's buffer to drain
+        self._pending = collections.deque()
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self._loop_thread = threading.current_thread()
+        bot = self.bot
+        bot.send = self.send
+        bot.close = self.close
+        bot.close_when_done = self.close_when_done
+        bot.connecting = False
+        bot.connected = True
+        try:
+            bot._on_connected()
+        except Exception:  # TODO: Be specific
+            bot.handle_error()
+
+    def data_received(self, data):
+        # An exception leaking out of here would make the transport drop the
+        # connection; asyncore reports them with handle_error, so do the same.
+        try:
+            self.bot.collect_incoming_data(data)
+        except Exception:  # TODO: Be specific
+            self.bot.handle_error()
+
+    def connection_lost(self, exc):
+        self._lost = True
+        self.bot.connected = False
+        if exc is not None:
+            LOGGER.warning('Connection lost: %s', exc)
+        if not self.bot._handled_close:
+            try:
+                self.bot.handle_close()
+            except Exception:  # TODO: Be specific
+                self.bot.handle_error()
+        self._release_pending()
+        if not self.closed.done():
+            self.closed.set_result(None)
+
+    def pause_writing(self):
+        self._paused = True
+
+    def resume_writing(self):
+        self._paused = False
+        self._release_pending()
+
+    def _release_pending(self):
+        while self._pending:
+            future, size = self._pending.popleft()
+            if self.transport is None or self.transport.is_closing():
+                future.set_exception(IOError('connection closed'))
+            else:
+                future.set_result(size)
+
+    def send(self, data):
+        """Write ``data`` to the transport; safe to call from any thread.
+
+        :return: how many bytes were written
+
+        From another thread than the loop's, this waits until the data is
+        handed to the transport, and until the transport's buffer is below
+        its high-water mark, so the writer's counters and latencies are
+        those of the actual sends, and a slow connection slows the writer
+        down.
+        """
+        if threading.current_thread() is self._loop_thread:
+            self._write(data, None)
+            return len(data)
+        future = concurrent.futures.Future()
+        self.loop.call_soon_threadsafe(self._write, data, future)
+        while True:
+            try:
+                return future.result(1)
+            except concurrent.futures.TimeoutError:
+                # The loop may be gone, and the write with it
+                if self._lost:
+                    raise IOError('connection closed')
+
+    def _write(self, data, future):
+        if self.transport is None or self.transport.is_closing():
+            if future is not None:
+                future.set_exception(IOError('connection closed'))
+            return
+        self.transport.write(data)
+        if future is None:
+            return
+        if self._paused:
+            self._pending.append((future, len(data)))
+        else:
+            future.set_result(len(data))
+
+    def close(self):
+        """Close the transport; safe to call from any thread."""
+        self.bot.connected = False
+        self.loop.call_soon_threadsafe(self._close)
+
+    # Transports flush their write buffer before closing anyway
+    close_when_done = close
+
+    def _close(self):
+        if self.transport is not None:
+            self.transport.close()
+
+
+def run_asyncio(bot, host, port):
+    """Connect ``bot`` to ``host``:``port`` and run until disconnected.
+
+    :param bot: the bot to connect
+    :type bot: :class:`sopel.irc.Bot`
+    :param str host: the server to connect to
+    :param int port: the port to connect on
+    """
+    if asyncio is None:
+        raise RuntimeError('The asyncio backend requires Python 3.5.2+')
+
+    bot.servers.add(host, port, first=True)
+    source_address = ((bot.config.core.bind_host, 0)
+                      if bot.config.core.bind_host else None)
+    context = get_ssl_context(bot)
+
+    loop = asyncio.new_event_loop()
+    kwargs = {}
+    if sys.version_info >= (3, 8):
+        # Race the server's IPv6 and IPv4 addresses (RFC 8305)
+        kwargs['happy_eyeballs_delay'] = servers.ATTEMPT_DELAY
+        kwargs['interleave'] = 1
+
+    def connect(server):
+        host, port = server
+        coroutine = loop.create_connection(
+            lambda: AsyncioConnection(bot, loop),
+            host, port,
+            ssl=context,
+            server_hostname=bot._tls_names.get(host, host) if context else None,
+            local_addr=source_address,
+            **kwargs)
+        try:
+            return loop.run_until_complete(asyncio.wait_for(
+                coroutine, bot.config.core.connect_timeout))
+        except asyncio.TimeoutError:
+            raise socket.timeout('timed out')
+
+    bot.connecting = True
+    try:
+        _transport, protocol = bot._connect_any(connect)
+        try:
+            loop.run_until_complete(protocol.closed)
+        except KeyboardInterrupt:
+            print('KeyboardInterrupt')
+            bot.quit('KeyboardInterrupt')
+            # The writer's sends complete on the loop: keep it running while
+            # the queue drains
+            loop.run_until_complete(loop.run_in_executor(None, bot.flush_writer))
+            protocol.close_when_done()
+            loop.run_until_complete(protocol.closed)
+    finally:
+        bot.connecting = False
+        loop.close()
@@ -0,0 +1,120 @@
+# coding=utf-8
+"""Connection keep-alive: PINGs, lag measurement, and timeout detection.
+
+Each connection has a single :class:`KeepAlive` timer. The bot only records
+when it last heard from the server (see :meth:`KeepAlive.touch`); the timer
+wakes up when something is due, sends a ``PING`` after half the
+:attr:`~sopel.config.core_section.CoreSection.timeout` without traffic, and
+closes the connection after the full timeout. The round trip of our own
+``PING``\\s gives the connection's lag.
+"""
+# Licensed under the Eiffel Forum License 2.
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+import threading
+
+try:
+    from time import monotonic
+except ImportError:
+    # Python 2
+    from time import time as monotonic
+
+from sopel.logger import get_logger
+from sopel.tools import stderr
+
+
+__all__ = ['KeepAlive', 'monotonic']
+
+LOGGER = get_logger(__name__)
+
+
+class KeepAlive(threading.Thread):
+    """Keep a connection alive, and detect when it's dead.
+
+    :param bot: the bot owning the connection
+    :type bot: :class:`sopel.irc.Bot`
+    :param int timeout: seconds without any line from the server before the
+                        connection is considered dead
+
+    The timer stops as soon as :meth:`stop` is called, so it never outlives
+    its connection.
+    """
+    def __init__(self, bot, timeout):
+        threading.Thread.__init__(self, name='sopel-keepalive')
+        self.daemon = True
+        self.bot = bot
+        self.timeout = timeout
+        self._stopping = threading.Event()
+        self._ping_token = None
+        self._ping_sent_at = None
+        self._ping_future = None
+
+        self.last_activity = monotonic()
+        """Monotonic time of the last line received from the server."""
+        self.lag = None
+        """Round trip time of the last answered PING, in seconds.
+
+        ``None`` until a PING is answered.
+        """
+
+    def touch(self):
+        """Record that a line was just received from the server."""
+        self.last_activity = monotonic()
+
+    def pong(self, token):
+        """Handle a ``PONG`` from the server.
+
+        :param str token: the PONG's last argument
+        """
+        if self._ping_token is not None and token == self._ping_token:
+            # From when the PING actually left, not when it was queued
+            sent_at = self._ping_sent_at
+            future = self._ping_future
+            if future is not None and future.sent_at is not None:
+                sent_at = future.sent_at
+            self.lag = monotonic() - sent_at
+            self._ping_token = None
+            self._ping_future = None
+
+    def stop(self):
+        """Stop the timer right away."""
+        self._stopping.set()
+
+    def run(self):
+        delay = self.timeout / 2
+        while not self._stopping.wait(delay):
+            delay = self.check(monotonic())
+            if delay is None:
+                break
+
+    def check(self, now):
+        """Send a PING or close the connection if needed.
+
+        :param float now: the current monotonic time
+        :return: seconds until the next check, or ``None`` if the connection
+                 timed out
+        """
+        idle = now - self.last_activity
+        if idle > self.timeout:
+            stderr('Ping timeout reached after %s seconds, closing connection'
+                   % self.timeout)
+            self.bot.handle_close()
+            return None
+
+        ping_after = self.timeout / 2
+        # Only one PING in flight, unless its PONG looks lost
+        waiting = (self._ping_token is not None and
+                   now - self._ping_sent_at < ping_after)
+        if idle >= ping_after and not waiting:
+            self._ping_token = 'sopel-%d' % int(now * 1000)
+            self._ping_sent_at = now
+            try:
+                self._ping_future = self.bot.write(
+                    ('PING', self._ping_token), future=True)
+            except Exception as error:  # TODO: Be specific
+                LOGGER.warning('Could not send PING: %s', error)
+
+        if idle < ping_after:
+            return ping_after - idle
+        # Wait for the PONG, or any other line, until the timeout
+        return self.timeout - idle + 0.1
@@ -0,0 +1,163 @@
+# coding=utf-8
+"""Background writer for the raw log (see
+:attr:`~sopel.config.core_section.CoreSection.log_raw`).
+
+Lines are queued by :meth:`sopel.irc.Bot.log_raw` and written to disk in
+batches by a dedicated thread, so logging never does file I/O on the
+connection's thread. The log can be rotated by size or age, and rotated
+segments can be compressed with gzip.
+
+When the disk can't keep up and the queue is full, new lines are dropped and
+counted rather than slowing the connection down.
+"""
+# Licensed under the Eiffel Forum License 2.
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+import collections
+import gzip
+import io
+import os
+import shutil
+import sys
+import threading
+import time
+
+from sopel.logger import get_logger
+
+if sys.version_info.major >= 3:
+    unicode = str
+
+
+__all__ = ['RawLogWriter']
+
+LOGGER = get_logger(__name__)
+
+
+def _strip(line):
+    return line.replace('\r', '').replace('\n', '')
+
+
+class RawLogWriter(threading.Thread):
+    """Write raw IRC lines to ``path`` from a background thread.
+
+    :param str path: the raw log file
+    :param int max_bytes: rotate the file once it reaches this size; ``0``
+                          disables size-based rotation
+    :param int rotate_interval: rotate the file after this many seconds;
+                                ``0`` disables time-based rotation
+    :param bool compress: gzip rotated files
+    :param int maxsize: maximum number of lines waiting to be written
+    """
+    def __init__(self, path, max_bytes=0, rotate_interval=0, compress=False,
+                 maxsize=10000):
+        threading.Thread.__init__(self, name='sopel-rawlog')
+        self.daemon = True
+        self.path = path
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.compress = compress
+        self.maxsize = maxsize
+        self._queue = collections.deque()
+        self._condition = threading.Condition(threading.Lock())
+        self._stopping = False
+        self._file = None
+        self._opened_at = None
+
+        self.written = 0
+        """Number of lines written so far."""
+        self.dropped = 0
+        """Number of lines dropped because the queue was full."""
+        self.rotations = 0
+        """Number of times the file was rotated."""
+
+    def put(self, line, prefix):
+        """Queue a line for writing; never blocks.
+
+        :param str line: the raw line
+        :param str prefix: ``>>`` for outgoing lines, ``<<`` for incoming ones
+        :return: ``True`` if the line was queued, ``False`` if it was dropped
+        """
+        with self._condition:
+            if len(self._queue) >= self.maxsize:
+                self.dropped += 1
+                return False
+            self._queue.append((prefix, time.time(), line))
+            self._condition.notify()
+        return True
+
+    def close(self, timeout=5):
+        """Write the lines still queued, then stop the thread.
+
+        :param float timeout: how long to wait for the thread, in seconds
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self.is_alive():
+            self.join(timeout)
+
+    def run(self):
+        try:
+            while True:
+                with self._condition:
+                    while not (self._queue or self._stopping):
+                        self._condition.wait()
+                    batch = list(self._queue)
+                    self._queue.clear()
+                    stopping = self._stopping
+                if batch:
+                    self._write(batch)
+                if stopping and not batch:
+                    break
+        finally:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _write(self, batch):
+        try:
+            if self._file is None:
+                self._open()
+            elif self._should_rotate():
+                self._rotate()
+            self._file.write(''.join(
+                '%s%s\t%s\n' % (prefix, unicode(timestamp), _strip(line))
+                for prefix, timestamp, line in batch))
+            self._file.flush()
+        except (IOError, OSError) as error:
+            LOGGER.error('Could not write to raw log %s: %s', self.path, error)
+            return
+        self.written += len(batch)
+
+    def _open(self):
+        self._file = io.open(self.path, 'a', encoding='utf-8')
+        self._opened_at = time.time()
+
+    def _should_rotate(self):
+        if self.max_bytes and self._file.tell() >= self.max_bytes:
+            return True
+        if (self.rotate_interval and
+                time.time() - self._opened_at >= self.rotate_interval):
+            return True
+        return False
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        target = '%s.%s' % (self.path, stamp)
+        count = 1
+        while os.path.exists(target) or os.path.exists(target + '.gz'):
+            target = '%s.%s-%d' % (self.path, stamp, count)
+            count += 1
+        os.rename(self.path, target)
+        self.rotations += 1
+
+        if self.compress:
+            with open(target, 'rb') as source:
+                with gzip.open(target + '.gz', 'wb') as compressed:
+                    shutil.copyfileobj(source, compressed)
+            os.remove(target)
+
+        self._open()
@@ -0,0 +1,233 @@
+# coding=utf-8
+"""Server selection and connection for :class:`sopel.irc.Bot`.
+
+A bot can be given several servers to connect to (see
+:attr:`~sopel.config.core_section.CoreSection.servers`). The
+:class:`ServerList` remembers how each one behaved: servers that failed are
+tried last, and among the others, the fastest to connect is tried first.
+
+Connecting to a server uses "Happy Eyeballs" (:rfc:`8305`): when a hostname
+resolves to several addresses, IPv6 and IPv4 included, a new attempt starts
+every :data:`ATTEMPT_DELAY` seconds until one of them connects, instead of
+waiting for each address to time out in turn.
+"""
+# Licensed under the Eiffel Forum License 2.
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+import collections
+import errno
+import os
+import select
+import socket
+
+from sopel.irc.keepalive import monotonic
+
+
+__all__ = ['ATTEMPT_DELAY', 'ServerList', 'create_connection', 'parse_server']
+
+ATTEMPT_DELAY = 0.25
+"""Seconds to wait for an address before also trying the next one."""
+
+_IN_PROGRESS = set(code for code in (
+    errno.EINPROGRESS,
+    errno.EWOULDBLOCK,
+    getattr(errno, 'WSAEWOULDBLOCK', None),
+) if code is not None)
+
+
+def parse_server(entry, default_port):
+    """Parse a ``host``, ``host:port``, or ``[ipv6]:port`` server entry.
+
+    :param str entry: the server, as written in the configuration
+    :param int default_port: the port to use if ``entry`` has none
+    :return: the server's ``(host, port)``
+    :rtype: tuple
+    :raise ValueError: if the port is not a number
+    """
+    entry = entry.strip()
+    if entry.startswith('['):
+        host, _, rest = entry[1:].partition(']')
+        port = rest[1:] if rest.startswith(':') else None
+    elif entry.count(':') == 1:
+        host, port = entry.split(':')
+    else:
+        # A bare IPv6 address, or a hostname
+        host, port = entry, None
+    return host, int(port) if port else int(default_port)
+
+
+class ServerList(object):
+    """The servers a bot can connect to, and how well they did so far.
+
+    :param servers: ``(host, port)`` pairs, in order of preference
+    :type servers: :term:`iterable`
+    """
+    SMOOTHING = 0.3
+    """Weight of the last connection in a server's average latency."""
+
+    def __init__(self, servers=()):
+        self._servers = []
+        self.latency = {}
+        """Average time to connect to each server, in seconds."""
+        self.failures = {}
+        """Number of failed attempts in a row for each server."""
+        for host, port in servers:
+            self.add(host, port)
+
+    def __iter__(self):
+        return iter(self._servers)
+
+    def __len__(self):
+        return len(self._servers)
+
+    def add(self, host, port, first=False):
+        """Add a server, unless it's already in the list.
+
+        :param str host: the server's hostname or address
+        :param int port: the server's port
+        :param bool first: if the server is new, put it first rather than
+                           last
+        """
+        server = (host, int(port))
+        if server in self._servers:
+            return
+        if first:
+            self._servers.insert(0, server)
+        else:
+            self._servers.append(server)
+
+    def ordered(self):
+        """Get the servers in the order they should be tried.
+
+        :return: ``(host, port)`` pairs, healthy servers first, fastest first
+        :rtype: list
+
+        Servers the bot never connected to come after the ones it did, in
+        their configured order.
+        """
+        index = dict((server, i) for i, server in enumerate(self._servers))
+        return sorted(self._servers, key=lambda server: (
+            self.failures.get(server, 0),
+            self.latency.get(server, float('inf')),
+            index[server]))
+
+    def record_success(self, server, latency):
+        """Record a successful connection to ``server``.
+
+        :param tuple server: the server's ``(host, port)``
+        :param float latency: how long it took to connect, in seconds
+        """
+        previous = self.latency.get(server)
+        if previous is not None:
+            latency = (self.SMOOTHING * latency +
+                       (1 - self.SMOOTHING) * previous)
+        self.latency[server] = latency
+        self.failures[server] = 0
+
+    def record_failure(self, server):
+        """Record a failed attempt to connect to ``server``.
+
+        :param tuple server: the server's ``(host, port)``
+        """
+        self.failures[server] = self.failures.get(server, 0) + 1
+
+
+def _interleave(addresses):
+    # Alternate between address families, keeping the resolver's order
+    # within each family (RFC 8305, section 4)
+    by_family = collections.OrderedDict()
+    for address in addresses:
+        by_family.setdefault(address[0], []).append(address)
+    queues = list(by_family.values())
+    result = []
+    while any(queues):
+        for queue in queues:
+            if queue:
+                result.append(queue.pop(0))
+    return result
+
+
+def _error(code):
+    return socket.error(code, os.strerror(code))
+
+
+def create_connection(address, timeout=None, source_address=None,
+                      delay=ATTEMPT_DELAY):
+    """Connect to ``address``, racing its resolved addresses.
+
+    :param tuple address: the ``(host, port)`` to connect to
+    :param float timeout: give up after this many seconds; wait for the
+                          system's TCP timeout if ``None``
+    :param tuple source_address: the ``(host, port)`` to bind to before
+                                 connecting, if any
+    :param float delay: seconds before an attempt to the next address
+                        starts, while the previous ones are still pending
+    :return: the connected socket, in blocking mode
+    :rtype: :class:`socket.socket`
+    :raise socket.error: if no address could be connected to
+
+    This has the same interface as :func:`socket.create_connection`.
+    """
+    host, port = address
+    addresses = _interleave(
+        socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM))
+    deadline = None if timeout is None else monotonic() + timeout
+    pending = {}
+    errors = []
+    winner = None
+
+    try:
+        while winner is None:
+            if addresses:
+                family, socktype, proto, _name, sockaddr = addresses.pop(0)
+                sock = socket.socket(family, socktype, proto)
+                try:
+                    sock.setblocking(False)
+                    if source_address:
+                        sock.bind(source_address)
+                    code = sock.connect_ex(sockaddr)
+                except socket.error as error:
+                    sock.close()
+                    errors.append(error)
+                    continue
+                if code == 0:
+                    winner = sock
+                    break
+                if code not in _IN_PROGRESS:
+                    sock.close()
+                    errors.append(_error(code))
+                    continue
+                pending[sock] = sockaddr
+
+            if not pending:
+                if addresses:
+                    continue
+                break
+
+            # Wait for a pending attempt, or until it's time for the next one
+            wait = delay if addresses else None
+            if deadline is not None:
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    break
+                wait = remaining if wait is None else min(wait, remaining)
+            _r, ready, _x = select.select([], list(pending), [], wait)
+            for sock in ready:
+                del pending[sock]
+                code = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                if code == 0 and winner is None:
+                    winner = sock
+                else:
+                    sock.close()
+                    if code:
+                        errors.append(_error(code))
+    finally:
+        for sock in pending:
+            sock.close()
+
+    if winner is None:
+        if errors:
+            raise errors[-1]
+        raise socket.timeout('timed out connecting to %s:%s' % (host, port))
+    winner.setblocking(True)
+    return winner
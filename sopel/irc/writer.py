@@ -0,0 +1,410 @@
+# coding=utf-8
+"""Outbound line queue for :class:`sopel.irc.Bot`.
+
+:meth:`sopel.irc.Bot.write` doesn't send anything itself: it puts the encoded
+line in an :class:`OutboundQueue`, and returns immediately. A single writer
+thread drains the queue and sends each line in order, so a slow socket only
+ever stalls that thread, never the dispatcher or the plugins.
+
+Lines that keep the connection alive (``PONG``) or that are needed to register
+with the server go through a priority lane, ahead of everything else.
+
+The other lines are throttled, without ever blocking whoever wrote them: each
+message target (a channel or a nick) gets its own lane and
+:class:`TokenBucket`, and the writer takes turns between the targets whose
+bucket allows a line. A target that is waiting for its bucket to refill
+doesn't hold up the others. One more bucket, for the whole connection, keeps
+the total under what the server tolerates.
+"""
+# Licensed under the Eiffel Forum License 2.
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+import collections
+import threading
+import time
+
+from sopel.irc.keepalive import monotonic
+from sopel.logger import get_logger
+
+
+__all__ = ['OutboundQueue', 'QueueFull', 'SendFuture', 'TokenBucket']
+
+LOGGER = get_logger(__name__)
+
+
+class QueueFull(Exception):
+    """Raised through a :class:`SendFuture` when its line was dropped."""
+
+
+class SendFuture(object):
+    """Completion handle for a line put in an :class:`OutboundQueue`.
+
+    Its interface is a small subset of :class:`concurrent.futures.Future`.
+    """
+    def __init__(self):
+        self._event = threading.Event()
+        self._exception = None
+        self.sent_at = None
+        """Monotonic time the line was sent at; ``None`` until then."""
+
+    def done(self):
+        """Tell if the line was sent, or failed to be.
+
+        :rtype: bool
+        """
+        return self._event.is_set()
+
+    def result(self, timeout=None):
+        """Wait until the line is sent.
+
+        :param float timeout: how long to wait, in seconds; wait forever if
+                              ``None``
+        :return: ``True`` if the line was sent, ``False`` on timeout
+        :raise Exception: the error that prevented the line from being sent
+        """
+        if not self._event.wait(timeout):
+            return False
+        if self._exception is not None:
+            raise self._exception
+        return True
+
+    def set_result(self):
+        self.sent_at = monotonic()
+        self._event.set()
+
+    def set_exception(self, exception):
+        self._exception = exception
+        self._event.set()
+
+
+class TokenBucket(object):
+    """How many lines can be sent right now, refilled over time.
+
+    :param int capacity: how many lines can be sent in a burst; no limit if
+                         ``0``
+    :param float rate: how many lines are refilled per second
+    :param float now: the current monotonic time
+
+    The bucket starts full.
+    """
+    __slots__ = ('capacity', 'rate', 'tokens', 'updated', 'last_taken')
+
+    def __init__(self, capacity, rate, now):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = float(capacity)
+        self.updated = now
+        self.last_taken = None
+
+    @property
+    def unlimited(self):
+        return self.capacity <= 0
+
+    def refill(self, now):
+        """Add the lines refilled since the last update."""
+        if self.rate > 0 and now > self.updated:
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def is_full(self, now):
+        """Tell if the bucket is back to its capacity."""
+        self.refill(now)
+        return self.tokens >= self.capacity
+
+    def ready_at(self, now, empty_wait=None):
+        """Tell when the next line can be taken.
+
+        :param float now: the current monotonic time
+        :param float empty_wait: if given, once the bucket is empty, a line
+                                 can also be taken that many seconds after
+                                 the last one
+        :return: a monotonic time, ``now`` if a line can be taken right away
+        :rtype: float
+        """
+        if self.unlimited:
+            return now
+        self.refill(now)
+        if self.tokens >= 1:
+            return now
+        ready = float('inf')
+        if self.rate > 0:
+            ready = now + (1 - self.tokens) / self.rate
+        if empty_wait is not None and self.last_taken is not None:
+            ready = min(ready, self.last_taken + empty_wait)
+        return max(now, ready)
+
+    def take(self, now):
+        """Take a line from the bucket."""
+        self.refill(now)
+        self.tokens = max(0.0, self.tokens - 1)
+        self.last_taken = now
+
+
+class OutboundQueue(threading.Thread):
+    """A bounded queue of outbound lines, drained by its own thread.
+
+    :param send: function called with each line's bytes; it must return how
+                 many bytes were actually sent
+    :type send: :term:`function`
+    :param int maxsize: maximum number of lines waiting in the normal lanes
+    :param log: optional function called with each line's text once sent
+    :type log: :term:`function`
+    :param int burst: how many lines can be sent to a target in a burst; no
+                      per-target limit if ``0``
+    :param float refill_rate: how many lines per second a target's burst
+                              recovers
+    :param float empty_wait: once a target's burst is used up, how long
+                             after the previous line the next one can be
+                             sent anyway, in seconds; long lines wait more,
+                             up to 2 seconds
+    :param int server_burst: how many lines can be sent in a burst, to all
+                             targets; no overall limit if ``0``
+    :param float server_refill_rate: how many lines per second the overall
+                                     burst recovers
+
+    The priority lane is neither bounded nor throttled: it only carries the
+    few lines the connection can't do without. Once the queue is stopped,
+    the lines still waiting are sent without throttling.
+    """
+    MAX_IDLE_TARGETS = 1000
+    """How many targets without waiting lines to keep the bucket of."""
+
+    STOP_SEND_TIMEOUT = 5
+    """Once the queue is stopped, how long a line can wait for the socket to
+    accept more data before it's given up on, in seconds."""
+
+    def __init__(self, send, maxsize=1000, log=None, burst=0, refill_rate=0,
+                 empty_wait=0, server_burst=0, server_refill_rate=0):
+        threading.Thread.__init__(self, name='sopel-writer')
+        self.daemon = True
+        self._send = send
+        self._log = log
+        self.maxsize = maxsize
+        self.burst = burst
+        self.refill_rate = refill_rate
+        self.empty_wait = empty_wait
+        self._priority = collections.deque()
+        # target -> waiting lines, in the order the targets take turns
+        self._lanes = collections.OrderedDict()
+        self._size = 0
+        # target -> its bucket, kept for a while once its lane is empty
+        self._buckets = collections.OrderedDict()
+        self._server_bucket = TokenBucket(
+            server_burst if server_refill_rate > 0 else 0,
+            server_refill_rate, monotonic())
+        self._condition = threading.Condition(threading.Lock())
+        self._stopping = False
+
+        self.sent = 0
+        """Number of lines sent so far."""
+        self.dropped = 0
+        """Number of lines dropped because the queue was full."""
+        self.failed = 0
+        """Number of lines that couldn't be sent because of a socket error."""
+        self.last_latency = 0.0
+        """Seconds between queuing and sending of the last line sent."""
+        self.max_latency = 0.0
+        """Highest latency seen so far, in seconds."""
+        self.total_latency = 0.0
+        """Sum of all latencies, in seconds."""
+
+    @property
+    def depth(self):
+        """Number of lines waiting to be sent."""
+        return len(self._priority) + self._size
+
+    @property
+    def average_latency(self):
+        """Average seconds between queuing and sending of a line."""
+        if not self.sent:
+            return 0.0
+        return self.total_latency / self.sent
+
+    def put(self, data, text=None, priority=False, future=None, target=None,
+            length=0):
+        """Queue a line for sending; never blocks.
+
+        :param bytes data: the encoded line, including its CR-LF
+        :param str text: the line as text, passed to the ``log`` function
+        :param bool priority: whether to send the line ahead of normal lines
+        :param future: optional handle completed once the line is sent
+        :type future: :class:`SendFuture`
+        :param target: the channel or nick the line is a message to, if any
+        :type target: :class:`~sopel.tools.Identifier`
+        :param int length: the length of the message's text; once the
+                           target's burst is used up, longer messages wait
+                           longer
+        :return: ``True`` if the line was queued, ``False`` if it was dropped
+
+        Lines to the same target, and lines without a target, are sent in
+        the order they were queued.
+
+        Once the queue is stopped, every line is dropped: they belong to a
+        connection that is gone.
+        """
+        item = (data, text, monotonic(), future, length)
+        with self._condition:
+            if self._stopping:
+                item = error = None
+            elif priority:
+                self._priority.append(item)
+            elif self._size < self.maxsize:
+                lane = self._lanes.get(target)
+                if lane is None:
+                    lane = self._lanes[target] = collections.deque()
+                lane.append(item)
+                self._size += 1
+            else:
+                self.dropped += 1
+                item, error = None, QueueFull(text)
+            if item is not None:
+                self._condition.notify()
+                return True
+
+        if error is None:
+            LOGGER.warning('Not connected, dropping: %r', text)
+            error = IOError('connection closed')
+        else:
+            LOGGER.warning('Outbound queue full (%d lines), dropping: %r',
+                           self.maxsize, text)
+        if future is not None:
+            future.set_exception(error)
+        return False
+
+    def stop(self, discard=False):
+        """Ask the writer thread to stop once the queue is empty.
+
+        :param bool discard: if ``True``, drop the lines still waiting instead
+                             of sending them first
+        """
+        with self._condition:
+            self._stopping = True
+            if discard:
+                pending = list(self._priority)
+                for lane in self._lanes.values():
+                    pending.extend(lane)
+                self._priority.clear()
+                self._lanes.clear()
+                self._size = 0
+            else:
+                pending = []
+            self._condition.notify()
+
+        for _data, text, _queued_at, future, _length in pending:
+            if future is not None:
+                future.set_exception(IOError('connection closed'))
+
+    def run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._priority:
+                        item = self._priority.popleft()
+                        break
+                    item, ready = self._next_item(monotonic())
+                    if item is not None:
+                        break
+                    if ready is None and self._stopping:
+                        return  # stopping, and nothing left to send
+                    # Wait for a line, or for a bucket to refill
+                    self._condition.wait(
+                        None if ready is None else ready - monotonic())
+            self._send_item(*item)
+
+    def _get_bucket(self, target, now):
+        bucket = self._buckets.get(target)
+        if bucket is None:
+            bucket = self._buckets[target] = TokenBucket(
+                self.burst, self.refill_rate, now)
+            if len(self._buckets) > self.MAX_IDLE_TARGETS + len(self._lanes):
+                self._prune_buckets(now)
+        return bucket
+
+    def _prune_buckets(self, now):
+        # A full bucket is the same as a new one: forget those of the
+        # targets without waiting lines
+        for target, bucket in list(self._buckets.items()):
+            if target not in self._lanes and bucket.is_full(now):
+                del self._buckets[target]
+
+    def _get_wait(self, length):
+        # How long after the last line to a target, whose burst is used up,
+        # the next one can be sent anyway
+        penalty = float(max(0, length - 50)) / 70
+        return min(self.empty_wait + penalty, 2)
+
+    def _next_item(self, now):
+        # The next line of the first target whose turn it is and whose
+        # bucket allows it, as (item, None); or (None, when to try again),
+        # with None for when a line is queued
+        if not self._lanes:
+            return None, None
+
+        throttled = not self._stopping
+        if throttled:
+            ready = self._server_bucket.ready_at(now)
+            if ready > now:
+                return None, ready
+
+        soonest = None
+        for target, lane in self._lanes.items():
+            bucket = None
+            if throttled and target is not None and self.burst > 0:
+                bucket = self._get_bucket(target, now)
+                ready = bucket.ready_at(now, self._get_wait(lane[0][4]))
+                if ready > now:
+                    if soonest is None or ready < soonest:
+                        soonest = ready
+                    continue
+
+            item = lane.popleft()
+            self._size -= 1
+            # Take turns: this target goes after the others
+            del self._lanes[target]
+            if lane:
+                self._lanes[target] = lane
+            if bucket is not None:
+                bucket.take(now)
+            if throttled:
+                self._server_bucket.take(now)
+            return item, None
+
+        return None, soonest
+
+    def _send_item(self, data, text, queued_at, future, length):
+        stalled_at = None
+        try:
+            while data:
+                sent = self._send(data)
+                if not sent:
+                    # The socket wants us to try again later, e.g. TLS
+                    # needs to write first; give up on a stopped queue
+                    # only if it doesn't recover
+                    now = monotonic()
+                    if stalled_at is None:
+                        stalled_at = now
+                    elif (self._stopping and
+                            now - stalled_at >= self.STOP_SEND_TIMEOUT):
+                        raise IOError('connection closed')
+                    time.sleep(0.01)
+                    continue
+                stalled_at = None
+                data = data[sent:]
+        except Exception as error:  # TODO: Be specific
+            self.failed += 1
+            LOGGER.error('Could not send %r: %s', text, error)
+            if future is not None:
+                future.set_exception(error)
+            return
+
+        latency = monotonic() - queued_at
+        self.sent += 1
+        self.last_latency = latency
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        if self._log is not None and text is not None:
+            self._log(text)
+        if future is not None:
+            future.set_result()
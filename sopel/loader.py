@@ -5,13 +5,130 @@ import re
 import sys
 
 from sopel.tools import compile_rule, itervalues, get_command_regexp, get_nickname_command_regexp
+from sopel.tools.coroutines import iscoroutinefunction
 from sopel.config import core_section
 
 default_prefix = core_section.CoreSection.help_prefix.default
 del core_section
 
+try:
+    # Python 3.11+
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:
+    import sre_constants
+    import sre_parse
+
 if sys.version_info.major >= 3:
     basestring = (str, bytes)
+    unichr = chr
+    unicode = str
+
+
+_literal_command = re.compile(r'[\w-]+$', re.UNICODE)
+
+
+def _get_command_prefix_regexp(prefix):
+    # What comes before a command's name in get_command_regexp
+    prefix = re.sub(r"(\s)", r"\\\1", prefix)
+    return re.compile('(?:{})'.format(prefix), re.IGNORECASE | re.VERBOSE)
+
+
+def _get_nickname_prefix_regexp(nick, alias_nicks):
+    # What comes before a command's name in get_nickname_command_regexp
+    return compile_rule(nick, r'$nickname[:,]?\s+', alias_nicks)
+
+
+# With re.IGNORECASE, these also match non-ASCII characters (e.g. "K", the
+# Kelvin sign, matches "k"), which lowercasing the line won't reveal.
+_UNSAFE_IGNORECASE = set('iksIKS')
+
+
+def _has_fixed_width(regexp):
+    # Dispatch only looks up the word after the prefix's first match: if the
+    # prefix can match text of another length, the command's own regex may
+    # match after that instead (e.g. "..echo" with the prefix "\.|\.\.")
+    try:
+        low, high = sre_parse.parse(regexp.pattern, regexp.flags).getwidth()
+    except Exception:
+        return False
+    return low == high
+
+
+def _is_indexable_command(command):
+    # Dispatch looks up the lowercased word, which must give the same result
+    # as the command's re.IGNORECASE regex
+    return (
+        _literal_command.match(command) is not None and
+        all(ord(char) < 128 for char in command) and
+        not _UNSAFE_IGNORECASE.intersection(command)
+    )
+
+
+def _best_literals(first, second):
+    # The set of substrings whose shortest one is the longest: it rules out
+    # the most lines
+    if first is None:
+        return second
+    if second is None:
+        return first
+    if min(len(literal) for literal in second) > min(len(literal) for literal in first):
+        return second
+    return first
+
+
+def _required_literals(subpattern, ignorecase):
+    best = None
+    run = []
+    for op, av in subpattern:
+        if op == sre_constants.LITERAL:
+            char = unichr(av)
+            if ord(char) < 128 and not (ignorecase and char in _UNSAFE_IGNORECASE):
+                run.append(char.lower())
+                continue
+        if run:
+            best = _best_literals(best, set([''.join(run)]))
+            run = []
+        if op == sre_constants.SUBPATTERN:
+            if len(av) == 4 and (av[1] or av[2]):
+                # The group changes flags, e.g. (?i:...)
+                continue
+            best = _best_literals(best, _required_literals(av[-1], ignorecase))
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            if av[0] >= 1:
+                best = _best_literals(
+                    best, _required_literals(av[2], ignorecase))
+        elif op == sre_constants.BRANCH:
+            alternatives = [
+                _required_literals(alternative, ignorecase)
+                for alternative in av[1]
+            ]
+            if all(alternatives):
+                best = _best_literals(best, set().union(*alternatives))
+    if run:
+        best = _best_literals(best, set([''.join(run)]))
+    return best
+
+
+def get_required_literals(regexp):
+    """Get substrings, one of which is in any text that ``regexp`` matches.
+
+    :param regexp: a compiled rule
+    :type regexp: :ref:`re.Pattern <python:re-objects>`
+    :return: lowercased substrings, or ``None`` if none could be found
+    :rtype: frozenset
+
+    The text must be lowercased before looking for the substrings in it.
+    """
+    if not isinstance(regexp.pattern, unicode):
+        return None
+    try:
+        parsed = sre_parse.parse(regexp.pattern, regexp.flags)
+    except Exception:
+        # It compiled fine, so this is a quirk of the parser: don't filter
+        return None
+    literals = _required_literals(
+        parsed, bool(regexp.flags & re.IGNORECASE))
+    return frozenset(literals) if literals else None
 
 
 def trim_docstring(doc):
@@ -50,6 +167,9 @@ def clean_callable(func, config):
     func.echo = getattr(func, 'echo', False)
     func.priority = getattr(func, 'priority', 'medium')
     func.thread = getattr(func, 'thread', True)
+    func.listen = getattr(func, 'listen', False)
+    # ``async def`` callables run on the bot's event loop, not in a thread
+    func._coroutine = iscoroutinefunction(func)
     func.rate = getattr(func, 'rate', 0)
     func.channel_rate = getattr(func, 'channel_rate', 0)
     func.global_rate = getattr(func, 'global_rate', 0)
@@ -69,14 +189,29 @@ def clean_callable(func, config):
 
     if hasattr(func, 'commands') or hasattr(func, 'nickname_commands'):
         func.rule = getattr(func, 'rule', [])
-        for command in getattr(func, 'commands', []):
-            regexp = get_command_regexp(prefix, command)
-            if regexp not in func.rule:
-                func.rule.append(regexp)
-        for command in getattr(func, 'nickname_commands', []):
-            regexp = get_nickname_command_regexp(nick, command, alias_nicks)
+        # Command rules that dispatch can look up by their first word, rather
+        # than trying each one in turn (see sopel.plugins.rules.RuleIndex)
+        func._command_rules = {}
+        command_prefix = _get_command_prefix_regexp(prefix)
+        nickname_prefix = _get_nickname_prefix_regexp(nick, alias_nicks)
+        commands = [
+            (command, get_command_regexp(prefix, command), command_prefix)
+            for command in getattr(func, 'commands', [])
+        ] + [
+            (command,
+             get_nickname_command_regexp(nick, command, alias_nicks),
+             nickname_prefix)
+            for command in getattr(func, 'nickname_commands', [])
+        ]
+        fixed_width = {
+            command_prefix: _has_fixed_width(command_prefix),
+            nickname_prefix: _has_fixed_width(nickname_prefix),
+        }
+        for command, regexp, command_prefix in commands:
             if regexp not in func.rule:
                 func.rule.append(regexp)
+            if fixed_width[command_prefix] and _is_indexable_command(command):
+                func._command_rules[regexp] = (command_prefix, command.lower())
         if hasattr(func, 'example'):
             # If no examples are flagged as user-facing, just show the first one like Sopel<7 did
             examples = [rec["example"] for rec in func.example if rec["help"]] or [func.example[0]["example"]]
@@ -92,6 +227,17 @@ def clean_callable(func, config):
             for command in cmds:
                 func._docs[command] = (doc, examples)
 
+    if hasattr(func, 'rule'):
+        # What a line must contain for each rule to match it, so dispatch can
+        # skip the rule without running it (see sopel.plugins.rules)
+        command_rules = getattr(func, '_command_rules', {})
+        func._rule_literals = {}
+        for rule in func.rule:
+            if rule not in command_rules:
+                literals = get_required_literals(rule)
+                if literals:
+                    func._rule_literals[rule] = literals
+
     if hasattr(func, 'intents'):
         # Can be implementation-dependent
         _regex_type = type(re.compile(''))
@@ -104,7 +250,7 @@ def clean_callable(func, config):
 
 
 def is_triggerable(obj):
-    return any(hasattr(obj, attr) for attr in ('rule', 'intents', 'commands', 'nickname_commands'))
+    return any(hasattr(obj, attr) for attr in ('rule', 'intents', 'commands', 'nickname_commands', 'listen'))
 
 
 def clean_module(module, config):
@@ -11,17 +11,24 @@ from __future__ import unicode_literals, absolute_import, print_function, divisi
 import re
 import functools
 
+import sopel.tools.processes
+from sopel.tools.processes import ProcessError, ProcessTimeout
+
 __all__ = [
     # constants
     'NOLIMIT', 'VOICE', 'HALFOP', 'OP', 'ADMIN', 'OWNER',
+    # exceptions
+    'ProcessError', 'ProcessTimeout',
     # decorators
     'commands',
     'echo',
     'example',
     'intent',
     'interval',
+    'listen',
     'nickname_commands',
     'priority',
+    'process',
     'rate',
     'require_admin',
     'require_chanmsg',
@@ -163,6 +170,49 @@ def thread(value):
     return add_attribute
 
 
+def process(timeout=5):
+    """Decorate a function to run it in a separate process, with limits.
+
+    :param float timeout: how long the function can take, in seconds
+
+    This is meant for pure, CPU-bound computations, which would otherwise
+    compete for the GIL with the rest of the bot. The decorated function is
+    not a callable itself: a callable calls it, and gets its result back::
+
+        from sopel import module
+
+        @module.process(timeout=2)
+        def fibonacci(n):
+            a, b = 0, 1
+            for _ in range(n):
+                a, b = b, a + b
+            return a
+
+        @module.commands('fib')
+        def fib(bot, trigger):
+            try:
+                bot.say(str(fibonacci(int(trigger.group(3)))))
+            except module.ProcessTimeout:
+                bot.say('That took too long.')
+
+    The function runs in a worker process, which doesn't share anything with
+    the bot. It must be defined at the top level of the plugin, and its
+    arguments, result, and exceptions must be picklable. The exceptions it
+    raises are raised again in the caller.
+
+    A function that doesn't return within ``timeout`` seconds is stopped,
+    and :exc:`ProcessTimeout` is raised. Each worker process also has a
+    memory limit, set with
+    :attr:`~sopel.config.core_section.CoreSection.process_memory_limit`;
+    going over it raises :exc:`MemoryError`.
+
+    .. versionadded:: 7.0
+    """
+    def actual_decorator(function):
+        return sopel.tools.processes.wrap(function, timeout)
+    return actual_decorator
+
+
 def echo(function=None):
     """Decorate a function to specify if it should receive echo messages.
 
@@ -294,6 +344,42 @@ def intent(*intent_list):
     return add_attribute
 
 
+def listen(event='PRIVMSG'):
+    """Decorate a function to be given every line of an IRC event, as is.
+
+    :param event: the event, or a list of events, e.g. ``'PRIVMSG'``, to
+                  listen to
+
+    A listener is for plugins that watch every message, e.g. to remember
+    when a user was last seen. It's called with the bot (a
+    :class:`sopel.bot.Sopel`, so :meth:`~sopel.bot.Sopel.say` needs a
+    recipient) and the :class:`sopel.trigger.PreTrigger` of the line::
+
+        @module.listen(event='PRIVMSG')
+        def note(bot, pretrigger):
+            last_seen[pretrigger.nick] = pretrigger.time
+
+    Nothing is matched, and there is no :class:`~sopel.trigger.Trigger`
+    and no rate limiting: listeners are called one at a time, in the order
+    the lines were received, by a thread that they share. Lines from
+    blocked nicks or hosts are left out, unless the function is
+    :func:`unblockable`, and so are the bot's own messages, unless it
+    has :func:`echo`. A listener with ``@thread(False)`` is called by the
+    thread that reads from the server instead.
+
+    .. versionadded:: 7.0
+    """
+    events = list(event) if isinstance(event, (list, tuple)) else [event]
+
+    def add_attribute(function):
+        function.listen = True
+        if not hasattr(function, "event"):
+            function.event = []
+        function.event.extend(events)
+        return function
+    return add_attribute
+
+
 def rate(user=0, channel=0, server=0):
     """Decorate a function to limit how often it can be triggered on a per-user
     basis, in a channel, or across the server (bot). A value of zero means no
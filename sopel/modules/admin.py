@@ -12,6 +12,8 @@ https://sopel.chat
 """
 from __future__ import unicode_literals, absolute_import, print_function, division
 
+import os
+
 from sopel.config.types import (
     StaticSection, ValidatedAttribute, FilenameAttribute
 )
@@ -327,3 +329,50 @@ def set_config(bot, trigger):
 def save_config(bot, trigger):
     """Save state of Sopel's config object to the configuration file."""
     bot.config.save()
+
+
+@sopel.module.require_privmsg
+@sopel.module.require_admin
+@sopel.module.commands('callstats')
+@sopel.module.example('.callstats')
+@sopel.module.example('.callstats 5 max')
+@sopel.module.example('.callstats dump')
+def call_stats(bot, trigger):
+    """Show the callables and jobs that took the most time.
+
+    Give how many to show (10 by default), and what to sort them by: total,
+    average, max, calls, or errors. "dump" writes them all to a file in the
+    log directory instead, and "reset" forgets them.
+    """
+    args = (trigger.group(2) or '').split()
+    if args == ['dump']:
+        filename = os.path.join(
+            bot.config.core.logdir, bot.config.basename + '.callstats.json')
+        bot.call_stats.dump(filename)
+        bot.reply('Call statistics written to %s' % filename)
+        return
+    if args == ['reset']:
+        bot.call_stats.clear()
+        bot.reply('Call statistics reset.')
+        return
+
+    limit, key = 10, 'total'
+    for arg in args:
+        if arg.isdigit():
+            limit = int(arg)
+        elif arg in ('total', 'average', 'max', 'calls', 'errors'):
+            key = arg
+        else:
+            bot.reply('Usage: .callstats [count] '
+                      '[total|average|max|calls|errors], or dump, or reset')
+            return
+
+    top = bot.call_stats.top(limit, key)
+    if not top:
+        bot.reply('No calls recorded yet.')
+        return
+    for name, stats in top:
+        bot.say(
+            '{name}: {calls} calls, {errors} errors, {total:.2f}s total, '
+            '{average:.3f}s average, p95 <= {p95:.3f}s, max {max:.3f}s'
+            .format(name=name, **stats))
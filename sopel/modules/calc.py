@@ -12,7 +12,7 @@ import sys
 
 from requests import get
 
-from sopel.module import commands, example
+from sopel.module import commands, example, process, ProcessTimeout
 from sopel.tools.calculation import eval_equation
 
 if sys.version_info.major < 3:
@@ -30,6 +30,12 @@ if sys.version_info.major >= 3:
 BASE_TUMBOLIA_URI = 'https://tumbolia-sopel.appspot.com/'
 
 
+@process(timeout=5)
+def evaluate(eqn):
+    """Evaluate and format an equation, in a worker process."""
+    return "{:.10g}".format(eval_equation(eqn))
+
+
 @commands('c', 'calc')
 @example('.c 5 + 3', '8')
 @example('.c 0.9*10', '9')
@@ -45,10 +51,11 @@ def c(bot, trigger):
     # Account for the silly non-Anglophones and their silly radix point.
     eqn = trigger.group(2).replace(',', '.')
     try:
-        result = eval_equation(eqn)
-        result = "{:.10g}".format(result)
+        result = evaluate(eqn)
     except ZeroDivisionError:
         result = "Division by zero is not supported in this universe."
+    except ProcessTimeout:
+        result = "Sorry, that took too long to calculate."
     except Exception as e:
         result = "{error}: {msg}".format(error=type(e), msg=e)
     bot.reply(result)
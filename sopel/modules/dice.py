@@ -165,6 +165,12 @@ def _roll_dice(bot, dice_expression):
     return dice
 
 
+@sopel.module.process(timeout=5)
+def evaluate(eval_str):
+    """Evaluate the equation of a roll, in a worker process."""
+    return eval_equation(eval_str)
+
+
 @sopel.module.commands("roll")
 @sopel.module.commands("dice")
 @sopel.module.commands("d")
@@ -221,15 +227,16 @@ def roll(bot, trigger):
     pretty_str = arg_str % (tuple(map(_get_pretty_str, dice)))
 
     try:
-        result = eval_equation(eval_str)
+        result = evaluate(eval_str)
     except TypeError:
         bot.reply(
             "The type of this equation is, apparently, not a string. "
             "How did you do that, anyway?"
         )
-    except ValueError:
+    except (ValueError, sopel.module.ProcessError):
         # As it seems that ValueError is raised if the resulting equation would
-        # be too big, give a semi-serious answer to reflect on this.
+        # be too big, give a semi-serious answer to reflect on this. The same
+        # goes if it took too long.
         bot.reply("You roll %s: %s = very big" % (
             trigger.group(2), pretty_str))
         return
@@ -15,7 +15,7 @@ from __future__ import unicode_literals, absolute_import, print_function, divisi
 
 import re
 from sopel.tools import Identifier, SopelMemory
-from sopel.module import rule, priority, echo
+from sopel.module import rule, priority, echo, listen
 from sopel.formatting import bold
 
 
@@ -32,22 +32,22 @@ def shutdown(bot):
 
 
 @echo
-@rule('.*')
+@listen(event='PRIVMSG')
 @priority('low')
-def collectlines(bot, trigger):
+def collectlines(bot, pretrigger):
     """Create a temporary log of what people say"""
-    if trigger.is_privmsg:
+    if pretrigger.sender.is_nick():
         return  # Don't log things in PM
 
     # Add a log for the channel and nick, if there isn't already one
-    if trigger.sender not in bot.memory['find_lines']:
-        bot.memory['find_lines'][trigger.sender] = SopelMemory()
-    if Identifier(trigger.nick) not in bot.memory['find_lines'][trigger.sender]:
-        bot.memory['find_lines'][trigger.sender][Identifier(trigger.nick)] = list()
+    if pretrigger.sender not in bot.memory['find_lines']:
+        bot.memory['find_lines'][pretrigger.sender] = SopelMemory()
+    if pretrigger.nick not in bot.memory['find_lines'][pretrigger.sender]:
+        bot.memory['find_lines'][pretrigger.sender][pretrigger.nick] = list()
 
     # Create a temporary list of the user's lines in a channel
-    templist = bot.memory['find_lines'][trigger.sender][Identifier(trigger.nick)]
-    line = trigger.group()
+    templist = bot.memory['find_lines'][pretrigger.sender][pretrigger.nick]
+    line = pretrigger.text
     if line.startswith("s/"):  # Don't remember substitutions
         return
     elif line.startswith("\x01ACTION"):  # For /me messages
@@ -58,7 +58,7 @@ def collectlines(bot, trigger):
 
     del templist[:-10]  # Keep the log to 10 lines per person
 
-    bot.memory['find_lines'][trigger.sender][Identifier(trigger.nick)] = templist
+    bot.memory['find_lines'][pretrigger.sender][pretrigger.nick] = templist
 
 
 # Match nick, s/find/replace/flags. Flags and nick are optional, nick can be
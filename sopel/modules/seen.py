@@ -12,7 +12,7 @@ from __future__ import unicode_literals, absolute_import, print_function, divisi
 import datetime
 import time
 
-from sopel.module import commands, rule, priority, thread
+from sopel.module import commands, listen, priority, thread
 from sopel.tools import Identifier
 from sopel.tools.time import get_timezone, format_time
 
@@ -53,11 +53,11 @@ def seen(bot, trigger):
 
 
 @thread(False)
-@rule('(.*)')
+@listen(event='PRIVMSG')
 @priority('low')
-def note(bot, trigger):
-    if not trigger.is_privmsg:
-        bot.db.set_nick_value(trigger.nick, 'seen_timestamp', time.time())
-        bot.db.set_nick_value(trigger.nick, 'seen_channel', trigger.sender)
-        bot.db.set_nick_value(trigger.nick, 'seen_message', trigger)
-        bot.db.set_nick_value(trigger.nick, 'seen_action', 'intent' in trigger.tags)
+def note(bot, pretrigger):
+    if not pretrigger.sender.is_nick():
+        bot.db.set_nick_value(pretrigger.nick, 'seen_timestamp', time.time())
+        bot.db.set_nick_value(pretrigger.nick, 'seen_channel', pretrigger.sender)
+        bot.db.set_nick_value(pretrigger.nick, 'seen_message', pretrigger.text)
+        bot.db.set_nick_value(pretrigger.nick, 'seen_action', 'intent' in pretrigger.tags)
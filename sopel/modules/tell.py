@@ -13,7 +13,7 @@ import time
 import threading
 import sys
 
-from sopel.module import commands, nickname_commands, rule, priority, example
+from sopel.module import commands, nickname_commands, listen, priority, example
 from sopel.tools import Identifier, iterkeys
 from sopel.tools.time import get_timezone, format_time
 
@@ -163,12 +163,12 @@ def getReminders(bot, channel, key, tellee):
     return lines
 
 
-@rule('(.*)')
+@listen(event='PRIVMSG')
 @priority('low')
-def message(bot, trigger):
+def message(bot, pretrigger):
 
-    tellee = trigger.nick
-    channel = trigger.sender
+    tellee = pretrigger.nick
+    channel = pretrigger.sender
 
     if not os.path.exists(bot.tell_filename):
         return
@@ -184,10 +184,10 @@ def message(bot, trigger):
             reminders.extend(getReminders(bot, channel, remkey, tellee))
 
     for line in reminders[:MAXIMUM]:
-        bot.say(line)
+        bot.say(line, channel)
 
     if reminders[MAXIMUM:]:
-        bot.say('Further messages sent privately')
+        bot.say('Further messages sent privately', channel)
         for line in reminders[MAXIMUM:]:
             bot.say(line, tellee)
 
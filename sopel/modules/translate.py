@@ -16,7 +16,7 @@ import sys
 import requests
 
 from sopel import web
-from sopel.module import rule, commands, priority, example
+from sopel.module import rule, commands, priority, example, listen
 
 if sys.version_info.major >= 3:
     unicode = str
@@ -213,11 +213,11 @@ def mangle(bot, trigger):
     bot.reply(phrase[0])
 
 
-@rule('(.*)')
+@listen(event='PRIVMSG')
 @priority('low')
-def collect_mangle_lines(bot, trigger):
+def collect_mangle_lines(bot, pretrigger):
     global mangle_lines
-    mangle_lines[trigger.sender.lower()] = "%s said '%s'" % (trigger.nick, (trigger.group(0).strip()))
+    mangle_lines[pretrigger.sender.lower()] = "%s said '%s'" % (pretrigger.nick, (pretrigger.text.strip()))
 
 
 if __name__ == "__main__":
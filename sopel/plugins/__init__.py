@@ -33,7 +33,7 @@ import os
 
 import pkg_resources
 
-from . import exceptions, handlers  # noqa
+from . import exceptions, handlers, policy, rules  # noqa
 
 
 def _list_plugin_filenames(directory):
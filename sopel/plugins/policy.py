@@ -0,0 +1,127 @@
+# coding=utf-8
+"""Per-channel restrictions on plugin callables.
+
+A channel's section of the configuration can disable plugins, or some of
+their callables, in that channel::
+
+    [#channel]
+    disable_modules = weather,wikipedia
+    disable_commands = {'dice': ['roll']}
+
+``disable_modules`` can also be ``*``, to disable every plugin. These
+settings are read once into a :class:`ChannelPolicy`, which
+:class:`sopel.bot.Sopel` looks up for each callable it may trigger, and read
+again only when the configuration changes.
+"""
+# Licensed under the Eiffel Forum License 2.
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+from ast import literal_eval
+import threading
+
+from sopel.logger import get_logger
+from sopel.tools import Identifier
+
+
+__all__ = ['ChannelPolicy', 'Restrictions']
+
+LOGGER = get_logger(__name__)
+
+
+class Restrictions(object):
+    """What is disabled in a channel.
+
+    :param bool everything: whether every plugin is disabled
+    :param frozenset modules: the names of the disabled plugins
+    :param frozenset commands: the disabled callables, as
+                               ``(plugin name, function name)`` tuples
+    """
+    __slots__ = ('everything', 'modules', 'commands')
+
+    def __init__(self, everything, modules, commands):
+        self.everything = everything
+        self.modules = modules
+        self.commands = commands
+
+    def disables(self, func):
+        """Tell if ``func`` is disabled.
+
+        :param func: a plugin callable
+        :type func: :term:`function`
+        :rtype: bool
+        """
+        return (self.everything or
+                func.__module__ in self.modules or
+                (func.__module__, func.__name__) in self.commands)
+
+
+class ChannelPolicy(object):
+    """The callables disabled in each channel, read from the configuration.
+
+    :param config: the bot's configuration
+    :type config: :class:`sopel.config.Config`
+    """
+    def __init__(self, config):
+        self.config = config
+        self._lock = threading.Lock()
+        self._version = None
+        self._channels = {}
+
+    def _get_channels(self):
+        version = self.config.version
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._channels = self._read()
+                    self._version = version
+        return self._channels
+
+    def _read(self):
+        parser = self.config.parser
+        channels = {}
+        for section in parser.sections():
+            modules = commands = None
+            if parser.has_option(section, 'disable_modules'):
+                modules = parser.get(section, 'disable_modules')
+            if parser.has_option(section, 'disable_commands'):
+                commands = parser.get(section, 'disable_commands')
+            if not (modules or commands):
+                continue
+
+            modules = set(
+                name.strip() for name in (modules or '').split(','))
+            disabled_commands = set()
+            if commands:
+                try:
+                    for module, names in literal_eval(commands).items():
+                        disabled_commands.update(
+                            (module, name) for name in names)
+                except Exception as error:
+                    LOGGER.error(
+                        'Invalid disable_commands for %s, ignoring it: %s',
+                        section, error)
+            channels[Identifier(section)] = Restrictions(
+                '*' in modules, frozenset(modules), frozenset(disabled_commands))
+        return channels
+
+    def get(self, channel):
+        """Get what is disabled in ``channel``.
+
+        :param channel: a channel, or a nick for private messages
+        :type channel: :class:`~sopel.tools.Identifier`
+        :return: the channel's restrictions, or ``None`` if there are none
+        :rtype: :class:`Restrictions`
+        """
+        return self._get_channels().get(channel)
+
+    def is_disabled(self, func, channel):
+        """Tell if ``func`` is disabled in ``channel``.
+
+        :param func: a plugin callable
+        :type func: :term:`function`
+        :param channel: where ``func`` would be triggered
+        :type channel: :class:`~sopel.tools.Identifier`
+        :rtype: bool
+        """
+        restrictions = self.get(channel)
+        return restrictions is not None and restrictions.disables(func)
@@ -0,0 +1,258 @@
+# coding=utf-8
+"""Index of the rules that trigger plugin callables.
+
+For each line it receives, :class:`sopel.bot.Sopel` looks up the callables
+that may be triggered by it in a :class:`RuleIndex`, rather than trying every
+rule of every plugin.
+
+Command rules are looked up by their command word: the command prefix (or
+the bot's nickname) is stripped from the line, and only the rules of the
+command named by the next word are tried. This is only done for commands
+whose word can't be matched otherwise, after a prefix that always matches
+text of the same length; the other command rules, like any other rule, are
+tried in turn, except those that need a literal substring which is not in
+the line.
+
+Listeners (see :func:`sopel.module.listen`) have no rule: they are indexed by
+event only, and get every line of that event.
+"""
+# Licensed under the Eiffel Forum License 2.
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+import collections
+import itertools
+import re
+
+
+__all__ = ['PRIORITIES', 'RuleIndex']
+
+PRIORITIES = ('high', 'medium', 'low')
+"""Callable priorities, in the order their callables are triggered."""
+
+
+class RuleIndex(object):
+    """The rules of registered callables, indexed by event, then priority.
+
+    Callables are added and removed one at a time, as plugins are loaded and
+    unloaded.
+
+    A callable's command rules are indexed by their command word instead, if
+    :func:`sopel.loader.clean_callable` could tell which word that is. It
+    also tells which substrings a rule needs, one of which must be in a line
+    for the rule to match it.
+    """
+    def __init__(self):
+        # (event, priority, rule) -> [callables]
+        self._funcs = {}
+        # (event, priority, rule) -> order in which it was first added
+        self._order = {}
+        self._counter = itertools.count()
+        # event -> priority -> rule -> callables, for rules without a command
+        self._events = {}
+        # event -> command prefix -> command word -> [keys]
+        self._commands = {}
+        # (event, priority, rule) -> (command prefix, command word)
+        self._command_of = {}
+        # (event, priority, rule) -> lowercased substrings it needs
+        self._literals = {}
+        # callable -> [(event, priority, rule)] it's registered under
+        self._registered = {}
+        # event -> sorted rules without a command, as (sort key, rule,
+        # callables, substrings) tuples
+        self._cache = {}
+        # event -> listeners, in priority order
+        self._listeners = {}
+        self._catch_all = re.compile('.*')
+
+    def __contains__(self, func):
+        return func in self._registered
+
+    def __len__(self):
+        return len(self._registered)
+
+    def add(self, func):
+        """Add a callable to the index.
+
+        :param func: the callable to add, as cleaned up by
+                     :func:`sopel.loader.clean_callable`
+        :type func: :term:`function`
+
+        A callable without rules, e.g. one with only ``intents``, is added
+        with a catch-all rule. A listener is added to :meth:`listeners`
+        instead.
+
+        :raise ValueError: if the callable's priority is not one of
+                           :data:`PRIORITIES`
+        """
+        if func in self._registered:
+            return
+        if func.priority not in PRIORITIES:
+            raise ValueError('Invalid priority %r for %s' % (
+                func.priority, getattr(func, '__name__', func)))
+        if getattr(func, 'listen', False):
+            self._add_listener(func)
+            return
+        # `re.compile('.*') is re.compile('.*')` because of caching, so we
+        # need to associate a list with each regex, since they are
+        # unexpectedly indistinct.
+        rules = getattr(func, 'rule', None) or [self._catch_all]
+        command_rules = getattr(func, '_command_rules', {})
+        rule_literals = getattr(func, '_rule_literals', {})
+        keys = []
+        for event in func.event:
+            for rule in rules:
+                key = (event, func.priority, rule)
+                if key in keys:
+                    continue
+                keys.append(key)
+                if key not in self._funcs:
+                    self._add_key(key, command_rules.get(rule),
+                                  rule_literals.get(rule))
+                self._funcs[key].append(func)
+        self._registered[func] = keys
+        self._cache.clear()
+
+    def _add_listener(self, func):
+        for event in func.event:
+            # A new tuple, so dispatch can go through the old one meanwhile
+            listeners = self._listeners.get(event, ()) + (func,)
+            self._listeners[event] = tuple(sorted(
+                listeners, key=lambda item: PRIORITIES.index(item.priority)))
+        self._registered[func] = []
+
+    def _remove_listener(self, func):
+        for event in func.event:
+            listeners = tuple(
+                item for item in self._listeners.get(event, ())
+                if item is not func)
+            if listeners:
+                self._listeners[event] = listeners
+            else:
+                self._listeners.pop(event, None)
+
+    def _add_key(self, key, command, literals):
+        event, priority, rule = key
+        funcs = self._funcs[key] = []
+        self._order[key] = next(self._counter)
+        if command is None:
+            if literals:
+                self._literals[key] = literals
+            by_priority = self._events.setdefault(event, {})
+            by_rule = by_priority.setdefault(
+                priority, collections.OrderedDict())
+            by_rule[rule] = funcs
+        else:
+            prefix, word = command
+            self._command_of[key] = command
+            by_prefix = self._commands.setdefault(event, {})
+            by_prefix.setdefault(prefix, {}).setdefault(word, []).append(key)
+
+    def _remove_key(self, key):
+        event, priority, rule = key
+        del self._funcs[key]
+        del self._order[key]
+        command = self._command_of.pop(key, None)
+        self._literals.pop(key, None)
+        if command is None:
+            by_priority = self._events[event]
+            by_rule = by_priority[priority]
+            del by_rule[rule]
+            if not by_rule:
+                del by_priority[priority]
+            if not by_priority:
+                del self._events[event]
+        else:
+            prefix, word = command
+            by_prefix = self._commands[event]
+            by_word = by_prefix[prefix]
+            by_word[word].remove(key)
+            if not by_word[word]:
+                del by_word[word]
+            if not by_word:
+                del by_prefix[prefix]
+            if not by_prefix:
+                del self._commands[event]
+
+    def remove(self, func):
+        """Remove a callable from the index.
+
+        :param func: the callable to remove
+        :type func: :term:`function`
+
+        Nothing happens if ``func`` is not in the index.
+        """
+        if func in self._registered and getattr(func, 'listen', False):
+            self._remove_listener(func)
+        for key in self._registered.pop(func, ()):
+            funcs = self._funcs[key]
+            funcs.remove(func)
+            # Don't leave empty entries behind, for dispatch to go through
+            if not funcs:
+                self._remove_key(key)
+        self._cache.clear()
+
+    def _sort_key(self, key):
+        return (PRIORITIES.index(key[1]), self._order[key])
+
+    def _get_rules(self, event):
+        rules = self._cache.get(event)
+        if rules is None:
+            rules = []
+            for priority, by_rule in self._events.get(event, {}).items():
+                for rule, funcs in by_rule.items():
+                    key = (event, priority, rule)
+                    rules.append((self._sort_key(key), rule, funcs,
+                                  self._literals.get(key)))
+            rules.sort(key=lambda item: item[0])
+            self._cache[event] = rules
+        return rules
+
+    def get(self, event, text=''):
+        """Get the rules that can trigger a callable on ``event``.
+
+        :param str event: the IRC event, e.g. ``PRIVMSG``
+        :param str text: the last argument of the line, which the rules are
+                         matched against
+        :return: ``(rule, callables)`` pairs, in priority order, then in the
+                 order they were added
+        :rtype: list
+
+        Of the command rules, only those for the command named in ``text``
+        are returned. Of the other rules, those that need a substring not in
+        ``text`` are left out.
+        """
+        rules = []
+        lowered = None
+        for item in self._get_rules(event):
+            literals = item[3]
+            if literals is not None:
+                if lowered is None:
+                    lowered = text.lower()
+                if not any(literal in lowered for literal in literals):
+                    continue
+            rules.append(item)
+
+        commands = []
+        for prefix, by_word in self._commands.get(event, {}).items():
+            match = prefix.match(text)
+            if not match:
+                continue
+            word = text[match.end():].split(None, 1)
+            if not word:
+                continue
+            for key in by_word.get(word[0].lower(), ()):
+                commands.append(
+                    (self._sort_key(key), key[2], self._funcs[key], None))
+        if commands:
+            rules = sorted(rules + commands, key=lambda item: item[0])
+        return [(rule, funcs) for _, rule, funcs, _ in rules]
+
+    def listeners(self, event):
+        """Get the listeners of ``event``.
+
+        :param str event: the IRC event, e.g. ``PRIVMSG``
+        :return: the listeners, in priority order, then in the order they
+                 were added
+        :rtype: tuple
+        """
+        return self._listeners.get(event, ())
@@ -14,15 +14,11 @@ import re
 import sys
 import tempfile
 
-try:
-    import ConfigParser
-except ImportError:
-    import configparser as ConfigParser
-
 from sopel.bot import SopelWrapper
 import sopel.config
 import sopel.config.core_section
 import sopel.tools
+import sopel.tools.profiling
 import sopel.tools.target
 import sopel.trigger
 
@@ -44,7 +40,7 @@ if sys.version_info.major >= 3:
 class MockConfig(sopel.config.Config):
     def __init__(self):
         self.filename = tempfile.mkstemp()[1]
-        self.parser = ConfigParser.RawConfigParser(allow_no_value=True)
+        self.parser = sopel.config._Parser(allow_no_value=True)
         self.parser.add_section('core')
         self.parser.set('core', 'owner', 'Embolalia')
         self.define_section('core', sopel.config.core_section.CoreSection)
@@ -79,6 +75,7 @@ class MockSopel(object):
         self._init_config()
 
         self.output = []
+        self.call_stats = sopel.tools.profiling.CallStats()
 
         if admin:
             self.config.core.admins = [self.nick]
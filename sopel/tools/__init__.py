@@ -192,6 +192,96 @@ def get_nickname_command_pattern(command):
         """.format(command=command)
 
 
+_FORMATTING_CODE = re.compile(
+    br'\x03(?:\d{1,2}(?:,\d{1,2})?)?'
+    br'|\x04(?:[0-9a-fA-F]{6}(?:,[0-9a-fA-F]{6})?)?')
+"""A color formatting code, which spans several bytes."""
+
+
+def _is_continuation_byte(data, index):
+    return ord(data[index:index + 1]) & 0xC0 == 0x80
+
+
+def _hard_split_point(data, start, end):
+    # Find where to cut ``data`` at or before ``end``, neither inside a
+    # multibyte character nor inside a color code
+    cut = end
+    while cut > start and _is_continuation_byte(data, cut):
+        cut -= 1
+    # A color code is at most 14 bytes long (\x04RRGGBB,RRGGBB)
+    lookbehind = max(start, cut - 13)
+    code_start = max(data.rfind(b'\x03', lookbehind, cut),
+                     data.rfind(b'\x04', lookbehind, cut))
+    if code_start > start:
+        if _FORMATTING_CODE.match(data, code_start).end() > cut:
+            cut = code_start
+    if cut <= start:
+        # Can't be helped: at least make progress, one character at a time
+        cut = start + 1
+        while cut < len(data) and _is_continuation_byte(data, cut):
+            cut += 1
+    return cut
+
+
+def split_message(text, max_length=400, max_messages=None):
+    """Split ``text`` into lines of at most ``max_length`` bytes.
+
+    :param str text: text to split (expects Unicode-encoded string)
+    :param int max_length: maximum length of each line, in UTF-8 bytes
+    :param int max_messages: maximum number of lines; the last one contains
+                             the whole remainder, even if it's too long
+    :return: the lines, with at least one (maybe empty) line
+    :rtype: list
+
+    Each line is cut at its last space, or if it has none, as close to
+    ``max_length`` bytes as possible without breaking a multibyte character
+    or a color formatting code. The text is encoded only once, and the lines
+    are found in a single pass over its bytes.
+    """
+    data = text.encode('utf-8')
+    size = len(data)
+    lines = []
+    start = 0
+
+    while size - start > max_length:
+        if max_messages is not None and len(lines) >= max_messages - 1:
+            break
+        end = start + max_length
+        # A space right at the limit still leaves a full line before it
+        cut = data.rfind(b' ', start, end + 1)
+        if cut > start:
+            lines.append(data[start:cut])
+        else:
+            cut = _hard_split_point(data, start, end)
+            lines.append(data[start:cut])
+        # Leading spaces are not sent at the start of a line
+        while cut < size and data[cut:cut + 1] == b' ':
+            cut += 1
+        start = cut
+
+    if start < size or not lines:
+        lines.append(data[start:])
+
+    return [line.decode('utf-8') for line in lines]
+
+
+def truncate_message(text, max_length):
+    """Truncate ``text`` to at most ``max_length`` bytes.
+
+    :param str text: text to truncate (expects Unicode-encoded string)
+    :param int max_length: maximum length of the text, in UTF-8 bytes
+    :return: the truncated text
+    :rtype: str
+
+    Like :func:`split_message`, this never cuts a multibyte character or a
+    color formatting code in half.
+    """
+    data = text.encode('utf-8')
+    if len(data) <= max_length:
+        return text
+    return data[:_hard_split_point(data, 0, max_length)].decode('utf-8')
+
+
 def get_sendable_message(text, max_length=400):
     """Get a sendable ``text`` message, with its excess when needed.
 
@@ -200,31 +290,13 @@ def get_sendable_message(text, max_length=400):
     :return: a tuple of two values, the sendable text and its excess text
     :rtype: (str, str)
 
-    We're arbitrarily saying that the max is 400 bytes of text when
-    messages will be split. Otherwise, we'd have to account for the bot's
-    hostmask, which is hard.
-
-    The ``max_length`` is the max length of text in **bytes**, but we take
-    care of Unicode 2-byte characters by working on the Unicode string,
-    then making sure the bytes version is smaller than the max length.
+    The ``max_length`` is the max length of text in **bytes**. The text is
+    split as :func:`split_message` does.
     """
-    unicode_max_length = max_length
-    excess = ''
-
-    while len(text.encode('utf-8')) > max_length:
-        last_space = text.rfind(' ', 0, unicode_max_length)
-        if last_space == -1:
-            # No last space, just split where it is possible
-            excess = text[unicode_max_length:] + excess
-            text = text[:unicode_max_length]
-            # Decrease max length for the unicode string
-            unicode_max_length = unicode_max_length - 1
-        else:
-            # Split at the last best space found
-            excess = text[last_space:]
-            text = text[:last_space]
-
-    return text, excess.lstrip()
+    lines = split_message(text, max_length, max_messages=2)
+    if len(lines) == 1:
+        return lines[0], ''
+    return lines[0], lines[1]
 
 
 def deprecated(old):
@@ -455,6 +527,21 @@ def get_hostmask_regex(mask):
     return re.compile(mask + '$', re.I)
 
 
+def get_hostmasks_regex(masks):
+    """Get a single compiled regex pattern for several IRC hostmasks
+
+    :param masks: the hostmasks that the pattern should match
+    :type masks: :term:`iterable`
+    :return: a compiled regex pattern matching any of the given ``masks``, or
+             ``None`` if there are none
+    :rtype: :py:class:`re.Pattern`
+    """
+    masks = [re.escape(mask).replace(r'\*', '.*') for mask in masks if mask]
+    if not masks:
+        return None
+    return re.compile('(?:%s)$' % '|'.join(masks), re.I)
+
+
 class SopelMemory(dict):
     """A simple thread-safe ``dict`` implementation.
 
@@ -0,0 +1,148 @@
+# coding=utf-8
+"""Matcher for the nick and host blocklists.
+
+.. note::
+
+    :mod:`sopel.tools.blocks` is an internal tool. Therefore, it is not
+    shown in the public documentation.
+
+:attr:`~sopel.config.core_section.CoreSection.nick_blocks` and
+:attr:`~sopel.config.core_section.CoreSection.host_blocks` are lists of
+regular expressions, each of which must match a whole nick or host. A
+:class:`BlockList` compiles each list into a single pattern where it can, and
+keeps the verdict for the nicks and hosts it has seen, so that checking a line
+from a known sender is a dictionary lookup. Both are done again when the
+configuration changes, for example when the ``.blocks`` command edits the
+lists.
+"""
+# Licensed under the Eiffel Forum License 2.
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+import collections
+import re
+import threading
+
+from sopel.logger import get_logger
+from sopel.tools import Identifier
+
+
+__all__ = ['BlockList']
+
+LOGGER = get_logger(__name__)
+
+_group_reference = re.compile(r'\\[1-9]|\(\?P=|\(\?\(')
+
+
+class _Matcher(object):
+    """Match values against a list of masks.
+
+    :param list masks: regular expressions, each matching a whole value
+    :param normalize: makes a mask into a value to compare with as-is
+
+    A value matches if it's equal to a normalized mask, or if a mask
+    matches the whole value, ignoring case.
+    """
+    def __init__(self, masks, normalize):
+        masks = [mask.strip() for mask in masks]
+        masks = [mask for mask in masks if mask]
+        self._literals = frozenset(normalize(mask) for mask in masks)
+
+        # Each mask must match up to the end of the value, as with
+        # re.match(mask + '$', value)
+        self._regexes = []
+        for mask in masks:
+            try:
+                self._regexes.append(re.compile(mask + '$', re.IGNORECASE))
+            except re.error as error:
+                LOGGER.warning(
+                    'Invalid block %r, it only blocks itself: %s', mask, error)
+
+        # Masks that refer to their own groups can't share a pattern, as
+        # their groups would be numbered differently
+        alone = [regex for regex in self._regexes
+                 if _group_reference.search(regex.pattern)]
+        together = [regex for regex in self._regexes if regex not in alone]
+        if len(together) > 1:
+            combined = '|'.join(
+                '(?:%s)' % regex.pattern for regex in together)
+            try:
+                together = [re.compile(combined, re.IGNORECASE)]
+            except re.error:
+                # e.g. the masks use inline flags, or the same group name:
+                # keep matching them one at a time
+                pass
+        self._regexes = together + alone
+
+    def __bool__(self):
+        return bool(self._literals)
+
+    __nonzero__ = __bool__
+
+    def match(self, value, key):
+        """Tell if ``value`` is blocked; ``key`` is its normalized form."""
+        return (key in self._literals or
+                any(regex.match(value) for regex in self._regexes))
+
+
+class BlockList(object):
+    """The bot's nick and host blocklists.
+
+    :param config: the bot's configuration
+    :type config: :class:`sopel.config.Config`
+    :param int cache_size: how many senders to remember the verdict for
+    """
+    def __init__(self, config, cache_size=4096):
+        self.config = config
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._version = None
+        self._nicks = self._hosts = None
+        self._cache = collections.OrderedDict()
+
+    def _refresh(self):
+        version = self.config.version
+        if version == self._version:
+            return
+        core = self.config.core
+        nicks = _Matcher(core.nick_blocks or [], Identifier)
+        hosts = _Matcher(core.host_blocks or [], lambda mask: mask)
+        with self._lock:
+            self._nicks, self._hosts = nicks, hosts
+            self._cache.clear()
+            self._version = version
+
+    def check(self, nick, host):
+        """Tell if ``nick`` and ``host`` are blocked.
+
+        :param nick: a nick
+        :type nick: :class:`~sopel.tools.Identifier`
+        :param str host: a host
+        :return: whether ``nick`` is blocked, and whether ``host`` is
+        :rtype: tuple
+        """
+        self._refresh()
+        nicks, hosts = self._nicks, self._hosts
+        if not (nicks or hosts):
+            return False, False
+
+        key = (nick, host)
+        with self._lock:
+            verdict = self._cache.get(key)
+            if verdict is not None:
+                # Keep it, as it was just used
+                del self._cache[key]
+                self._cache[key] = verdict
+                return verdict
+
+        verdict = (
+            nicks.match(nick, Identifier(nick)),
+            hosts.match(host, host),
+        )
+        with self._lock:
+            if self._nicks is not nicks:
+                # The blocklists changed meanwhile
+                return verdict
+            self._cache[key] = verdict
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return verdict
@@ -0,0 +1,143 @@
+# coding=utf-8
+"""Shared event loop for ``async def`` callables and jobs.
+
+.. note::
+
+    :mod:`sopel.tools.coroutines` is an internal tool. Therefore, it is not
+    shown in the public documentation.
+
+Callables and jobs defined with ``async def`` don't take a worker thread:
+their coroutines all run on one event loop, in a thread of its own. That
+thread is only started when the first coroutine is submitted, so a bot
+without any ``async def`` plugin doesn't pay for it.
+
+.. note::
+
+    Coroutine callables require Python 3.5 or newer.
+
+"""
+# Licensed under the Eiffel Forum License 2.
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+import threading
+
+try:
+    import asyncio
+except ImportError:
+    asyncio = None
+
+try:
+    from inspect import iscoroutinefunction
+except ImportError:
+    # Python < 3.5: there is no ``async def``
+    def iscoroutinefunction(obj):
+        return False
+
+from sopel.logger import get_logger
+
+
+__all__ = ['CoroutineRunner', 'iscoroutinefunction']
+
+LOGGER = get_logger(__name__)
+
+
+class CoroutineRunner(object):
+    """Run coroutines on an event loop, in a dedicated thread.
+
+    The loop and its thread are started by the first :meth:`submit`, and
+    kept until :meth:`stop`.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._tasks = set()
+        self._pending = 0
+        self._idle = threading.Event()
+        self._idle.set()
+        self._stopping = False
+
+    @property
+    def running(self):
+        """Number of coroutines submitted and not done yet."""
+        return self._pending
+
+    def submit(self, coroutine, callback=None):
+        """Run ``coroutine`` on the event loop.
+
+        :param coroutine: the coroutine to run
+        :param callback: called with the coroutine's task once it's done;
+                         it runs on the loop's thread
+        :type callback: :term:`function`
+        :return: ``True`` if the coroutine was scheduled, ``False`` if the
+                 runner is stopped
+        :rtype: bool
+
+        This is safe to call from any thread, and never blocks.
+        """
+        with self._lock:
+            if self._stopping:
+                coroutine.close()
+                return False
+            if self._loop is None:
+                self._start_loop()
+            self._pending += 1
+            self._idle.clear()
+            self._loop.call_soon_threadsafe(self._start, coroutine, callback)
+        return True
+
+    def _start_loop(self):
+        if asyncio is None:
+            raise RuntimeError('Coroutines require Python 3.5+')
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name='sopel-asyncio')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        loop = self._loop
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            # Whatever didn't finish in time is cancelled
+            tasks = [task for task in self._tasks if not task.done()]
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                loop.run_until_complete(
+                    asyncio.gather(*tasks, return_exceptions=True))
+            loop.close()
+
+    def _start(self, coroutine, callback):
+        task = self._loop.create_task(coroutine)
+        self._tasks.add(task)
+        if callback is not None:
+            task.add_done_callback(callback)
+        task.add_done_callback(self._done)
+
+    def _done(self, task):
+        self._tasks.discard(task)
+        with self._lock:
+            self._pending -= 1
+            if not self._pending:
+                self._idle.set()
+
+    def stop(self, timeout=None):
+        """Stop the event loop once the running coroutines are done.
+
+        :param float timeout: how long to wait for the coroutines, in
+                              seconds; they are cancelled after that
+
+        No coroutine can be submitted after this.
+        """
+        with self._lock:
+            self._stopping = True
+            loop, thread = self._loop, self._thread
+        if loop is None:
+            return
+        if not self._idle.wait(timeout):
+            LOGGER.warning(
+                'Cancelling %d coroutines still running', self._pending)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
@@ -10,10 +10,15 @@
 from __future__ import unicode_literals, absolute_import, print_function, division
 
 import datetime
+import functools
 import sys
 import threading
 import time
 
+from sopel.logger import get_logger
+
+
+LOGGER = get_logger(__name__)
 
 py3 = sys.version_info.major >= 3
 
@@ -99,24 +104,50 @@ class JobScheduler(threading.Thread):
         return jobs
 
     def _run_job(self, job):
-        if job.func.thread:
-            t = threading.Thread(
-                target=self._call, args=(job.func,)
-            )
-            t.start()
+        # The function may not have been cleaned by the loader, e.g. if a
+        # plugin's setup scheduled it
+        if getattr(job.func, '_coroutine', False):
+            self.bot.coroutines.submit(
+                job.func(self.bot),
+                functools.partial(self._done, job.func, time.time()))
+        elif getattr(job.func, 'thread', True):
+            self.bot.workers.submit(job.func.__module__, self._call, job.func)
         else:
             self._call(job.func)
         job.next()
 
     def _call(self, func):
         """Wrapper for collecting errors from modules."""
+        start = time.time()
         try:
             func(self.bot)
         except KeyboardInterrupt:
             # Do not block on KeyboardInterrupt
             raise
         except Exception:  # TODO: Be specific
+            self._profile(func, start, error=True)
+            self.bot.error()
+        else:
+            self._profile(func, start)
+
+    def _done(self, func, start, task):
+        """Collect errors from coroutine jobs."""
+        if task.cancelled():
+            return
+        try:
+            task.result()
+        except Exception:  # TODO: Be specific
+            self._profile(func, start, error=True)
             self.bot.error()
+        else:
+            self._profile(func, start)
+
+    def _profile(self, func, start, error=False):
+        # Record how long the job took, and log it if that was too long
+        duration = time.time() - start
+        name = 'job:%s.%s' % (func.__module__, func.__name__)
+        if self.bot.call_stats.record(name, duration, error):
+            LOGGER.warning('Slow job %s: %.3fs', name, duration)
 
 
 class Job(object):
@@ -0,0 +1,258 @@
+# coding=utf-8
+"""Process pool for CPU-bound plugin functions.
+
+.. note::
+
+    :mod:`sopel.tools.processes` is an internal tool. Therefore, it is not
+    shown in the public documentation. Plugins use it through
+    :func:`sopel.module.process`.
+
+A function decorated with :func:`sopel.module.process` runs in one of the
+worker processes of :data:`pool` rather than in the calling thread, so that
+it doesn't compete for the GIL with the rest of the bot. The processes are
+started as needed and then kept warm: the plugin's module is only imported
+once in each of them.
+
+Each call has a wall-clock limit: a process that doesn't answer in time is
+killed, and replaced on the next call. Each process has a memory limit too,
+on platforms with the :mod:`resource` module.
+"""
+# Licensed under the Eiffel Forum License 2.
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+import functools
+import importlib
+import multiprocessing
+import signal
+import sys
+import threading
+
+try:
+    import resource
+except ImportError:
+    # Not on Unix: no memory limit
+    resource = None
+
+from sopel.logger import get_logger
+
+
+__all__ = ['ProcessError', 'ProcessTimeout', 'ProcessPool', 'pool', 'wrap']
+
+LOGGER = get_logger(__name__)
+
+
+class ProcessError(Exception):
+    """A function couldn't be run in a worker process."""
+
+
+class ProcessTimeout(ProcessError):
+    """A function didn't return in time; its worker process was killed."""
+
+
+def _load_module(module_name, path):
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        if not path:
+            raise
+    # A plugin loaded from a file, outside of any package
+    try:
+        from importlib.util import spec_from_file_location, module_from_spec
+    except ImportError:
+        import imp
+        return imp.load_source(module_name, path)
+    spec = spec_from_file_location(module_name, path)
+    module = module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _serve(conn, memory_limit):
+    # Worker process: run the functions sent through conn, until it's closed
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if memory_limit and resource is not None:
+        limit = memory_limit * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    while True:
+        try:
+            module_name, name, path, args = conn.recv()
+        except EOFError:
+            return
+        try:
+            function = getattr(_load_module(module_name, path), name)
+            function = getattr(function, '_process_function', function)
+            result = (True, function(*args))
+        except Exception as error:
+            result = (False, error)
+        try:
+            conn.send(result)
+        except Exception as error:
+            # The result or the error can't be pickled
+            conn.send((False, ProcessError(
+                'Unable to send back the result: %s' % error)))
+
+
+if hasattr(multiprocessing, 'get_context'):
+    # Don't fork the bot's threads, and the locks they may hold
+    _context = multiprocessing.get_context('spawn')
+else:
+    _context = multiprocessing
+
+
+class _Worker(object):
+    def __init__(self, generation, memory_limit):
+        self.generation = generation
+        self.conn, child_conn = _context.Pipe()
+        self.process = _context.Process(
+            target=_serve, args=(child_conn, memory_limit))
+        self.process.daemon = True
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        self.conn.close()
+        self.process.terminate()
+        self.process.join(1)
+
+
+class ProcessPool(object):
+    """A pool of worker processes, started as needed and kept warm.
+
+    :param int size: maximum number of worker processes; if ``0``, functions
+                     run in the calling thread, without any limit
+    :param int memory_limit: maximum address space of each worker process,
+                             in MiB; no limit if ``0``
+
+    :meth:`run` blocks the calling thread while the function runs, without
+    holding the GIL.
+    """
+    def __init__(self, size=2, memory_limit=0):
+        self.size = size
+        self.memory_limit = memory_limit
+        self._condition = threading.Condition()
+        self._idle = []
+        self._count = 0
+        self._generation = 0
+
+    def configure(self, size, memory_limit):
+        """Change the pool's limits.
+
+        :param int size: maximum number of worker processes
+        :param int memory_limit: maximum address space of each worker
+                                 process, in MiB
+
+        The current worker processes are replaced once they're done.
+        """
+        with self._condition:
+            self.size = size
+            self.memory_limit = memory_limit
+        self.stop()
+
+    def stop(self):
+        """Kill the worker processes once they're done.
+
+        The pool can still be used: new processes are started as needed.
+        """
+        with self._condition:
+            self._generation += 1
+            idle, self._idle = self._idle, []
+            self._count -= len(idle)
+            self._condition.notify_all()
+        for worker in idle:
+            worker.kill()
+
+    def _acquire(self):
+        with self._condition:
+            while not self._idle and self._count >= self.size:
+                self._condition.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._count += 1
+            generation, memory_limit = self._generation, self.memory_limit
+        try:
+            return _Worker(generation, memory_limit)
+        except Exception:
+            with self._condition:
+                self._count -= 1
+                self._condition.notify()
+            raise
+
+    def _release(self, worker, healthy):
+        with self._condition:
+            keep = healthy and worker.generation == self._generation
+            if keep:
+                self._idle.append(worker)
+            else:
+                self._count -= 1
+            self._condition.notify()
+        if not keep:
+            worker.kill()
+
+    def run(self, function, args, timeout):
+        """Call ``function`` with ``args`` in a worker process.
+
+        :param function: a function defined at the top level of its module
+        :type function: :term:`function`
+        :param tuple args: the arguments to call ``function`` with; they must
+                           be picklable
+        :param float timeout: how long ``function`` can take, in seconds
+        :return: what ``function`` returned
+        :raise ProcessTimeout: when ``function`` didn't return in time
+        :raise ProcessError: when the worker process died
+
+        Exceptions raised by ``function`` are raised again here.
+        """
+        if not self.size:
+            return function(*args)
+
+        request = (function.__module__, function.__name__,
+                   getattr(sys.modules.get(function.__module__), '__file__',
+                           None),
+                   args)
+        worker = self._acquire()
+        healthy = False
+        try:
+            worker.conn.send(request)
+            if not worker.conn.poll(timeout):
+                LOGGER.warning(
+                    'Killing worker process: %s.%s took more than %ss',
+                    function.__module__, function.__name__, timeout)
+                raise ProcessTimeout(
+                    '%s took more than %ss' % (function.__name__, timeout))
+            success, value = worker.conn.recv()
+            healthy = True
+        except (EOFError, IOError, OSError) as error:
+            raise ProcessError('Worker process died: %s' % error)
+        finally:
+            self._release(worker, healthy)
+
+        if success:
+            return value
+        raise value
+
+
+pool = ProcessPool()
+"""The pool used by :func:`sopel.module.process`; the bot configures it."""
+
+
+def wrap(function, timeout):
+    """Get a version of ``function`` that runs in the :data:`pool`.
+
+    :param function: a function defined at the top level of its module
+    :type function: :term:`function`
+    :param float timeout: how long ``function`` can take, in seconds
+    :return: the wrapped function
+    """
+    @functools.wraps(function)
+    def run_in_process(*args):
+        return pool.run(function, args, timeout)
+
+    # What the worker process runs, when it finds the wrapper in the module
+    run_in_process._process_function = function
+    run_in_process.process_timeout = timeout
+    return run_in_process
@@ -0,0 +1,154 @@
+# coding=utf-8
+"""Call counts, errors and latencies of plugin callables and jobs.
+
+.. note::
+
+    :mod:`sopel.tools.profiling` is an internal tool. Therefore, it is not
+    shown in the public documentation.
+
+:class:`sopel.bot.Sopel` times every call to a plugin callable or job, and
+records it in a :class:`CallStats`. Each call costs two clock reads and a
+few additions, so it's always on. The admin plugin's ``.callstats``
+command shows the callables that took the most time, and can dump
+everything to a file.
+"""
+# Licensed under the Eiffel Forum License 2.
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+import bisect
+import io
+import json
+import threading
+import time
+
+
+__all__ = ['BUCKETS', 'CallStats']
+
+BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5,
+           1, 2, 5, 10, 30)
+"""Upper bounds of the latency histograms' buckets, in seconds.
+
+The histograms have one more bucket, for longer calls.
+"""
+
+
+class _Entry(object):
+    __slots__ = ('calls', 'errors', 'total', 'max', 'buckets')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def percentile(self, fraction):
+        # Upper bound of the bucket holding that fraction of the calls
+        threshold = fraction * self.calls
+        count = 0
+        for index, bucket in enumerate(self.buckets):
+            count += bucket
+            if count >= threshold and count:
+                return BUCKETS[index] if index < len(BUCKETS) else self.max
+        return 0.0
+
+    def as_dict(self):
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'total': self.total,
+            'average': self.total / self.calls if self.calls else 0.0,
+            'max': self.max,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'histogram': dict(zip(
+                [str(bound) for bound in BUCKETS] + ['inf'], self.buckets)),
+        }
+
+
+class CallStats(object):
+    """Statistics of calls to plugin callables and jobs.
+
+    :param float slow_threshold: how long a call can take before it's
+                                 deemed slow, in seconds; ``0`` for no limit
+
+    Calls are recorded under a name, usually ``plugin.function`` for a
+    callable, and ``job:plugin.function`` for a job.
+    """
+    def __init__(self, slow_threshold=0):
+        self.slow_threshold = slow_threshold
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.since = time.time()
+        """When the statistics started, as a timestamp."""
+
+    def record(self, name, duration, error=False):
+        """Record a call.
+
+        :param str name: what was called
+        :param float duration: how long the call took, in seconds
+        :param bool error: whether the call raised an exception
+        :return: ``True`` if the call was slow
+        :rtype: bool
+        """
+        index = bisect.bisect_left(BUCKETS, duration)
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                entry = self._entries[name] = _Entry()
+            entry.calls += 1
+            entry.total += duration
+            if duration > entry.max:
+                entry.max = duration
+            entry.buckets[index] += 1
+            if error:
+                entry.errors += 1
+        return 0 < self.slow_threshold <= duration
+
+    def get(self, name):
+        """Get the statistics of ``name``.
+
+        :param str name: what was called
+        :return: the ``calls`` and ``errors`` counts; the ``total``,
+                 ``average`` and ``max`` durations; the ``p50`` and ``p95``
+                 durations, rounded up to a bucket's bound; and the
+                 ``histogram`` of durations, by bucket
+        :rtype: dict
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            return entry.as_dict() if entry is not None else None
+
+    def top(self, limit=10, key='total'):
+        """Get the statistics of the most expensive calls.
+
+        :param int limit: how many names to return
+        :param str key: what to sort by: ``total``, ``average``, ``max``,
+                        ``calls``, or ``errors``
+        :return: ``(name, statistics)`` tuples, as returned by :meth:`get`
+        :rtype: list
+        """
+        with self._lock:
+            items = [(name, entry.as_dict())
+                     for name, entry in self._entries.items()]
+        items.sort(key=lambda item: item[1][key], reverse=True)
+        return items[:limit]
+
+    def clear(self):
+        """Forget every recorded call."""
+        with self._lock:
+            self._entries.clear()
+            self.since = time.time()
+
+    def dump(self, filename):
+        """Write the statistics of every call to ``filename``, as JSON."""
+        data = {
+            'since': self.since,
+            'until': time.time(),
+            'buckets': list(BUCKETS),
+            'calls': dict(self.top(limit=None)),
+        }
+        with io.open(filename, 'w', encoding='utf-8') as stats_file:
+            stats_file.write(
+                json.dumps(data, indent=2, sort_keys=True,
+                           ensure_ascii=False))
@@ -0,0 +1,113 @@
+# coding=utf-8
+"""Store for the rate limits of plugin callables.
+
+.. note::
+
+    :mod:`sopel.tools.ratelimit` is an internal tool. Therefore, it is not
+    shown in the public documentation.
+
+:meth:`sopel.bot.Sopel.call` records when each rate-limited callable was
+last used by a user, in a channel, and globally. An entry is only useful
+while its rate limit lasts: after that, the callable can be used again
+anyway. So entries are dropped once their window is over, rather than
+being kept for every nick that ever triggered anything.
+"""
+# Licensed under the Eiffel Forum License 2.
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+import collections
+import sys
+import threading
+
+
+__all__ = ['RateLimiter']
+
+
+class RateLimiter(object):
+    """Last use of callables by a user, in a channel, or globally.
+
+    Each entry is stored with the length of the rate limit it's for, its
+    window, and is dropped once that window is over. Entries with the same
+    window expire in the order they were set, so they're kept in one
+    :class:`~collections.OrderedDict` per window: dropping expired entries
+    only looks at the oldest ones.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._times = {}
+        self._windows = {}
+
+    def __len__(self):
+        return len(self._times)
+
+    def get(self, func, target=None):
+        """Get when ``func`` was last used by or in ``target``.
+
+        :param func: a plugin callable
+        :type func: :term:`function`
+        :param target: a nick or channel; ``None`` for the global limit
+        :type target: :class:`~sopel.tools.Identifier`
+        :return: the time of the last use, or ``None`` if it's been
+                 forgotten
+        :rtype: float
+        """
+        return self._times.get((target, func))
+
+    def set(self, func, target, timestamp, window):
+        """Record that ``func`` was used by or in ``target``.
+
+        :param func: a plugin callable
+        :type func: :term:`function`
+        :param target: a nick or channel; ``None`` for the global limit
+        :type target: :class:`~sopel.tools.Identifier`
+        :param float timestamp: when ``func`` was used
+        :param int window: for how long, in seconds, the use is remembered
+        """
+        if window <= 0:
+            # Not rate-limited: nothing to remember
+            return
+        key = (target, func)
+        with self._lock:
+            self._expire(timestamp)
+            self._times[key] = timestamp
+            entries = self._windows.get(window)
+            if entries is None:
+                entries = self._windows[window] = collections.OrderedDict()
+            entries.pop(key, None)
+            entries[key] = timestamp
+
+    def _expire(self, now):
+        for window, entries in list(self._windows.items()):
+            deadline = now - window
+            while entries:
+                key, timestamp = next(iter(entries.items()))
+                if timestamp > deadline:
+                    break
+                del entries[key]
+                if self._times.get(key) == timestamp:
+                    del self._times[key]
+            if not entries:
+                del self._windows[window]
+
+    def clear(self):
+        """Forget every recorded use."""
+        with self._lock:
+            self._times.clear()
+            self._windows.clear()
+
+    def memory_usage(self):
+        """Get the approximate memory used by the recorded uses.
+
+        :return: a size in bytes
+        :rtype: int
+
+        This counts the containers and the keys, but not the callables and
+        names the keys refer to, which are kept alive elsewhere anyway.
+        """
+        with self._lock:
+            size = sys.getsizeof(self._times) + sys.getsizeof(self._windows)
+            size += sum(sys.getsizeof(key) + sys.getsizeof(timestamp)
+                        for key, timestamp in self._times.items())
+            size += sum(sys.getsizeof(entries)
+                        for entries in self._windows.values())
+        return size
@@ -0,0 +1,210 @@
+# coding=utf-8
+"""Worker thread pool for threaded callables and jobs.
+
+.. note::
+
+    :mod:`sopel.tools.workers` is an internal tool. Therefore, it is not
+    shown in the public documentation.
+
+Callables and jobs with ``thread = True`` are not each given a new thread:
+they are queued in a :class:`WorkerPool`, whose threads run them. The number
+of threads is bounded, and so is the queue; when it's full, calls are
+dropped (see :attr:`~sopel.config.core_section.CoreSection.worker_overflow`)
+rather than piling up during a flood.
+
+A plugin can also only have so many calls running at once, so that one slow
+plugin can't take every worker.
+"""
+# Licensed under the Eiffel Forum License 2.
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+import collections
+import threading
+import time
+
+from sopel.logger import get_logger
+
+
+__all__ = ['WorkerPool']
+
+LOGGER = get_logger(__name__)
+
+OVERFLOW_POLICIES = ('drop_new', 'drop_oldest')
+"""What :meth:`WorkerPool.submit` can do when the queue is full."""
+
+
+class _Task(object):
+    __slots__ = ('plugin', 'func', 'args', 'queued_at')
+
+    def __init__(self, plugin, func, args):
+        self.plugin = plugin
+        self.func = func
+        self.args = args
+        self.queued_at = time.time()
+
+
+class WorkerPool(object):
+    """A bounded pool of worker threads, with a bounded queue.
+
+    :param int max_workers: maximum number of worker threads
+    :param int max_queued: maximum number of calls waiting for a worker; no
+                           limit if ``None``
+    :param int plugin_limit: maximum number of calls of the same plugin
+                             running at once; no limit if ``0``
+    :param str overflow: what to do when the queue is full, one of
+                         :data:`OVERFLOW_POLICIES`
+
+    Worker threads are started as needed, and then kept until :meth:`stop`.
+    """
+    SMOOTHING = 0.1
+    """Weight of the last call in the average :attr:`wait_time`."""
+
+    def __init__(self, max_workers=16, max_queued=1000, plugin_limit=0,
+                 overflow='drop_oldest'):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError('Unknown overflow policy: %r' % overflow)
+        self.max_workers = max(1, max_workers)
+        self.max_queued = max(1, max_queued) if max_queued is not None else None
+        self.plugin_limit = plugin_limit
+        self.overflow = overflow
+
+        self._condition = threading.Condition()
+        self._queue = collections.deque()
+        self._workers = []
+        self._idle = 0
+        self._running = collections.Counter()
+        self._stopping = False
+
+        self.wait_time = 0.0
+        """Average time calls waited in the queue, in seconds."""
+        self.max_wait_time = 0.0
+        """Longest time a call waited in the queue, in seconds."""
+        self.dropped = 0
+        """Number of calls dropped because the queue was full."""
+
+    def submit(self, plugin, func, *args):
+        """Queue a call to ``func`` with ``args``.
+
+        :param str plugin: the name of the plugin that ``func`` belongs to
+        :param func: the function to call
+        :type func: :term:`function`
+        :return: ``True`` if the call was queued, ``False`` if it was dropped
+        :rtype: bool
+
+        This never blocks. If the queue is full, either this call or the
+        oldest one in the queue is dropped, depending on :attr:`overflow`.
+        """
+        task = _Task(plugin, func, args)
+        with self._condition:
+            if self._stopping:
+                return False
+            dropped = None
+            if (self.max_queued is not None and
+                    len(self._queue) >= self.max_queued):
+                self.dropped += 1
+                if self.overflow == 'drop_new':
+                    dropped = task
+                else:
+                    dropped = self._queue.popleft()
+            if dropped is not task:
+                self._queue.append(task)
+                if self._idle:
+                    self._condition.notify()
+                elif len(self._workers) < self.max_workers:
+                    self._start_worker()
+
+        if dropped is not None:
+            LOGGER.warning(
+                'Worker queue full, dropping a call to %s.%s (%s)',
+                dropped.plugin, getattr(dropped.func, '__name__', dropped.func),
+                self._format_stats())
+        return dropped is not task
+
+    def stats(self):
+        """Get the pool's current load.
+
+        :return: the number of ``workers`` and how many are ``busy``, how many
+                 calls are ``queued``, and the ``wait_time``,
+                 ``max_wait_time`` and ``dropped`` counters
+        :rtype: dict
+        """
+        with self._condition:
+            return {
+                'workers': len(self._workers),
+                'busy': sum(self._running.values()),
+                'queued': len(self._queue),
+                'wait_time': self.wait_time,
+                'max_wait_time': self.max_wait_time,
+                'dropped': self.dropped,
+            }
+
+    def _format_stats(self):
+        return (
+            '{busy}/{workers} workers busy, {queued} queued, '
+            'average wait {wait_time:.2f}s, {dropped} dropped'
+        ).format(**self.stats())
+
+    def stop(self, timeout=None):
+        """Stop the workers once the queued calls are done.
+
+        :param float timeout: how long to wait for the workers, in seconds;
+                              don't wait if ``None``
+
+        No call can be queued after this.
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+            workers = list(self._workers)
+        if timeout is not None:
+            deadline = time.time() + timeout
+            for worker in workers:
+                worker.join(max(0, deadline - time.time()))
+
+    def _start_worker(self):
+        worker = threading.Thread(
+            target=self._work,
+            name='sopel-worker-%d' % (len(self._workers) + 1))
+        worker.daemon = True
+        self._workers.append(worker)
+        worker.start()
+
+    def _next_task(self):
+        # The first queued call whose plugin can run one more
+        if not self.plugin_limit:
+            return self._queue.popleft() if self._queue else None
+        for index, task in enumerate(self._queue):
+            if self._running[task.plugin] < self.plugin_limit:
+                del self._queue[index]
+                return task
+        return None
+
+    def _work(self):
+        while True:
+            with self._condition:
+                task = self._next_task()
+                while task is None:
+                    if self._stopping and not self._queue:
+                        self._workers.remove(threading.current_thread())
+                        return
+                    self._idle += 1
+                    self._condition.wait()
+                    self._idle -= 1
+                    task = self._next_task()
+                self._running[task.plugin] += 1
+                wait_time = time.time() - task.queued_at
+                self.wait_time = (self.SMOOTHING * wait_time +
+                                  (1 - self.SMOOTHING) * self.wait_time)
+                self.max_wait_time = max(self.max_wait_time, wait_time)
+
+            try:
+                task.func(*task.args)
+            except Exception:
+                # The functions given by Sopel handle their own errors
+                LOGGER.exception('Unexpected error in worker thread')
+            finally:
+                with self._condition:
+                    self._running[task.plugin] -= 1
+                    if self.plugin_limit and self._queue and self._idle:
+                        # A call of that plugin may have been waiting
+                        self._condition.notify()
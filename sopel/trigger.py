@@ -4,6 +4,7 @@ from __future__ import unicode_literals, absolute_import, print_function, divisi
 
 import re
 import sys
+import time
 import datetime
 
 from sopel import tools
@@ -19,35 +20,67 @@ if sys.version_info.major >= 3:
     basestring = str
 
 
+_privilege_patterns = {}
+
+
+def _get_privilege_patterns(owner, admins):
+    # Compile the owner and admins hostmasks only when they change
+    key = (owner, admins)
+    patterns = _privilege_patterns.get(key)
+    if patterns is None:
+        if len(_privilege_patterns) > 16:
+            _privilege_patterns.clear()
+        patterns = _privilege_patterns[key] = (
+            tools.get_hostmasks_regex([owner]),
+            tools.get_hostmasks_regex(admins),
+        )
+    return patterns
+
+
 class PreTrigger(object):
     """A parsed message from the server, which has not been matched against
-    any rules."""
+    any rules.
+
+    :param str own_nick: the bot's nick, needed to correctly parse sender
+    :param str line: the full line from the server
+    :param str network: the name of the network it came from
+    :param bool account_tags: whether the server sends accounts, with the
+                              ``account-tag`` or ``extended-join``
+                              capability; if not, any ``account`` is left out
+                              of the ``tags``
+
+    Only the ``event`` and the ``args`` are parsed up front, as they are all
+    that's needed to match a line against the bot's rules. The ``tags``, the
+    ``time``, and the sender's ``nick``, ``user`` and ``host`` are parsed the
+    first time they are used.
+    """
+    __slots__ = (
+        'line', 'network', 'hostmask', 'event', 'args',
+        '_own_nick', '_received', '_tagstring', '_intent', '_account_tags',
+        '_tags', '_time', '_components', '_sender', '_privileges',
+    )
+
     component_regex = re.compile(r'([^!]*)!?([^@]*)@?(.*)')
     intent_regex = re.compile('\x01(\\S+) ?(.*)\x01')
+    tag_escape_regex = re.compile(r'\\(.?)')
+    tag_escapes = {':': ';', 's': ' ', 'r': '\r', 'n': '\n'}
+    """IRCv3 message tag value escape sequences, other than ``\\x`` for
+    ``x``."""
 
-    def __init__(self, own_nick, line):
-        """own_nick is the bot's nick, needed to correctly parse sender.
-        line is the full line from the server."""
+    def __init__(self, own_nick, line, network=None, account_tags=True):
         line = line.strip('\r')
         self.line = line
+        self.network = network
+        self._own_nick = own_nick
+        self._account_tags = account_tags
+        self._received = time.time()
+        self._tags = self._time = self._components = self._sender = None
+        self._privileges = {}
 
         # Break off IRCv3 message tags, if present
-        self.tags = {}
+        self._tagstring = None
         if line.startswith('@'):
-            tagstring, line = line.split(' ', 1)
-            for tag in tagstring[1:].split(';'):
-                tag = tag.split('=', 1)
-                if len(tag) > 1:
-                    self.tags[tag[0]] = tag[1]
-                else:
-                    self.tags[tag[0]] = None
-
-        self.time = datetime.datetime.utcnow()
-        if 'time' in self.tags:
-            try:
-                self.time = datetime.datetime.strptime(self.tags['time'], '%Y-%m-%dT%H:%M:%S.%fZ')
-            except ValueError:
-                pass  # Server isn't conforming to spec, ignore the server-time
+            self._tagstring, line = line[1:].split(' ', 1)
 
         # Grabs hostmask from line.
         # Example: line = ':Sopel!foo@bar PRIVMSG #sopel :foobar!'
@@ -60,52 +93,114 @@ class PreTrigger(object):
 
         # Parses the line into a list of arguments.
         # Some events like MODE don't have a secondary string argument, i.e. no ' :' inside the line.
-        # Example 1:  line = ':nick!ident@domain PRIVMSG #sopel :foo bar!'
-        #             print(text)    # 'foo bar!'
-        #             print(argstr)  # ':nick!ident@domain PRIVMSG #sopel'
-        #             print(args)    # [':nick!ident@domain', 'PRIVMSG', '#sopel', 'foo bar!']
-        # Example 2:  line = 'irc.freenode.net MODE Sopel +i'
-        #             print(text)    # '+i'
-        #             print(args)    # ['irc.freenode.net', 'MODE', 'Sopel', '+i']
-        if ' :' in line:
-            argstr, text = line.split(' :', 1)
-            self.args = argstr.split(' ')
-            self.args.append(text)
-        else:
-            self.args = line.split(' ')
-            self.text = self.args[-1]
-
-        self.event = self.args[0]
-        self.args = self.args[1:]
-        components = PreTrigger.component_regex.match(self.hostmask or '').groups()
-        self.nick, self.user, self.host = components
-        self.nick = tools.Identifier(self.nick)
-
-        # If we have arguments, the first one is the sender
-        # Unless it's a QUIT event
-        if self.args and self.event != 'QUIT':
-            target = tools.Identifier(self.args[0])
-        else:
-            target = None
+        # Example 1:  line = 'PRIVMSG #sopel :foo bar!'
+        #             print(args)    # ['PRIVMSG', '#sopel', 'foo bar!']
+        # Example 2:  line = 'MODE Sopel +i'
+        #             print(args)    # ['MODE', 'Sopel', '+i']
+        argstr, colon, text = line.partition(' :')
+        args = argstr.split(' ')
+        if colon:
+            args.append(text)
 
-        # Unless we're messaging the bot directly, in which case that second
-        # arg will be our bot's name.
-        if target and target.lower() == own_nick.lower():
-            target = self.nick
-        self.sender = target
+        self.event = args[0]
+        self.args = args[1:]
 
         # Parse CTCP into a form consistent with IRCv3 intents
-        if self.event == 'PRIVMSG' or self.event == 'NOTICE':
+        self._intent = None
+        if ((self.event == 'PRIVMSG' or self.event == 'NOTICE') and
+                self.args and self.args[-1].startswith('\x01')):
             intent_match = PreTrigger.intent_regex.match(self.args[-1])
             if intent_match:
-                intent, message = intent_match.groups()
-                self.tags['intent'] = intent
+                self._intent, message = intent_match.groups()
                 self.args[-1] = message or ''
 
-        # Populate account from extended-join messages
-        if self.event == 'JOIN' and len(self.args) == 3:
-            # Account is the second arg `...JOIN #Sopel account :realname`
-            self.tags['account'] = self.args[1]
+    @property
+    def text(self):
+        """The last argument of the line, or an empty string."""
+        return self.args[-1] if self.args else ''
+
+    @property
+    def tags(self):
+        """A map of the IRCv3 message tags on the line, with their values
+        unescaped."""
+        if self._tags is None:
+            tags = {}
+            if self._tagstring:
+                for tag in self._tagstring.split(';'):
+                    key, equals, value = tag.partition('=')
+                    if equals:
+                        tags[key] = self.unescape_tag_value(value)
+                    else:
+                        tags[key] = None
+            if self._intent is not None:
+                tags['intent'] = self._intent
+            # Populate account from extended-join messages
+            if self.event == 'JOIN' and len(self.args) == 3:
+                # Account is the second arg `...JOIN #Sopel account :realname`
+                tags['account'] = self.args[1]
+            if not self._account_tags:
+                # The server can't be trusted with it
+                tags.pop('account', None)
+            self._tags = tags
+        return self._tags
+
+    @property
+    def time(self):
+        """When the server received the line, or if the server does not
+        support server-time, when Sopel did."""
+        if self._time is None:
+            server_time = self.tags.get('time')
+            if server_time:
+                try:
+                    self._time = datetime.datetime.strptime(
+                        server_time, '%Y-%m-%dT%H:%M:%S.%fZ')
+                except ValueError:
+                    pass  # Server isn't conforming to spec, ignore the server-time
+            if self._time is None:
+                self._time = datetime.datetime.utcfromtimestamp(self._received)
+        return self._time
+
+    def _get_components(self):
+        if self._components is None:
+            nick, _, rest = (self.hostmask or '').partition('!')
+            user, _, host = rest.partition('@')
+            self._components = (tools.Identifier(nick), user, host)
+        return self._components
+
+    nick = property(lambda self: self._get_components()[0])
+    """The :class:`sopel.tools.Identifier` of the line's sender."""
+    user = property(lambda self: self._get_components()[1])
+    """The local username of the line's sender."""
+    host = property(lambda self: self._get_components()[2])
+    """The hostname of the line's sender."""
+
+    @property
+    def sender(self):
+        """The channel from which the line was sent, or in a private message,
+        the nick that sent it. ``None`` for lines with neither."""
+        if self._sender is None and self.args and self.event != 'QUIT':
+            # If we have arguments, the first one is the sender
+            target = tools.Identifier(self.args[0])
+            # Unless we're messaging the bot directly, in which case that
+            # arg will be our bot's name.
+            if target.lower() == self._own_nick.lower():
+                target = self.nick
+            self._sender = target
+        return self._sender
+
+    @classmethod
+    def unescape_tag_value(cls, value):
+        """Unescape an IRCv3 message tag value.
+
+        :param str value: the value, as sent by the server
+        :return: the unescaped value
+        :rtype: str
+        """
+        if '\\' not in value:
+            return value
+        return cls.tag_escape_regex.sub(
+            lambda match: cls.tag_escapes.get(match.group(1), match.group(1)),
+            value)
 
 
 class Trigger(unicode):
@@ -141,6 +236,10 @@ class Trigger(unicode):
     event = property(lambda self: self._pretrigger.event)
     """The IRC event (e.g. ``PRIVMSG`` or ``MODE``) which triggered the
     message."""
+    network = property(lambda self: self._pretrigger.network)
+    """The name of the network the message came from.
+
+    See :attr:`sopel.config.core_section.CoreSection.networks`."""
     match = property(lambda self: self._match)
     """The regular expression :class:`re.MatchObject` for the triggering line.
     """
@@ -165,10 +264,10 @@ class Trigger(unicode):
     """
     tags = property(lambda self: self._pretrigger.tags)
     """A map of the IRCv3 message tags on the message."""
-    admin = property(lambda self: self._admin)
+    admin = property(lambda self: self._get_privileges()[1])
     """True if the nick which triggered the command is one of the bot's admins.
     """
-    owner = property(lambda self: self._owner)
+    owner = property(lambda self: self._get_privileges()[0])
     """True if the nick which triggered the command is the bot's owner."""
     account = property(lambda self: self.tags.get('account') or self._account)
     """The account name of the user sending the message.
@@ -184,22 +283,32 @@ class Trigger(unicode):
         self._pretrigger = message
         self._match = match
         self._is_privmsg = message.sender and message.sender.is_nick()
+        self._config = config
+        return self
 
-        def match_host_or_nick(pattern):
-            pattern = tools.get_hostmask_regex(pattern)
-            return bool(
-                pattern.match(self.nick) or
-                pattern.match('@'.join((self.nick, self.host)))
-            )
+    def _get_privileges(self):
+        # Computed once per line, for all the Triggers built from it
+        account = self.account
+        privileges = self._pretrigger._privileges.get(account)
+        if privileges is None:
+            core = self._config.core
+            owner_pattern, admins_pattern = _get_privilege_patterns(
+                core.owner, tuple(core.admins))
 
-        if config.core.owner_account:
-            self._owner = config.core.owner_account == self.account
-        else:
-            self._owner = match_host_or_nick(config.core.owner)
-        self._admin = (
-            self._owner or
-            self.account in config.core.admin_accounts or
-            any(match_host_or_nick(item) for item in config.core.admins)
-        )
+            def match_host_or_nick(pattern):
+                return pattern is not None and bool(
+                    pattern.match(self.nick) or
+                    pattern.match('@'.join((self.nick, self.host)))
+                )
 
-        return self
+            if core.owner_account:
+                owner = core.owner_account == account
+            else:
+                owner = match_host_or_nick(owner_pattern)
+            admin = (
+                owner or
+                account in core.admin_accounts or
+                match_host_or_nick(admins_pattern)
+            )
+            privileges = self._pretrigger._privileges[account] = (owner, admin)
+        return privileges
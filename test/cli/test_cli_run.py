@@ -13,7 +13,10 @@ from sopel.cli.run import (
     build_parser,
     get_configuration,
     get_pid_filename,
-    get_running_pid
+    get_reconnect_delay,
+    get_running_pid,
+    quit_networks,
+    run_network,
 )
 
 
@@ -388,3 +391,64 @@ def test_get_running_pid_no_file(tmpdir):
 
     result = get_running_pid(pid_file.strpath)
     assert result is None
+
+
+def test_get_reconnect_delay():
+    """Assert the delay doubles with each attempt, with jitter"""
+    for attempt in range(4):
+        delay = get_reconnect_delay(attempt, 5, 300)
+        assert 5 * 2 ** attempt / 2 <= delay <= 5 * 2 ** attempt
+
+
+def test_get_reconnect_delay_ceiling():
+    """Assert the delay never goes above the ceiling"""
+    for attempt in (10, 100, 10000):
+        delay = get_reconnect_delay(attempt, 5, 300)
+        assert 150 <= delay <= 300
+
+
+class FakeNetworkBot(object):
+    def __init__(self, hasquit=False):
+        self.hasquit = hasquit
+        self.events = []
+
+    def quit(self, message):
+        self.hasquit = True
+        self.events.append(('quit', message))
+
+    def flush_writer(self):
+        self.events.append(('flush',))
+
+
+def test_quit_networks():
+    primary = FakeNetworkBot(hasquit=True)
+    other = FakeNetworkBot()
+    primary.networks = {'primary': primary, 'other': other}
+
+    quit_networks(primary, 'Closing')
+    # Only the networks left behind get a QUIT, and every one is flushed
+    assert primary.events == [('flush',)]
+    assert other.events == [('quit', 'Closing'), ('flush',)]
+
+
+class FakeRunningBot(FakeNetworkBot):
+    class config:
+        class core:
+            host = 'irc.example.org'
+            port = 6667
+
+    def run(self, host, port):
+        # The connection closes before the bot quits, so ``handle_close``
+        # doesn't shut it down
+        self.events.append(('run',))
+        self.hasquit = True
+
+    def _shutdown(self):
+        self.events.append(('shutdown',))
+
+
+def test_run_network_shuts_down():
+    p = FakeRunningBot()
+
+    run_network(p)
+    assert p.events == [('run',), ('shutdown',)]
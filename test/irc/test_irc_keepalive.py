@@ -0,0 +1,115 @@
+# coding=utf-8
+"""Tests for the connection keep-alive timer"""
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+import time
+
+from sopel.irc.keepalive import KeepAlive, monotonic
+from sopel.irc.writer import SendFuture
+
+
+class FakeBot(object):
+    def __init__(self):
+        self.written = []
+        self.closed = 0
+
+    def write(self, args, text=None, future=False):
+        self.written.append(args)
+        if future:
+            self.future = SendFuture()
+            return self.future
+
+    def handle_close(self):
+        self.closed += 1
+
+
+def test_no_ping_while_active():
+    bot = FakeBot()
+    keepalive = KeepAlive(bot, 120)
+    now = keepalive.last_activity
+
+    assert keepalive.check(now + 10) == 50
+    assert bot.written == []
+    assert bot.closed == 0
+
+
+def test_ping_after_half_timeout():
+    bot = FakeBot()
+    keepalive = KeepAlive(bot, 120)
+    now = keepalive.last_activity
+
+    keepalive.check(now + 60)
+    assert len(bot.written) == 1
+    assert bot.written[0][0] == 'PING'
+
+    # Only one PING in flight
+    keepalive.check(now + 70)
+    assert len(bot.written) == 1
+
+
+def test_pong_measures_lag():
+    bot = FakeBot()
+    keepalive = KeepAlive(bot, 120)
+    keepalive.last_activity -= 60
+    keepalive.check(monotonic())
+    token = bot.written[0][1]
+
+    keepalive.pong('unrelated')
+    assert keepalive.lag is None
+
+    keepalive.pong(token)
+    assert keepalive.lag is not None
+    assert keepalive.lag >= 0
+
+
+def test_timeout_closes_connection():
+    bot = FakeBot()
+    keepalive = KeepAlive(bot, 120)
+
+    assert keepalive.check(keepalive.last_activity + 121) is None
+    assert bot.closed == 1
+
+
+def test_touch_postpones_timeout():
+    bot = FakeBot()
+    keepalive = KeepAlive(bot, 120)
+    keepalive.last_activity -= 100
+    keepalive.touch()
+
+    assert keepalive.check(keepalive.last_activity + 30) is not None
+    assert bot.closed == 0
+
+
+def test_thread_times_out_and_stops():
+    bot = FakeBot()
+    keepalive = KeepAlive(bot, 0.2)
+    keepalive.start()
+    keepalive.join(5)
+
+    assert not keepalive.is_alive()
+    assert bot.written and bot.written[0][0] == 'PING'
+    assert bot.closed == 1
+
+
+def test_stop_is_immediate():
+    keepalive = KeepAlive(FakeBot(), 600)
+    keepalive.start()
+    start = time.time()
+    keepalive.stop()
+    keepalive.join(5)
+
+    assert not keepalive.is_alive()
+    assert time.time() - start < 1
+
+
+def test_lag_from_when_the_ping_was_sent():
+    bot = FakeBot()
+    keepalive = KeepAlive(bot, 120)
+    keepalive.last_activity -= 90
+    keepalive.check(monotonic() - 30)
+    token = bot.written[0][1]
+
+    # The PING waited 30s in the queue: that's not lag
+    bot.future.set_result()
+    keepalive.pong(token)
+    assert 0 <= keepalive.lag < 5
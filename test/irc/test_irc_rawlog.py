@@ -0,0 +1,74 @@
+# coding=utf-8
+"""Tests for the raw log writer"""
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+import gzip
+import io
+import os
+
+from sopel.irc.rawlog import RawLogWriter
+
+
+def read_lines(path):
+    with io.open(path, encoding='utf-8') as logfile:
+        return [line.split('\t', 1) for line in logfile.read().splitlines()]
+
+
+def test_write_batch(tmpdir):
+    path = tmpdir.join('bot.raw.log').strpath
+    writer = RawLogWriter(path)
+    writer.put('PING :server', '<<')
+    writer.put('PONG :server\r\n', '>>')
+    writer.start()
+    writer.close()
+
+    lines = read_lines(path)
+    assert [line[1] for line in lines] == ['PING :server', 'PONG :server']
+    assert lines[0][0].startswith('<<')
+    assert lines[1][0].startswith('>>')
+    assert writer.written == 2
+
+
+def test_full_queue_drops_lines(tmpdir):
+    writer = RawLogWriter(tmpdir.join('bot.raw.log').strpath, maxsize=2)
+    assert writer.put('one', '<<')
+    assert writer.put('two', '<<')
+    assert not writer.put('three', '<<')
+    assert writer.dropped == 1
+
+
+def test_rotate_by_size(tmpdir):
+    path = tmpdir.join('bot.raw.log').strpath
+    writer = RawLogWriter(path, max_bytes=10)
+    writer.start()
+    writer.put('a line longer than ten bytes', '<<')
+    # wait for the first batch before queuing the next one
+    while not writer.written:
+        pass
+    writer.put('second', '<<')
+    writer.close()
+
+    assert writer.rotations == 1
+    rotated = [name for name in os.listdir(tmpdir.strpath)
+               if name != 'bot.raw.log']
+    assert len(rotated) == 1
+    assert [line[1] for line in read_lines(path)] == ['second']
+
+
+def test_rotate_compress(tmpdir):
+    path = tmpdir.join('bot.raw.log').strpath
+    writer = RawLogWriter(path, max_bytes=1, compress=True)
+    writer.start()
+    writer.put('first', '<<')
+    while not writer.written:
+        pass
+    writer.put('second', '<<')
+    writer.close()
+
+    rotated = [name for name in os.listdir(tmpdir.strpath)
+               if name != 'bot.raw.log']
+    assert len(rotated) == 1
+    assert rotated[0].endswith('.gz')
+    with gzip.open(os.path.join(tmpdir.strpath, rotated[0])) as compressed:
+        content = compressed.read().decode('utf-8')
+    assert content.endswith('\tfirst\n')
@@ -0,0 +1,76 @@
+# coding=utf-8
+"""Tests for server selection and connection"""
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+import socket
+
+import pytest
+
+from sopel.irc.servers import ServerList, create_connection, parse_server
+
+
+@pytest.mark.parametrize('entry, expected', (
+    ('irc.example.net', ('irc.example.net', 6667)),
+    ('irc.example.net:6697', ('irc.example.net', 6697)),
+    ('[2001:db8::1]:6697', ('2001:db8::1', 6697)),
+    ('[2001:db8::1]', ('2001:db8::1', 6667)),
+    ('2001:db8::1', ('2001:db8::1', 6667)),
+))
+def test_parse_server(entry, expected):
+    assert parse_server(entry, 6667) == expected
+
+
+def test_parse_server_invalid_port():
+    with pytest.raises(ValueError):
+        parse_server('irc.example.net:ircd', 6667)
+
+
+def test_server_list_order():
+    servers = ServerList([('a', 1), ('b', 1), ('c', 1)])
+    servers.add('a', 1)
+    assert len(servers) == 3
+    # Nothing known yet: configured order
+    assert servers.ordered() == [('a', 1), ('b', 1), ('c', 1)]
+
+    servers.record_success(('c', 1), 0.05)
+    servers.record_success(('b', 1), 0.5)
+    assert servers.ordered() == [('c', 1), ('b', 1), ('a', 1)]
+
+    servers.record_failure(('c', 1))
+    assert servers.ordered() == [('b', 1), ('a', 1), ('c', 1)]
+
+    # A success clears the failures
+    servers.record_success(('c', 1), 0.05)
+    assert servers.ordered()[0] == ('c', 1)
+
+
+def test_server_list_add_first():
+    servers = ServerList([('a', 1)])
+    servers.add('b', 1, first=True)
+    assert list(servers) == [('b', 1), ('a', 1)]
+
+
+def test_create_connection():
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(1)
+    try:
+        # "localhost" may also resolve to ::1, where nothing listens
+        sock = create_connection(('localhost', listener.getsockname()[1]),
+                                 timeout=5)
+        try:
+            assert sock.getpeername()[:2] == listener.getsockname()
+        finally:
+            sock.close()
+    finally:
+        listener.close()
+
+
+def test_create_connection_refused():
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(('127.0.0.1', 0))
+    port = listener.getsockname()[1]
+    listener.close()
+
+    with pytest.raises(socket.error):
+        create_connection(('127.0.0.1', port), timeout=5)
@@ -0,0 +1,210 @@
+# coding=utf-8
+"""Tests for the outbound line queue"""
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+import threading
+import time
+
+import pytest
+
+from sopel.irc.writer import OutboundQueue, QueueFull, SendFuture, TokenBucket
+from sopel.tools import Identifier
+
+
+class SlowSocket(object):
+    def __init__(self):
+        self.sent = []
+        self.release = threading.Event()
+
+    def send(self, data):
+        self.release.wait(5)
+        self.sent.append(data)
+        return len(data)
+
+
+def test_put_does_not_block():
+    sock = SlowSocket()
+    writer = OutboundQueue(sock.send)
+    writer.start()
+
+    future = SendFuture()
+    assert writer.put(b'PRIVMSG #a :b\r\n', future=future)
+    assert not future.done()
+
+    sock.release.set()
+    assert future.result(5)
+    writer.stop()
+    writer.join(5)
+    assert sock.sent == [b'PRIVMSG #a :b\r\n']
+    assert writer.sent == 1
+    assert writer.depth == 0
+
+
+def test_priority_lane_goes_first():
+    sock = SlowSocket()
+    writer = OutboundQueue(sock.send)
+    writer.put(b'one\r\n')
+    writer.put(b'two\r\n')
+    writer.put(b'PONG x\r\n', priority=True)
+    assert writer.depth == 3
+
+    sock.release.set()
+    writer.start()
+    writer.stop()
+    writer.join(5)
+    assert sock.sent == [b'PONG x\r\n', b'one\r\n', b'two\r\n']
+
+
+def test_full_queue_drops_normal_lines():
+    sock = SlowSocket()
+    writer = OutboundQueue(sock.send, maxsize=1)
+    assert writer.put(b'one\r\n')
+
+    future = SendFuture()
+    assert not writer.put(b'two\r\n', future=future)
+    assert writer.dropped == 1
+    with pytest.raises(QueueFull):
+        future.result(0)
+
+    # the priority lane is never full
+    assert writer.put(b'PONG x\r\n', priority=True)
+
+
+def test_partial_send():
+    chunks = []
+
+    def send(data):
+        chunks.append(data[:3])
+        return min(3, len(data))
+
+    writer = OutboundQueue(send)
+    writer.put(b'PING x\r\n')
+    writer.start()
+    writer.stop()
+    writer.join(5)
+    assert b''.join(chunks) == b'PING x\r\n'
+
+
+def test_stalled_send_after_stop():
+    chunks = []
+    stalls = [0, 0]
+
+    def send(data):
+        # Like a TLS socket that must write before taking more data
+        if stalls:
+            return stalls.pop()
+        chunks.append(data)
+        return len(data)
+
+    writer = OutboundQueue(send)
+    future = SendFuture()
+    writer.put(b'QUIT :bye\r\n', future=future)
+    writer.stop()
+    writer.start()
+    writer.join(5)
+    assert future.result(0)
+    assert chunks == [b'QUIT :bye\r\n']
+    assert writer.failed == 0
+
+
+def test_stop_discard():
+    writer = OutboundQueue(SlowSocket().send)
+    future = SendFuture()
+    writer.put(b'one\r\n', future=future)
+    writer.stop(discard=True)
+    assert writer.depth == 0
+    with pytest.raises(IOError):
+        future.result(0)
+
+
+def test_put_after_stop():
+    writer = OutboundQueue(SlowSocket().send)
+    writer.stop()
+    future = SendFuture()
+    assert not writer.put(b'one\r\n', priority=True, future=future)
+    assert writer.depth == 0
+    with pytest.raises(IOError):
+        future.result(0)
+
+
+class RecordingSocket(object):
+    def __init__(self):
+        self.sent = []
+
+    def send(self, data):
+        self.sent.append(data)
+        return len(data)
+
+
+def test_token_bucket():
+    bucket = TokenBucket(2, 1, 100)
+    assert bucket.ready_at(100) == 100
+    bucket.take(100)
+    bucket.take(100)
+    # Empty: the next line waits for a refill, or for the empty wait
+    assert bucket.ready_at(100) == 101
+    assert bucket.ready_at(100, empty_wait=0.5) == 100.5
+    assert bucket.ready_at(100.5, empty_wait=0.5) == 100.5
+    assert bucket.ready_at(101) == 101
+    assert not bucket.is_full(101)
+    assert bucket.is_full(105)
+
+
+def test_token_bucket_unlimited():
+    bucket = TokenBucket(0, 0, 100)
+    for _ in range(10):
+        bucket.take(100)
+    assert bucket.ready_at(100) == 100
+
+
+def test_throttled_target_does_not_hold_up_others():
+    sock = RecordingSocket()
+    writer = OutboundQueue(sock.send, burst=1, refill_rate=0.1, empty_wait=1)
+    for line in (b'a1\r\n', b'a2\r\n', b'a3\r\n'):
+        writer.put(line, target=Identifier('#a'))
+    for line in (b'b1\r\n', b'b2\r\n'):
+        writer.put(line, target=Identifier('#b'))
+    writer.put(b'JOIN #c\r\n')
+
+    writer.start()
+    deadline = time.time() + 5
+    while len(sock.sent) < 3 and time.time() < deadline:
+        time.sleep(0.01)
+    # The first line to each target goes right away, taking turns
+    assert sock.sent == [b'a1\r\n', b'b1\r\n', b'JOIN #c\r\n']
+
+    writer.stop()
+    writer.join(5)
+    # Once stopped, the rest is sent without throttling, still taking turns
+    assert sock.sent[3:] == [b'a2\r\n', b'b2\r\n', b'a3\r\n']
+
+
+def test_target_empty_wait():
+    sock = RecordingSocket()
+    writer = OutboundQueue(sock.send, burst=1, refill_rate=0, empty_wait=0.2)
+    writer.start()
+    start = time.time()
+    writer.put(b'one\r\n', target=Identifier('#a'))
+    future = SendFuture()
+    writer.put(b'two\r\n', target=Identifier('#A'), future=future)
+    assert future.result(5)
+    assert time.time() - start >= 0.2
+    writer.stop()
+    writer.join(5)
+    assert sock.sent == [b'one\r\n', b'two\r\n']
+
+
+def test_server_budget():
+    sock = RecordingSocket()
+    writer = OutboundQueue(sock.send, server_burst=2, server_refill_rate=5)
+    writer.start()
+    start = time.time()
+    futures = [SendFuture() for _ in range(3)]
+    for index, future in enumerate(futures):
+        writer.put(b'line\r\n', target=Identifier('#%d' % index),
+                   future=future)
+    assert futures[2].result(5)
+    # The third line waited for the server's bucket to refill
+    assert time.time() - start >= 0.15
+    writer.stop()
+    writer.join(5)
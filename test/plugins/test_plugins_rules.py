@@ -0,0 +1,222 @@
+# coding=utf-8
+"""Tests for the rule index of plugin callables"""
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+import re
+
+import pytest
+
+from sopel import loader
+from sopel.plugins.rules import RuleIndex
+from sopel.test_tools import MockConfig
+
+
+@pytest.fixture
+def tmpconfig():
+    config = MockConfig()
+    config.core.nick = 'Sopel'
+    config.core.prefix = r'\.'
+    return config
+
+
+def make_command(config, name, commands=(), nickname_commands=(), **kwargs):
+    def func(bot, trigger):
+        pass
+    func.__name__ = str(name)
+    if commands:
+        func.commands = list(commands)
+    if nickname_commands:
+        func.nickname_commands = list(nickname_commands)
+    for attr, value in kwargs.items():
+        setattr(func, attr, value)
+    loader.clean_callable(func, config)
+    return func
+
+
+def make_callable(name, rules=None, event='PRIVMSG', priority='medium'):
+    def func(bot, trigger):
+        pass
+    func.__name__ = str(name)
+    if rules is not None:
+        func.rule = [re.compile(rule) for rule in rules]
+    func.event = [event]
+    func.priority = priority
+    return func
+
+
+def test_get_by_event():
+    index = RuleIndex()
+    hello = make_callable('hello', [r'hello'])
+    join = make_callable('join', [r'.*'], event='JOIN')
+    index.add(hello)
+    index.add(join)
+
+    assert index.get('PRIVMSG') == [(hello.rule[0], [hello])]
+    assert index.get('JOIN') == [(join.rule[0], [join])]
+    assert index.get('MODE') == []
+
+
+def test_get_priority_order():
+    index = RuleIndex()
+    low = make_callable('low', [r'low'], priority='low')
+    high = make_callable('high', [r'high'], priority='high')
+    medium = make_callable('medium', [r'medium'])
+    for func in (low, high, medium):
+        index.add(func)
+
+    assert [funcs for rule, funcs in index.get('PRIVMSG')] == [
+        [high], [medium], [low]]
+
+
+def test_shared_rule():
+    index = RuleIndex()
+    first = make_callable('first', [r'same'])
+    second = make_callable('second', [r'same'])
+    index.add(first)
+    index.add(second)
+
+    assert index.get('PRIVMSG') == [(re.compile(r'same'), [first, second])]
+
+
+def test_catch_all_without_rule():
+    index = RuleIndex()
+    func = make_callable('intents_only')
+    index.add(func)
+
+    [(rule, funcs)] = index.get('PRIVMSG')
+    assert rule.match('anything')
+    assert funcs == [func]
+
+
+def test_remove():
+    index = RuleIndex()
+    first = make_callable('first', [r'same', r'other'])
+    second = make_callable('second', [r'same'])
+    index.add(first)
+    index.add(second)
+
+    index.remove(first)
+    assert first not in index
+    assert index.get('PRIVMSG') == [(re.compile(r'same'), [second])]
+
+    index.remove(second)
+    assert len(index) == 0
+    assert index.get('PRIVMSG') == []
+
+    # Removing again is a no-op
+    index.remove(second)
+
+
+def test_listeners():
+    index = RuleIndex()
+    low = make_callable('low', priority='low')
+    high = make_callable('high', priority='high')
+    join = make_callable('join', event='JOIN')
+    for func in (low, high, join):
+        func.listen = True
+        index.add(func)
+
+    assert index.listeners('PRIVMSG') == (high, low)
+    assert index.listeners('JOIN') == (join,)
+    assert index.listeners('MODE') == ()
+    # Listeners have no rule
+    assert index.get('PRIVMSG', 'anything') == []
+
+    index.remove(high)
+    assert high not in index
+    assert index.listeners('PRIVMSG') == (low,)
+    index.remove(low)
+    assert index.listeners('PRIVMSG') == ()
+
+
+def test_invalid_priority():
+    index = RuleIndex()
+    with pytest.raises(ValueError):
+        index.add(make_callable('bad', [r'bad'], priority='urgent'))
+
+
+def test_command_lookup(tmpconfig):
+    index = RuleIndex()
+    funcs = [make_command(tmpconfig, 'cmd%d' % i, ['cmd%d' % i])
+             for i in range(300)]
+    generic = make_callable('generic', [r'.*'])
+    for func in funcs + [generic]:
+        index.add(func)
+
+    rules = index.get('PRIVMSG', '.CMD42 some arguments')
+    # Only the one command is looked up, in the order it was added
+    assert [found for rule, found in rules] == [[funcs[42]], [generic]]
+    match = rules[0][0].match('.CMD42 some arguments')
+    assert match.group(1) == 'CMD42'
+    assert match.group(2) == 'some arguments'
+
+    assert index.get('PRIVMSG', 'no command') == [(generic.rule[0], [generic])]
+    assert index.get('PRIVMSG', '.unknown') == [(generic.rule[0], [generic])]
+
+
+def test_command_priority_order(tmpconfig):
+    index = RuleIndex()
+    high = make_callable('high', [r'.*'], priority='high')
+    low = make_callable('low', [r'.*'], priority='low')
+    command = make_command(tmpconfig, 'command', ['test'])
+    for func in (high, low, command):
+        index.add(func)
+
+    assert [funcs for rule, funcs in index.get('PRIVMSG', '.test')] == [
+        [high], [command], [low]]
+
+
+def test_nickname_command_lookup(tmpconfig):
+    tmpconfig.core.alias_nicks = ['Alias']
+    index = RuleIndex()
+    func = make_command(tmpconfig, 'hello', nickname_commands=['hello'])
+    index.add(func)
+
+    for line in ('Sopel: hello', 'sopel, HELLO there', 'Alias hello'):
+        [(rule, funcs)] = index.get('PRIVMSG', line)
+        assert funcs == [func]
+        assert rule.match(line)
+    assert index.get('PRIVMSG', 'Sopel: goodbye') == []
+
+
+@pytest.mark.parametrize('prefix, command, line', [
+    (r'\.|\.\.', 'echo', '..echo hi'),
+    (r'\.', 'seen', '.\u017feen Foo'),
+])
+def test_command_not_indexed(tmpconfig, prefix, command, line):
+    tmpconfig.core.prefix = prefix
+    index = RuleIndex()
+    func = make_command(tmpconfig, 'func', [command])
+    index.add(func)
+
+    [(rule, funcs)] = index.get('PRIVMSG', line)
+    assert funcs == [func]
+    assert rule.match(line)
+
+
+def test_remove_command(tmpconfig):
+    index = RuleIndex()
+    first = make_command(tmpconfig, 'first', ['same'])
+    second = make_command(tmpconfig, 'second', ['same'])
+    index.add(first)
+    index.add(second)
+
+    index.remove(first)
+    assert [funcs for rule, funcs in index.get('PRIVMSG', '.same')] == [
+        [second]]
+    index.remove(second)
+    assert index.get('PRIVMSG', '.same') == []
+
+
+def test_literal_prefilter(tmpconfig):
+    index = RuleIndex()
+    url = make_callable('url', [r'.*(https?://\S+)'])
+    url._rule_literals = {url.rule[0]: loader.get_required_literals(url.rule[0])}
+    generic = make_callable('generic', [r'.*'])
+    index.add(url)
+    index.add(generic)
+
+    assert [funcs for rule, funcs in index.get('PRIVMSG', 'no link')] == [
+        [generic]]
+    assert [funcs for rule, funcs in index.get('PRIVMSG', 'A HTTP link')] == [
+        [url], [generic]]
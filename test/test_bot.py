@@ -4,7 +4,7 @@ from __future__ import unicode_literals, absolute_import, print_function, divisi
 
 import pytest
 
-from sopel import bot, config, plugins
+from sopel import bot, config, loader, plugins, trigger
 
 
 @pytest.fixture
@@ -58,3 +58,272 @@ def test_reload_plugin_unregistered_plugin(tmpconfig):
     # And now it must raise an exception
     with pytest.raises(plugins.exceptions.PluginNotRegistered):
         sopel.reload_plugin(plugin.name)
+
+
+def test_add_network(tmpconfig):
+    sopel = bot.Sopel(tmpconfig, daemon=False)
+    sopel.scheduler.stop()
+    sopel.scheduler.join(timeout=10)
+    tmpconfig.parser.add_section('network:other')
+    tmpconfig.parser.set('network:other', 'host', 'irc.example.org')
+
+    other = sopel.add_network('other')
+
+    assert other.network == 'other'
+    assert other.primary is sopel
+    assert other.config.core.host == 'irc.example.org'
+    assert sopel.networks == {sopel.network: sopel, 'other': other}
+    # Plugins and storage are shared, connection state isn't
+    assert other._rules is sopel._rules
+    assert other.db is sopel.db
+    assert other.memory is sopel.memory
+    assert other.scheduler is sopel.scheduler
+    assert other.channels is not sopel.channels
+
+
+def test_shutdown_once(tmpconfig):
+    sopel = bot.Sopel(tmpconfig, daemon=False)
+    calls = []
+    sopel.shutdown_methods.append(calls.append)
+
+    sopel._shutdown()
+    # The run loop may call it again after ``handle_close`` did
+    sopel.shutdown_methods.append(calls.append)
+    sopel._shutdown()
+
+    assert calls == [sopel]
+    assert not sopel.scheduler.is_alive()
+
+
+def test_get_cap_requests(tmpconfig):
+    sopel = bot.Sopel(tmpconfig, daemon=False)
+    sopel.scheduler.stop()
+    sopel.scheduler.join(timeout=10)
+    sopel.cap_req('test', '-chghost')
+    sopel.cap_req('test', '=batch')
+
+    requests = sopel._get_cap_requests()
+
+    # Core capabilities come from coretasks
+    assert 'multi-prefix' in requests
+    assert 'account-tag' in requests
+    assert '-chghost' in requests
+    assert 'batch' in requests
+    assert 'sasl' not in requests
+
+    tmpconfig.core.auth_method = 'sasl'
+    assert 'sasl' in sopel._get_cap_requests()
+
+
+def test_say_splits_with_real_length(tmpconfig):
+    sopel = bot.Sopel(tmpconfig, daemon=False)
+    sopel.scheduler.stop()
+    sopel.scheduler.join(timeout=10)
+    sent = []
+    sopel.write = lambda args, text=None: sent.append((args, text))
+    max_length = sopel.get_max_text_length('PRIVMSG', '#sopel')
+    assert max_length > 400
+
+    words = ['α' * 10] * 100  # 2100 bytes
+    sopel.say(' '.join(words), '#sopel', max_messages=3)
+
+    assert len(sent) == 3
+    for args, text in sent:
+        assert args == ('PRIVMSG', '#sopel')
+        assert len(text.encode('utf-8')) <= max_length
+        assert text.strip() == text
+    # Lines are split between words
+    for args, text in sent[:2]:
+        assert set(text.split(' ')) == set(['α' * 10])
+
+
+def test_action_keeps_ctcp_delimiters(tmpconfig):
+    sopel = bot.Sopel(tmpconfig, daemon=False)
+    sopel.scheduler.stop()
+    sopel.scheduler.join(timeout=10)
+    sent = []
+    sopel.write = lambda args, text=None: sent.append((args, text))
+
+    sopel.action('a' * 600, '#sopel')
+
+    text = sent[0][1]
+    assert text.startswith('\001ACTION a')
+    assert text.endswith('\001')
+    assert len(text.encode('utf-8')) == sopel.get_max_text_length(
+        'PRIVMSG', '#sopel')
+
+
+def test_dispatch_by_event(tmpconfig):
+    sopel = bot.Sopel(tmpconfig, daemon=False)
+    sopel.scheduler.stop()
+    sopel.scheduler.join(timeout=10)
+    called = []
+
+    def on_privmsg(bot, trigger):
+        called.append('privmsg')
+
+    def on_invite(bot, trigger):
+        called.append('invite')
+
+    on_privmsg.rule = ['.*']
+    on_invite.rule = ['.*']
+    on_invite.event = 'INVITE'
+    for func in (on_privmsg, on_invite):
+        func.thread = False
+        loader.clean_callable(func, tmpconfig)
+    sopel.register([on_privmsg, on_invite], [], [], [])
+
+    line = ':Foo!foo@example.com INVITE TestBot #Sopel'
+    sopel.dispatch(trigger.PreTrigger(sopel.nick, line))
+    assert called == ['invite']
+
+    sopel.unregister(on_invite)
+    sopel.dispatch(trigger.PreTrigger(sopel.nick, line))
+    assert called == ['invite']
+
+
+def test_call_rate_limit(tmpconfig):
+    sopel = bot.Sopel(tmpconfig, daemon=False)
+    sopel.scheduler.stop()
+    sopel.scheduler.join(timeout=10)
+    called = []
+
+    def hello(bot, trigger):
+        called.append(trigger.nick)
+
+    hello.rule = ['hello']
+    hello.rate = 60
+    hello.thread = False
+    loader.clean_callable(hello, tmpconfig)
+    sopel.register([hello], [], [], [])
+
+    line = ':%s!foo@example.com PRIVMSG #Sopel :hello'
+    sopel.dispatch(trigger.PreTrigger(sopel.nick, line % 'Foo'))
+    sopel.dispatch(trigger.PreTrigger(sopel.nick, line % 'Foo'))
+    sopel.dispatch(trigger.PreTrigger(sopel.nick, line % 'Bar'))
+    assert called == ['Foo', 'Bar']
+
+    # Only the user limit is set: nothing else is remembered
+    assert len(sopel._times) == 2
+
+    # The calls were timed
+    stats = sopel.call_stats.get('%s.hello' % __name__)
+    assert stats['calls'] == 2
+    assert stats['errors'] == 0
+
+
+def test_dispatch_disabled_in_channel(tmpconfig):
+    sopel = bot.Sopel(tmpconfig, daemon=False)
+    sopel.scheduler.stop()
+    sopel.scheduler.join(timeout=10)
+    called = []
+
+    def hello(bot, trigger):
+        called.append(trigger.sender)
+
+    hello.rule = ['hello']
+    hello.thread = False
+    loader.clean_callable(hello, tmpconfig)
+    sopel.register([hello], [], [], [])
+
+    line = ':Foo!foo@example.com PRIVMSG %s :hello'
+    sopel.dispatch(trigger.PreTrigger(sopel.nick, line % '#Sopel'))
+    assert called == ['#Sopel']
+
+    # The policy is read again when the configuration changes
+    tmpconfig.add_section('#sopel')
+    tmpconfig.parser.set(
+        '#sopel', 'disable_commands', "{%r: ['hello']}" % hello.__module__)
+    sopel.dispatch(trigger.PreTrigger(sopel.nick, line % '#Sopel'))
+    sopel.dispatch(trigger.PreTrigger(sopel.nick, line % '#other'))
+    assert called == ['#Sopel', '#other']
+
+    tmpconfig.parser.remove_option('#sopel', 'disable_commands')
+    tmpconfig.parser.set('#sopel', 'disable_modules', '*')
+    sopel.dispatch(trigger.PreTrigger(sopel.nick, line % '#Sopel'))
+    assert called == ['#Sopel', '#other']
+
+    tmpconfig.parser.remove_section('#sopel')
+    sopel.dispatch(trigger.PreTrigger(sopel.nick, line % '#Sopel'))
+    assert called == ['#Sopel', '#other', '#Sopel']
+
+
+def test_dispatch_listeners(tmpconfig):
+    sopel = bot.Sopel(tmpconfig, daemon=False)
+    sopel.scheduler.stop()
+    sopel.scheduler.join(timeout=10)
+    heard = []
+
+    def note(bot, pretrigger):
+        heard.append((bot, pretrigger.nick, pretrigger.text))
+
+    def fail(bot, pretrigger):
+        raise ValueError('Oops')
+
+    for func in (note, fail):
+        func.listen = True
+        loader.clean_callable(func, tmpconfig)
+    sopel.register([note, fail], [], [], [])
+
+    line = ':%s!foo@example.com PRIVMSG #Sopel :%s'
+    for nick, text in (('Foo', 'one'), ('Bar', 'two'), ('Foo', 'three')):
+        sopel.dispatch(trigger.PreTrigger(sopel.nick, line % (nick, text)))
+    # The bot's own messages are left out, unless the listener has echo
+    sopel.dispatch(trigger.PreTrigger(sopel.nick, line % ('TestBot', 'me')))
+    sopel.listener_worker.stop(timeout=10)
+
+    # In order, with the bot itself
+    assert heard == [
+        (sopel, 'Foo', 'one'),
+        (sopel, 'Bar', 'two'),
+        (sopel, 'Foo', 'three'),
+    ]
+    assert sopel.call_stats.get('%s.note' % __name__)['calls'] == 3
+    assert sopel.call_stats.get('%s.fail' % __name__)['errors'] == 3
+
+
+def test_dispatch_listeners_blocked(tmpconfig):
+    tmpconfig.core.nick_blocks = ['Spam.*']
+    sopel = bot.Sopel(tmpconfig, daemon=False)
+    sopel.scheduler.stop()
+    sopel.scheduler.join(timeout=10)
+    heard = []
+
+    def note(bot, pretrigger):
+        heard.append(pretrigger.nick)
+
+    note.listen = True
+    note.thread = False
+    loader.clean_callable(note, tmpconfig)
+    sopel.register([note], [], [], [])
+
+    line = ':%s!foo@example.com PRIVMSG #Sopel :hello'
+    sopel.dispatch(trigger.PreTrigger(sopel.nick, line % 'Foo'))
+    sopel.dispatch(trigger.PreTrigger(sopel.nick, line % 'Spammer'))
+    assert heard == ['Foo']
+
+    sopel.unregister(note)
+    sopel.dispatch(trigger.PreTrigger(sopel.nick, line % 'Foo'))
+    assert heard == ['Foo']
+
+
+def test_say_loop_detection(tmpconfig, monkeypatch):
+    sopel = bot.Sopel(tmpconfig, daemon=False)
+    sopel.scheduler.stop()
+    sopel.scheduler.join(timeout=10)
+    sent = []
+    monkeypatch.setattr(
+        sopel, 'write', lambda args, text=None: sent.append((args[1], text)))
+    monkeypatch.setattr(sopel, 'MAX_STACK_RECIPIENTS', 2)
+
+    for _ in range(10):
+        sopel.say('spam', '#Sopel')
+    # Repeated lines become '...', then nothing
+    assert [text for _, text in sent] == ['spam'] * 5 + ['...'] * 3
+
+    # Only the most recently messaged recipients are remembered
+    sopel.say('hello', '#a')
+    sopel.say('hello', '#b')
+    assert list(sopel.stack) == ['#a', '#b']
+    sopel.say('hello', '#a')
+    assert list(sopel.stack) == ['#b', '#a']
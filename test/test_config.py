@@ -146,3 +146,44 @@ class ConfigFunctionalTest(unittest.TestCase):
     def test_fileattribute_given_file_when_dir(self):
         with self.assertRaises(ValueError):
             self.config.fake.ad_fileattr = self.testfile
+
+
+class NetworkConfigTest(unittest.TestCase):
+    def setUp(self):
+        self.filename = tempfile.mkstemp()[1]
+        with open(self.filename, 'w') as fileo:
+            fileo.write(
+                "[core]\n"
+                "owner=dgw\n"
+                "nick=Sopel\n"
+                "host=irc.example.net\n"
+                "networks=other\n"
+                "[network:other]\n"
+                "host=irc.example.org\n"
+                "[fake]\n"
+                "valattr=shared\n"
+            )
+        self.config = config.Config(self.filename)
+        self.config.define_section('fake', FakeConfigSection)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_network_overrides_core(self):
+        network = self.config.network('other')
+        self.assertEqual(network.network, 'other')
+        self.assertEqual(network.core.host, 'irc.example.org')
+        self.assertEqual(network.core.nick, 'Sopel')
+        self.assertEqual(self.config.core.host, 'irc.example.net')
+
+    def test_network_shares_other_sections(self):
+        network = self.config.network('other')
+        self.assertEqual(network.fake.valattr, 'shared')
+
+    def test_network_writes_its_own_section(self):
+        network = self.config.network('other')
+        network.core.owner_account = 'dgw'
+        self.assertEqual(network.core.owner_account, 'dgw')
+        self.assertEqual(self.config.core.owner_account, None)
+        self.assertEqual(
+            self.config.parser.get('network:other', 'owner_account'), 'dgw')
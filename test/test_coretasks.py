@@ -108,3 +108,26 @@ def test_bot_mixed_mode_types(sopel):
     assert sopel.channels["#test"].privileges[Identifier("Uvoice2")] == VOICE
     assert sopel.channels["#test"].privileges[Identifier("Uop2")] == OP
     assert sopel.channels["#test"].privileges[Identifier("Uadmin2")] == ADMIN
+
+
+def test_cap_ls_per_network():
+    first, second = MockSopel('Sopel'), MockSopel('Sopel')
+    for bot in (first, second):
+        bot.server_capabilities = {}
+        bot._batched_caps = {}
+
+    def cap_ls(bot, line):
+        pretrigger = PreTrigger('Sopel', line)
+        trigger = Trigger(bot.config, pretrigger, None)
+        coretasks.receive_cap_ls_reply(MockSopelWrapper(bot, trigger), trigger)
+
+    # Multi-line replies from two networks at once
+    cap_ls(first, ':a.example.com CAP * LS * :multi-prefix sasl=PLAIN')
+    cap_ls(second, ':b.example.com CAP * LS * :away-notify')
+    cap_ls(first, ':a.example.com CAP * LS :account-tag')
+    cap_ls(second, ':b.example.com CAP * LS :echo-message')
+
+    assert first.server_capabilities == {
+        'multi-prefix': None, 'sasl': 'PLAIN', 'account-tag': None}
+    assert second.server_capabilities == {
+        'away-notify': None, 'echo-message': None}
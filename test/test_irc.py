@@ -8,7 +8,10 @@ import asynchat
 import os
 import shutil
 import socket
+import sys
 import tempfile
+import threading
+import time
 import asyncore
 
 from sopel import irc
@@ -144,3 +147,400 @@ def test_bot_connect(bot):
 
     # Do main run
     test_bot.run(HOST, s.address[1])
+
+
+def test_bot_reconnect(bot):
+    test_bot = bot(
+        '[core]\n'
+        'owner=Baz\n'
+        'nick=Foo\n'
+        'user=Bar\n'
+        'name=Sopel\n'
+        'host=127.0.0.1\n'
+        'timeout=10\n'
+    )
+    lines = []
+    test_bot.dispatch = lines.append
+
+    for _ in range(2):
+        s = start_server(basic_irc_replies)
+        test_bot.run(HOST, s.address[1])
+        assert not test_bot.connected
+        assert [pretrigger.event for pretrigger in lines][-1] == '001'
+        del lines[:]
+
+    # Lines written while disconnected are dropped
+    with pytest.raises(IOError):
+        test_bot.write(('JOIN', '#x'), future=True).result(1)
+
+
+def test_bot_connect_failover(bot):
+    # Nothing listens on this port
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind((HOST, 0))
+    dead_port = listener.getsockname()[1]
+    listener.close()
+
+    s = start_server(basic_irc_replies)
+    test_bot = bot(
+        '[core]\n'
+        'owner=Baz\n'
+        'nick=Foo\n'
+        'user=Bar\n'
+        'name=Sopel\n'
+        'host=127.0.0.1\n'
+        'timeout=10\n'
+        'servers=127.0.0.1:{}\n'.format(s.address[1])
+    )
+
+    test_bot.run(HOST, dead_port)
+
+    assert test_bot.server == (HOST, s.address[1])
+    assert test_bot.servers.failures[(HOST, dead_port)] == 1
+    assert test_bot.servers.ordered()[0] == (HOST, s.address[1])
+
+
+def start_threaded_server(rpl_function):
+    """Serve a single client from a thread, for backends without asyncore."""
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind((HOST, 0))
+    listener.listen(1)
+    received = []
+
+    def serve():
+        conn, _ = listener.accept()
+        listener.close()
+        data = b''
+        try:
+            while True:
+                chunk = conn.recv(512)
+                if not chunk:
+                    break
+                data += chunk
+                while b'\n' in data:
+                    line, data = data.split(b'\n', 1)
+                    msg = line.decode('utf-8').rstrip('\r')
+                    received.append(msg)
+                    response = rpl_function(msg)
+                    if response is None:
+                        return
+                    conn.sendall(':fake.server {}\r\n'.format(response).encode())
+        finally:
+            conn.close()
+
+    thread = threading.Thread(target=serve)
+    thread.daemon = True
+    thread.start()
+    return listener.getsockname(), thread, received
+
+
+@pytest.mark.skipif(sys.version_info < (3, 5, 2),
+                    reason='asyncio backend requires Python 3.5.2+')
+def test_bot_connect_asyncio(bot):
+    test_bot = bot(
+        '[core]\n'
+        'owner=Baz\n'
+        'nick=Foo\n'
+        'user=Bar\n'
+        'name=Sopel\n'
+        'host=127.0.0.1\n'
+        'timeout=10\n'
+        'connection_backend=asyncio\n'
+    )
+    lines = []
+    test_bot.dispatch = lines.append
+
+    def replies(msg):
+        if msg.startswith('USER'):
+            # Quit here because good enough
+            return None
+        return basic_irc_replies(None, msg)
+
+    address, thread, received = start_threaded_server(replies)
+
+    test_bot.run(HOST, address[1])
+    thread.join(5)
+
+    assert test_bot.backend == 'asyncio'
+    assert received[:3] == ['CAP LS 302', 'NICK Foo', 'USER Bar +iw Foo :Sopel']
+    assert [pretrigger.event for pretrigger in lines][:2] == ['CAP', '001']
+    assert not test_bot.connected
+
+
+@pytest.mark.skipif(sys.version_info < (3, 5, 2),
+                    reason='asyncio backend requires Python 3.5.2+')
+def test_bot_asyncio_close_after_quit(bot):
+    test_bot = bot(
+        '[core]\n'
+        'owner=Baz\n'
+        'nick=Foo\n'
+        'user=Bar\n'
+        'name=Sopel\n'
+        'host=127.0.0.1\n'
+        'timeout=10\n'
+        'connection_backend=asyncio\n'
+    )
+    test_bot.dispatch = lambda pretrigger: None
+
+    def replies(msg):
+        if msg.startswith('USER'):
+            # The bot closes the connection itself on ERROR, once it quit
+            test_bot.hasquit = True
+            return 'ERROR :Closing link'
+        return basic_irc_replies(None, msg)
+
+    address, thread, received = start_threaded_server(replies)
+
+    test_bot.run(HOST, address[1])
+    thread.join(5)
+
+    assert not thread.is_alive()
+    # The bot closed it, but the connection's threads are stopped all the same
+    assert test_bot._handled_close
+    assert test_bot.keepalive is None
+    assert not test_bot.writer.is_alive()
+
+
+@pytest.mark.skipif(sys.version_info < (3, 8),
+                    reason='asyncio re-raises KeyboardInterrupt since 3.8')
+def test_bot_asyncio_keyboard_interrupt(bot):
+    test_bot = bot(
+        '[core]\n'
+        'owner=Baz\n'
+        'nick=Foo\n'
+        'user=Bar\n'
+        'name=Sopel\n'
+        'host=127.0.0.1\n'
+        'timeout=10\n'
+        'connection_backend=asyncio\n'
+    )
+
+    def dispatch(pretrigger):
+        if pretrigger.event == '001':
+            raise KeyboardInterrupt
+
+    test_bot.dispatch = dispatch
+
+    def replies(msg):
+        if msg.startswith('NICK'):
+            # Leave the bot time to connect, and wait for the server
+            time.sleep(0.2)
+            return '001 Foo :Hello'
+        elif msg.startswith('USER'):
+            return 'NOTICE * :Hello'
+        elif msg.startswith('QUIT'):
+            return None
+        return basic_irc_replies(None, msg)
+
+    address, thread, received = start_threaded_server(replies)
+
+    started = time.time()
+    test_bot.run(HOST, address[1])
+    thread.join(5)
+
+    assert received[-1] == 'QUIT :KeyboardInterrupt'
+    # The QUIT is sent right away, not once the writer gave up waiting
+    assert time.time() - started < 4
+
+
+@pytest.mark.skipif(sys.version_info < (3, 5, 2),
+                    reason='asyncio backend requires Python 3.5.2+')
+def test_bot_connect_pipelined_caps(bot):
+    test_bot = bot(
+        '[core]\n'
+        'owner=Baz\n'
+        'nick=Foo\n'
+        'user=Bar\n'
+        'name=Sopel\n'
+        'host=127.0.0.1\n'
+        'timeout=1\n'
+        'connection_backend=asyncio\n'
+    )
+    test_bot._get_cap_requests = lambda: ['multi-prefix', '-away-notify']
+    test_bot.dispatch = lambda pretrigger: None
+
+    def replies(msg):
+        if msg == 'CAP END':
+            return '001 Foo :Hello'
+        if msg.startswith('CAP') or msg.startswith('NICK'):
+            return '421 {} :Unknown command'.format(msg)
+        if msg.startswith('USER'):
+            return 'NOTICE * :Waiting for CAP END'
+        # Close on the keep-alive's PING
+        return None
+
+    address, thread, received = start_threaded_server(replies)
+
+    test_bot.run(HOST, address[1])
+    thread.join(5)
+
+    # Everything is sent at once, without waiting for CAP LS's reply
+    assert received[:6] == [
+        'CAP LS 302',
+        'CAP REQ multi-prefix',
+        'CAP REQ -away-notify',
+        'NICK Foo',
+        'USER Bar +iw Foo :Sopel',
+        'CAP END',
+    ]
+    assert test_bot.registration_time is not None
+
+
+class FakeTransport(object):
+    def __init__(self):
+        self.written = []
+
+    def write(self, data):
+        self.written.append(data)
+
+    def is_closing(self):
+        return False
+
+
+@pytest.mark.skipif(sys.version_info < (3, 5, 2),
+                    reason='asyncio backend requires Python 3.5.2+')
+def test_asyncio_send_waits_for_the_transport():
+    import asyncio
+    from sopel.irc.backends import AsyncioConnection
+
+    loop = asyncio.new_event_loop()
+    loop_thread = threading.Thread(target=loop.run_forever)
+    loop_thread.start()
+    try:
+        connection = AsyncioConnection(None, loop)
+        connection.transport = FakeTransport()
+        connection._loop_thread = loop_thread
+
+        assert connection.send(b'one\r\n') == 5
+        assert connection.transport.written == [b'one\r\n']
+
+        # While the transport's buffer is full, sending waits
+        loop.call_soon_threadsafe(connection.pause_writing)
+        results = []
+        sender = threading.Thread(
+            target=lambda: results.append(connection.send(b'two\r\n')))
+        sender.start()
+        sender.join(0.2)
+        assert sender.is_alive()
+        assert results == []
+
+        loop.call_soon_threadsafe(connection.resume_writing)
+        sender.join(5)
+        assert results == [5]
+        assert connection.transport.written == [b'one\r\n', b'two\r\n']
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        loop_thread.join(5)
+        loop.close()
+
+
+def test_collect_incoming_data_batches_lines(bot):
+    test_bot = bot('[core]\nowner=Baz\nnick=Foo\n')
+    batches = []
+    test_bot.dispatch_batch = batches.append
+
+    test_bot.collect_incoming_data(b':a!b@c PRIVMSG #x :one\r\n:a!b@c PRI')
+    test_bot.collect_incoming_data(b'VMSG #x :two\r\n:a!b@c PRIVMSG #x :three\r\n')
+
+    assert [[p.args[-1] for p in batch] for batch in batches] == [
+        ['one'], ['two', 'three']]
+
+
+def test_collect_incoming_data_split_multibyte(bot):
+    test_bot = bot('[core]\nowner=Baz\nnick=Foo\n')
+    lines = []
+    test_bot.dispatch = lines.append
+
+    data = ':a!b@c PRIVMSG #x :café\r\n'.encode('utf-8')
+    cut = data.index(b'\xa9')  # inside the two bytes of the "é"
+    test_bot.collect_incoming_data(data[:cut])
+    test_bot.collect_incoming_data(data[cut:])
+
+    assert [p.args[-1] for p in lines] == ['café']
+
+
+def test_collect_incoming_data_fallback_encodings(bot):
+    test_bot = bot(
+        '[core]\n'
+        'owner=Baz\n'
+        'nick=Foo\n'
+        'incoming_encodings=utf-8,cp1252\n'
+    )
+    lines = []
+    test_bot.dispatch = lines.append
+
+    test_bot.collect_incoming_data(b':a!b@c PRIVMSG #x :\x93hi\x94\n')
+    # 0x81 is undefined in cp1252: the line is discarded
+    test_bot.collect_incoming_data(b':a!b@c PRIVMSG #x :\x81\n')
+
+    assert [p.args[-1] for p in lines] == ['“hi”']
+
+
+def test_ssl_context_is_cached(bot):
+    from sopel.irc.backends import get_ssl_context
+    test_bot = bot('[core]\nowner=Baz\nnick=Foo\nuse_ssl=true\n')
+
+    context = get_ssl_context(test_bot)
+    assert context is not None
+    assert get_ssl_context(test_bot) is context
+
+
+def test_ssl_send_would_block(bot):
+    import ssl
+
+    class WouldBlock(object):
+        def send(self, data):
+            raise ssl.SSLWantWriteError()
+
+        def read(self, size):
+            raise ssl.SSLWantReadError()
+
+    test_bot = bot('[core]\nowner=Baz\nnick=Foo\nuse_ssl=true\n')
+    test_bot.socket = WouldBlock()
+    # Non-blocking TLS: nothing sent or received yet, but nothing broken
+    assert test_bot._ssl_send(b'PING :x\r\n') == 0
+    assert test_bot._ssl_recv(512) == b''
+
+
+def test_write_keepalive_lines_go_first(bot):
+    test_bot = bot('[core]\nowner=Baz\nnick=Foo\n')
+    queued = []
+
+    class FakeWriter(object):
+        def put(self, data, text, priority, future, **kwargs):
+            queued.append((data, priority))
+
+    test_bot.writer = FakeWriter()
+    test_bot.connection_registered = True
+    test_bot.enabled_capabilities.add('echo-message')
+    test_bot.write(('PING', 'token'))
+    test_bot.write(('PONG', 'token'))
+    test_bot.write(('PRIVMSG', '#a'), 'hi')
+    assert queued == [
+        (b'PING token\r\n', True),
+        (b'PONG token\r\n', True),
+        (b'PRIVMSG #a :hi\r\n', False),
+    ]
+
+
+def test_parse_line_keeps_tags_lazy(bot):
+    test_bot = bot('[core]\nowner=Baz\nnick=Foo\n')
+    pretrigger = test_bot._parse_line(
+        '@account=Foo :Foo!foo@example.com PRIVMSG #Sopel :Hi')
+    assert pretrigger._tags is None
+    # Without account-tag nor extended-join, the account can't be trusted
+    assert pretrigger.tags == {}
+
+    test_bot.enabled_capabilities.add('account-tag')
+    pretrigger = test_bot._parse_line(
+        '@account=Foo :Foo!foo@example.com PRIVMSG #Sopel :Hi')
+    assert pretrigger.tags == {'account': 'Foo'}
+
+
+def test_parse_line_keeps_raw(bot):
+    test_bot = bot('[core]\nowner=Baz\nnick=Foo\n')
+    assert test_bot.raw is None
+
+    test_bot._parse_line(':Foo!foo@example.com PRIVMSG #Sopel :Hi')
+    # handle_error writes it to the exception log
+    assert test_bot.raw == ':Foo!foo@example.com PRIVMSG #Sopel :Hi'
@@ -3,6 +3,7 @@
 from __future__ import unicode_literals, absolute_import, print_function, division
 
 import inspect
+import re
 
 import pytest
 
@@ -489,3 +490,52 @@ def test_clean_callable_intents(tmpconfig, func):
     loader.clean_callable(func, tmpconfig)
     assert len(func.intents) == 1
     assert regex in func.intents
+
+
+@pytest.mark.parametrize('pattern, literals', [
+    (r'.*', None),
+    (r'hello', ['hello']),
+    (r'.*(https?://\S+).*', ['http']),
+    (r'(?:foo|bar)bazz', ['bazz']),
+    (r'(?:foobar|quux)', ['foobar', 'quux']),
+    (r'(?:foo|.*)', None),
+    (r'(?:abc)?d', ['d']),
+    (r'(?:abc)+d', ['abc']),
+    (r'(?i)HTTP', ['http']),
+    # Case insensitive "s" also matches "ſ" (U+017F), the long s
+    (r'(?i)s/', ['/']),
+    (r's/', ['s/']),
+])
+def test_get_required_literals(pattern, literals):
+    regexp = re.compile(pattern)
+    result = loader.get_required_literals(regexp)
+    if literals is None:
+        assert result is None
+    else:
+        assert result == frozenset(literals)
+
+
+def test_clean_callable_rule_literals(tmpconfig, func):
+    setattr(func, 'rule', [r'.*hello', r'.*'])
+    setattr(func, 'commands', ['echo'])
+    loader.clean_callable(func, tmpconfig)
+
+    hello, catch_all, command = func.rule
+    assert func._rule_literals == {hello: frozenset(['hello'])}
+    assert command in func._command_rules
+
+
+@pytest.mark.parametrize('prefix, command', [
+    # "..echo" also matches, after the second prefix
+    (r'\.|\.\.', 'echo'),
+    # Case insensitive "s" also matches "ſ" (U+017F), the long s
+    (r'\.', 'seen'),
+    (r'\.', 'café'),
+])
+def test_clean_callable_unindexed_commands(tmpconfig, func, prefix, command):
+    tmpconfig.core.prefix = prefix
+    setattr(func, 'commands', [command])
+    loader.clean_callable(func, tmpconfig)
+
+    # These are tried like any other rule
+    assert func._command_rules == {}
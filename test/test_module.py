@@ -129,6 +129,19 @@ def test_event():
     assert mock.event == ['301']
 
 
+def test_listen():
+    @module.listen()
+    def mock(bot, pretrigger):
+        return True
+    assert mock.listen is True
+    assert mock.event == ['PRIVMSG']
+
+    @module.listen(event=['JOIN', 'PART'])
+    def mock(bot, pretrigger):
+        return True
+    assert mock.event == ['JOIN', 'PART']
+
+
 def test_intent():
     @module.intent('ACTION')
     def mock(bot, trigger, match):
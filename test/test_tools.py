@@ -95,6 +95,49 @@ def test_get_sendable_message_two_bytes():
     assert excess == 'α α'
 
 
+def test_get_sendable_message_three_bytes():
+    # Never cut a character in half, even with no space to split at
+    text, excess = tools.get_sendable_message('€€€€', 7)
+    assert text == '€€'
+    assert excess == '€€'
+
+
+def test_get_sendable_message_color_code():
+    # "aaa" then a color code, which can't be split
+    text, excess = tools.get_sendable_message('aaa\x0304,12bbb', 6)
+    assert text == 'aaa'
+    assert excess == '\x0304,12bbb'
+
+
+def test_split_message():
+    lines = tools.split_message(' '.join(['a' * 10] * 5), 21)
+    assert lines == ['a' * 10 + ' ' + 'a' * 10] * 2 + ['a' * 10]
+
+
+def test_split_message_max_messages():
+    lines = tools.split_message('a b c d', 1, max_messages=3)
+    assert lines == ['a', 'b', 'c d']
+
+
+def test_split_message_empty():
+    assert tools.split_message('') == ['']
+
+
+def test_truncate_message():
+    assert tools.truncate_message('aaaa', 4) == 'aaaa'
+    assert tools.truncate_message('aa bb', 4) == 'aa b'
+    assert tools.truncate_message('aαα', 4) == 'aα'
+
+
+def test_get_hostmasks_regex():
+    pattern = tools.get_hostmasks_regex(['Foo', '*@example.com', ''])
+    assert pattern.match('foo')
+    assert pattern.match('Bar@example.com')
+    assert not pattern.match('Foobar')
+    assert not pattern.match('Bar@example.org')
+    assert tools.get_hostmasks_regex([]) is None
+
+
 def test_time_timedelta_formatter():
     payload = 10000
     assert seconds_to_human(payload) == '2 hours, 46 minutes ago'
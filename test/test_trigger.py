@@ -140,6 +140,43 @@ def test_ctcp_data_pretrigger(nick):
     assert pretrigger.sender == Identifier('Foo')
 
 
+def test_tags_unescaped_pretrigger(nick):
+    line = ('@msg=a\\:b\\sc\\\\d\\re\\nf;other=\\x\\;empty= '
+            ':Foo!foo@example.com PRIVMSG #Sopel :Hello')
+    pretrigger = PreTrigger(nick, line)
+    assert pretrigger.tags == {'msg': 'a;b c\\d\re\nf',
+                               'other': 'x',
+                               'empty': ''}
+
+
+def test_server_time_pretrigger(nick):
+    line = '@time=2016-01-09T03:15:42.000Z :Foo!foo@example.com PING :x'
+    pretrigger = PreTrigger(nick, line)
+    assert pretrigger.time == datetime.datetime(2016, 1, 9, 3, 15, 42, 0)
+
+    # Without server-time, it's when the line was received, not when the
+    # time is first looked at
+    before = datetime.datetime.utcnow().replace(microsecond=0)
+    pretrigger = PreTrigger(nick, ':Foo!foo@example.com PING :x')
+    assert pretrigger.time >= before
+    assert pretrigger.time == pretrigger.time
+
+
+def test_pretrigger_has_slots(nick):
+    pretrigger = PreTrigger(nick, ':Foo!foo@example.com PRIVMSG #Sopel :Hi')
+    assert not hasattr(pretrigger, '__dict__')
+
+
+def test_pretrigger_untrusted_account(nick):
+    line = '@account=Foo;time=x :Foo!foo@example.com PRIVMSG #Sopel :Hi'
+    pretrigger = PreTrigger(nick, line, account_tags=False)
+    assert pretrigger.tags == {'time': 'x'}
+
+    line = ':Foo!foo@example.com JOIN #Sopel bar :Real Name'
+    pretrigger = PreTrigger(nick, line, account_tags=False)
+    assert pretrigger.tags == {}
+
+
 def test_ircv3_extended_join_pretrigger(nick):
     line = ':Foo!foo@example.com JOIN #Sopel bar :Real Name'
     pretrigger = PreTrigger(nick, line)
@@ -243,3 +280,41 @@ def test_ircv3_server_time_trigger(nick):
     line = '@time=2016-01-09T04:20 :Foo!foo@example.com PRIVMSG #Sopel :Hello, world'
     pretrigger = PreTrigger(nick, line)
     assert pretrigger.time is not None
+
+
+def test_network_trigger(nick):
+    line = ':Foo!foo@example.com PRIVMSG #Sopel :Hello, world'
+    pretrigger = PreTrigger(nick, line, 'example')
+    assert pretrigger.network == 'example'
+
+    config = MockConfig()
+    config.core.owner = 'Foo'
+    config.core.admins = ['Bar']
+
+    fakematch = re.match('.*', line)
+
+    trigger = Trigger(config, pretrigger, fakematch)
+    assert trigger.network == 'example'
+
+
+def test_admin_trigger(nick):
+    line = ':Bar!bar@example.com PRIVMSG #Sopel :Hello, world'
+    pretrigger = PreTrigger(nick, line)
+
+    config = MockConfig()
+    config.core.owner = 'Foo'
+    config.core.admins = ['Baz', '*@example.com']
+
+    fakematch = re.match('.*', line)
+
+    trigger = Trigger(config, pretrigger, fakematch)
+    assert trigger.admin is True
+    assert trigger.owner is False
+
+    # Privileges are checked once per line
+    config.core.admins = []
+    trigger = Trigger(config, pretrigger, fakematch)
+    assert trigger.admin is True
+
+    trigger = Trigger(config, PreTrigger(nick, line), fakematch)
+    assert trigger.admin is False
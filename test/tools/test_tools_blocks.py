@@ -0,0 +1,99 @@
+# coding=utf-8
+"""Tests for the blocklist matcher"""
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+import pytest
+
+from sopel import config
+from sopel.tools import Identifier
+from sopel.tools.blocks import BlockList
+
+
+@pytest.fixture
+def tmpconfig(tmpdir):
+    conf_file = tmpdir.join('conf.ini')
+    conf_file.write("\n".join([
+        "[core]",
+        "owner=testnick",
+        "nick = TestBot",
+        ""
+    ]))
+    return config.Config(conf_file.strpath)
+
+
+def test_check_empty(tmpconfig):
+    blocks = BlockList(tmpconfig)
+    assert blocks.check(Identifier('Foo'), 'example.com') == (False, False)
+
+
+def test_check_nick(tmpconfig):
+    tmpconfig.core.nick_blocks = ['Spam.*', 'Bad[Nick]']
+    blocks = BlockList(tmpconfig)
+    assert blocks.check(Identifier('spambot'), 'a.com') == (True, False)
+    assert blocks.check(Identifier('NotSpam'), 'a.com') == (False, False)
+    # Same as the mask, ignoring IRC case
+    assert blocks.check(Identifier('bad{nick}'), 'a.com') == (True, False)
+    assert blocks.check(Identifier('BadN'), 'a.com') == (True, False)
+
+
+def test_check_host(tmpconfig):
+    tmpconfig.core.host_blocks = [r'.*\.example\.com', 'evil.net']
+    blocks = BlockList(tmpconfig)
+    assert blocks.check(Identifier('Foo'), 'a.EXAMPLE.com') == (False, True)
+    assert blocks.check(Identifier('Foo'), 'example.com') == (False, False)
+    assert blocks.check(Identifier('Foo'), 'evil.net') == (False, True)
+    assert blocks.check(Identifier('Foo'), 'evil.network') == (False, False)
+
+
+def test_check_invalid_mask(tmpconfig):
+    tmpconfig.core.nick_blocks = ['Spam(', 'Eggs']
+    blocks = BlockList(tmpconfig)
+    assert blocks.check(Identifier('spam('), 'a.com') == (True, False)
+    assert blocks.check(Identifier('eggs'), 'a.com') == (True, False)
+    assert blocks.check(Identifier('Spam'), 'a.com') == (False, False)
+
+
+def test_check_backreference(tmpconfig):
+    tmpconfig.core.nick_blocks = [r'(a)\1', 'b']
+    blocks = BlockList(tmpconfig)
+    assert blocks.check(Identifier('aa'), 'a.com') == (True, False)
+    assert blocks.check(Identifier('b'), 'a.com') == (True, False)
+    assert blocks.check(Identifier('ab'), 'a.com') == (False, False)
+
+
+def test_check_after_change(tmpconfig):
+    blocks = BlockList(tmpconfig)
+    assert blocks.check(Identifier('Foo'), 'a.com') == (False, False)
+
+    tmpconfig.core.nick_blocks = ['Foo']
+    assert blocks.check(Identifier('Foo'), 'a.com') == (True, False)
+
+    tmpconfig.core.nick_blocks = ['Bar']
+    assert blocks.check(Identifier('Foo'), 'a.com') == (False, False)
+
+
+def test_cache_size(tmpconfig):
+    tmpconfig.core.nick_blocks = ['Spam.*']
+    blocks = BlockList(tmpconfig, cache_size=2)
+    for nick in ('a', 'b', 'c', 'a'):
+        blocks.check(Identifier(nick), 'a.com')
+    assert list(blocks._cache) == [
+        (Identifier('c'), 'a.com'),
+        (Identifier('a'), 'a.com'),
+    ]
+
+
+def test_check_inline_flags(tmpconfig):
+    tmpconfig.core.nick_blocks = ['(?i)spam.*', 'Eggs']
+    blocks = BlockList(tmpconfig)
+    assert blocks.check(Identifier('SpamBot'), 'a.com') == (True, False)
+    assert blocks.check(Identifier('eggs'), 'a.com') == (True, False)
+    assert blocks.check(Identifier('Ham'), 'a.com') == (False, False)
+
+
+def test_check_backreference_not_first(tmpconfig):
+    tmpconfig.core.nick_blocks = ['b', r'(a)\1']
+    blocks = BlockList(tmpconfig)
+    assert blocks.check(Identifier('aa'), 'a.com') == (True, False)
+    assert blocks.check(Identifier('b'), 'a.com') == (True, False)
+    assert blocks.check(Identifier('ab'), 'a.com') == (False, False)
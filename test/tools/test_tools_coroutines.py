@@ -0,0 +1,106 @@
+# coding=utf-8
+"""Tests for ``async def`` callables and the coroutine runner"""
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+import asyncio
+import threading
+
+import pytest
+
+from sopel import bot, config, loader, trigger
+from sopel.tools import Identifier
+from sopel.tools.coroutines import CoroutineRunner
+
+
+@pytest.fixture
+def tmpconfig(tmpdir):
+    conf_file = tmpdir.join('conf.ini')
+    conf_file.write("\n".join([
+        "[core]",
+        "owner=testnick",
+        "nick = TestBot",
+        "enable = coretasks"
+        ""
+    ]))
+    return config.Config(conf_file.strpath)
+
+
+def test_runner_starts_lazily():
+    runner = CoroutineRunner()
+    assert runner._thread is None
+    runner.stop(timeout=5)
+
+
+def test_runner_submit():
+    runner = CoroutineRunner()
+    done = threading.Event()
+    results = []
+
+    async def add(a, b):
+        await asyncio.sleep(0)
+        return a + b
+
+    def callback(task):
+        results.append(task.result())
+        done.set()
+
+    assert runner.submit(add(1, 2), callback)
+    assert done.wait(5)
+    assert results == [3]
+    runner.stop(timeout=5)
+    assert runner.running == 0
+    assert not runner.submit(add(1, 2))
+
+
+def test_runner_stop_cancels():
+    runner = CoroutineRunner()
+    started = threading.Event()
+
+    async def forever():
+        started.set()
+        await asyncio.sleep(3600)
+
+    runner.submit(forever())
+    assert started.wait(5)
+    runner.stop(timeout=0.1)
+    assert not runner._thread.is_alive()
+
+
+def test_clean_callable_coroutine(tmpconfig):
+    async def coroutine(bot, trigger):
+        pass
+
+    def function(bot, trigger):
+        pass
+
+    loader.clean_callable(coroutine, tmpconfig)
+    loader.clean_callable(function, tmpconfig)
+    assert coroutine._coroutine is True
+    assert function._coroutine is False
+
+
+def test_dispatch_coroutine(tmpconfig):
+    sopel = bot.Sopel(tmpconfig, daemon=False)
+    sopel.scheduler.stop()
+    sopel.scheduler.join(timeout=10)
+    sent = []
+    done = threading.Event()
+    sopel.write = lambda args, text=None: sent.append((args, text))
+
+    async def hello(bot, trigger):
+        await asyncio.sleep(0)
+        bot.say('Hello, %s' % trigger.nick)
+        done.set()
+
+    hello.rule = ['hello']
+    hello.rate = 60
+    loader.clean_callable(hello, tmpconfig)
+    sopel.register([hello], [], [], [])
+
+    line = ':Foo!foo@example.com PRIVMSG #Sopel :hello'
+    sopel.dispatch(trigger.PreTrigger(sopel.nick, line))
+    assert done.wait(5)
+    sopel.coroutines.stop(timeout=5)
+
+    assert sent == [(('PRIVMSG', '#Sopel'), 'Hello, Foo')]
+    assert sopel._times.get(hello, Identifier('Foo')) is not None
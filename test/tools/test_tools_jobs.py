@@ -26,6 +26,19 @@ def test_jobscheduler_stop(sopel):
     assert scheduler.stopping.is_set(), 'Stopping must have been set'
 
 
+def test_jobscheduler_run_uncleaned_job(sopel):
+    scheduler = jobs.JobScheduler(sopel)
+    called = []
+
+    def job_func(bot):
+        called.append(bot)
+
+    # Not cleaned by the loader: only the attributes set by hand
+    job_func.thread = False
+    scheduler._run_job(jobs.Job(5, job_func))
+    assert called == [sopel]
+
+
 def test_job_is_ready_to_run():
     now = time.time()
     job = jobs.Job(5, None)
@@ -0,0 +1,86 @@
+# coding=utf-8
+"""Tests for the process pool"""
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+import os
+import sys
+import time
+
+import pytest
+
+from sopel.tools import processes
+
+
+def get_pid():
+    return os.getpid()
+
+
+def add(a, b):
+    return a + b
+
+
+def fail():
+    raise KeyError('nope')
+
+
+def sleep(seconds):
+    time.sleep(seconds)
+
+
+def allocate(size):
+    return len(bytearray(size))
+
+
+@pytest.fixture
+def pool():
+    pool = processes.ProcessPool(size=1)
+    yield pool
+    pool.stop()
+
+
+def test_run(pool):
+    assert pool.run(add, (1, 2), 10) == 3
+
+
+def test_run_in_other_process(pool):
+    pid = pool.run(get_pid, (), 10)
+    assert pid != os.getpid()
+    # The worker process is kept warm
+    assert pool.run(get_pid, (), 10) == pid
+
+
+def test_run_without_workers():
+    pool = processes.ProcessPool(size=0)
+    assert pool.run(get_pid, (), 10) == os.getpid()
+
+
+def test_run_error(pool):
+    with pytest.raises(KeyError):
+        pool.run(fail, (), 10)
+
+
+def test_run_timeout(pool):
+    pid = pool.run(get_pid, (), 10)
+    with pytest.raises(processes.ProcessTimeout):
+        pool.run(sleep, (60,), 0.5)
+    # The stuck worker process was replaced
+    assert pool.run(get_pid, (), 10) != pid
+
+
+@pytest.mark.skipif(processes.resource is None or sys.platform == 'darwin',
+                    reason='Memory limit not enforced')
+def test_run_memory_limit():
+    pool = processes.ProcessPool(size=1, memory_limit=256)
+    try:
+        with pytest.raises(MemoryError):
+            pool.run(allocate, (512 * 1024 * 1024,), 10)
+        assert pool.run(allocate, (1024,), 10) == 1024
+    finally:
+        pool.stop()
+
+
+def test_wrap(pool, monkeypatch):
+    monkeypatch.setattr(processes, 'pool', pool)
+    wrapped = processes.wrap(add, 10)
+    assert wrapped._process_function is add
+    assert wrapped(1, 2) == 3
@@ -0,0 +1,73 @@
+# coding=utf-8
+"""Tests for the call statistics"""
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+import json
+
+from sopel import test_tools
+from sopel.tools import jobs
+from sopel.tools.profiling import CallStats
+
+
+def test_record():
+    stats = CallStats()
+    assert stats.get('plugin.func') is None
+
+    stats.record('plugin.func', 0.0015)
+    stats.record('plugin.func', 0.0030, error=True)
+    stats.record('plugin.func', 100)
+
+    func = stats.get('plugin.func')
+    assert func['calls'] == 3
+    assert func['errors'] == 1
+    assert func['max'] == 100
+    assert abs(func['total'] - 100.0045) < 1e-9
+    assert func['histogram']['0.002'] == 1
+    assert func['histogram']['0.005'] == 1
+    assert func['histogram']['inf'] == 1
+    assert func['p50'] == 0.005
+    assert func['p95'] == 100
+
+
+def test_record_slow():
+    stats = CallStats(slow_threshold=1)
+    assert not stats.record('plugin.func', 0.5)
+    assert stats.record('plugin.func', 1.5)
+    assert not CallStats().record('plugin.func', 1000)
+
+
+def test_top():
+    stats = CallStats()
+    stats.record('a', 1)
+    stats.record('b', 0.5)
+    stats.record('b', 0.6)
+    assert [name for name, _ in stats.top()] == ['b', 'a']
+    assert [name for name, _ in stats.top(key='max')] == ['a', 'b']
+    assert [name for name, _ in stats.top(1, key='calls')] == ['b']
+
+    stats.clear()
+    assert stats.top() == []
+
+
+def test_dump(tmpdir):
+    stats = CallStats()
+    stats.record('plugin.func', 0.5)
+    filename = tmpdir.join('stats.json').strpath
+    stats.dump(filename)
+
+    with open(filename) as stats_file:
+        data = json.load(stats_file)
+    assert data['calls']['plugin.func']['calls'] == 1
+
+
+def test_job_call_is_recorded():
+    sopel = test_tools.MockSopel('Sopel')
+    scheduler = jobs.JobScheduler(sopel)
+
+    def job(bot):
+        raise ValueError('nope')
+
+    sopel.error = lambda trigger=None: None
+    scheduler._call(job)
+    name = 'job:%s.job' % __name__
+    assert sopel.call_stats.get(name)['errors'] == 1
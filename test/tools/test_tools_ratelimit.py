@@ -0,0 +1,77 @@
+# coding=utf-8
+"""Tests for the rate limit store"""
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+from sopel.tools import Identifier
+from sopel.tools.ratelimit import RateLimiter
+
+
+def func(bot, trigger):
+    pass
+
+
+def other(bot, trigger):
+    pass
+
+
+def test_get_set():
+    limiter = RateLimiter()
+    nick = Identifier('Foo')
+    assert limiter.get(func, nick) is None
+
+    limiter.set(func, nick, 100, 10)
+    assert limiter.get(func, nick) == 100
+    assert limiter.get(func, Identifier('foo')) == 100
+    assert limiter.get(func, Identifier('Bar')) is None
+    assert limiter.get(other, nick) is None
+    assert limiter.get(func) is None
+
+    limiter.set(func, None, 100, 10)
+    assert limiter.get(func) == 100
+    assert len(limiter) == 2
+
+
+def test_set_without_window():
+    limiter = RateLimiter()
+    limiter.set(func, Identifier('Foo'), 100, 0)
+    assert limiter.get(func, Identifier('Foo')) is None
+    assert len(limiter) == 0
+
+
+def test_entries_expire():
+    limiter = RateLimiter()
+    limiter.set(func, Identifier('Foo'), 100, 10)
+    limiter.set(func, Identifier('Bar'), 105, 10)
+    limiter.set(other, Identifier('Foo'), 100, 60)
+    assert len(limiter) == 3
+
+    limiter.set(func, Identifier('Baz'), 112, 10)
+    assert limiter.get(func, Identifier('Foo')) is None
+    assert limiter.get(func, Identifier('Bar')) == 105
+    assert limiter.get(other, Identifier('Foo')) == 100
+    assert len(limiter) == 3
+
+    limiter.set(func, Identifier('Baz'), 200, 10)
+    assert len(limiter) == 1
+
+
+def test_set_again_renews():
+    limiter = RateLimiter()
+    limiter.set(func, Identifier('Foo'), 100, 10)
+    limiter.set(func, Identifier('Bar'), 101, 10)
+    limiter.set(func, Identifier('Foo'), 105, 10)
+
+    limiter.set(other, Identifier('Foo'), 112, 10)
+    assert limiter.get(func, Identifier('Foo')) == 105
+    assert limiter.get(func, Identifier('Bar')) is None
+
+
+def test_memory_usage():
+    limiter = RateLimiter()
+    empty = limiter.memory_usage()
+    for index in range(100):
+        limiter.set(func, Identifier('nick%d' % index), 100, 10)
+    assert limiter.memory_usage() > empty
+
+    limiter.clear()
+    assert len(limiter) == 0
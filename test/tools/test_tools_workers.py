@@ -0,0 +1,149 @@
+# coding=utf-8
+"""Tests for the worker thread pool"""
+from __future__ import unicode_literals, absolute_import, print_function, division
+
+import threading
+
+import pytest
+
+from sopel.tools.workers import WorkerPool
+
+
+def test_submit_runs_call():
+    pool = WorkerPool(max_workers=2)
+    done = threading.Event()
+    result = []
+
+    def func(a, b):
+        result.append(a + b)
+        done.set()
+
+    assert pool.submit('plugin', func, 1, 2)
+    assert done.wait(5)
+    pool.stop(timeout=5)
+    assert result == [3]
+    assert pool.stats()['workers'] == 0
+
+
+def test_unknown_overflow_policy():
+    with pytest.raises(ValueError):
+        WorkerPool(overflow='block')
+
+
+def test_workers_are_bounded():
+    pool = WorkerPool(max_workers=2)
+    release = threading.Event()
+    for _ in range(10):
+        pool.submit('plugin', release.wait, 5)
+
+    # Wait for both workers to pick up a call
+    for _ in range(50):
+        stats = pool.stats()
+        if stats['busy'] == 2:
+            break
+        release.wait(0.1)
+    assert stats['workers'] == 2
+    assert stats['queued'] == 8
+
+    release.set()
+    pool.stop(timeout=5)
+    assert pool.stats()['queued'] == 0
+
+
+def test_drop_new():
+    pool = WorkerPool(max_workers=1, max_queued=2, overflow='drop_new')
+    release = threading.Event()
+    started = threading.Event()
+    ran = []
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    pool.submit('plugin', block)
+    assert started.wait(5)
+    assert pool.submit('plugin', ran.append, 1)
+    assert pool.submit('plugin', ran.append, 2)
+    assert not pool.submit('plugin', ran.append, 3)
+    assert pool.dropped == 1
+
+    release.set()
+    pool.stop(timeout=5)
+    assert ran == [1, 2]
+
+
+def test_drop_oldest():
+    pool = WorkerPool(max_workers=1, max_queued=2, overflow='drop_oldest')
+    release = threading.Event()
+    started = threading.Event()
+    ran = []
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    pool.submit('plugin', block)
+    assert started.wait(5)
+    pool.submit('plugin', ran.append, 1)
+    pool.submit('plugin', ran.append, 2)
+    assert pool.submit('plugin', ran.append, 3)
+    assert pool.dropped == 1
+
+    release.set()
+    pool.stop(timeout=5)
+    assert ran == [2, 3]
+
+
+def test_no_queue_limit():
+    pool = WorkerPool(max_workers=1, max_queued=None)
+    release = threading.Event()
+    started = threading.Event()
+    ran = []
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    pool.submit('plugin', block)
+    assert started.wait(5)
+    for i in range(2000):
+        assert pool.submit('plugin', ran.append, i)
+    assert pool.dropped == 0
+
+    release.set()
+    pool.stop(timeout=5)
+    assert ran == list(range(2000))
+
+
+def test_plugin_limit():
+    pool = WorkerPool(max_workers=3, plugin_limit=1)
+    release = threading.Event()
+    started = threading.Event()
+    ran = []
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    pool.submit('slow', block)
+    assert started.wait(5)
+    pool.submit('slow', ran.append, 'slow')
+    pool.submit('fast', ran.append, 'fast')
+
+    # The second "slow" call waits, but not the "fast" one behind it
+    for _ in range(50):
+        if ran:
+            break
+        release.wait(0.1)
+    assert ran == ['fast']
+    assert pool.stats()['queued'] == 1
+
+    release.set()
+    pool.stop(timeout=5)
+    assert ran == ['fast', 'slow']
+
+
+def test_stop_refuses_new_calls():
+    pool = WorkerPool()
+    pool.stop(timeout=5)
+    assert not pool.submit('plugin', lambda: None)